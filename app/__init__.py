@@ -4,21 +4,41 @@ import app.apis.class_members_resource  # noqa: registers ClassMembers routes to
 import app.apis.class_reminder_resource  # noqa: registers ClassReminder routes to class_ns
 from app.apis.booking import api as booking_ns
 from app.config import Config
+from app.scheduler import init_scheduler
 from app.db import DB
+from app.apis.metrics import api as metrics_ns
+from app.apis.notifications import api as notifications_ns
+from app.services.container import ServiceContainer, get_services
+from app.services.password_hash_pool import HashPoolSaturatedError
+from app.server_timing import AUTH, init_server_timing, stop_span
+from app.db.users import ROLE_TRAINER
 
 from http import HTTPStatus
 from flask import Flask
 from flask_restx import Api
 from flask_jwt_extended import JWTManager
-from flask_jwt_extended.exceptions import NoAuthorizationError
+from flask_jwt_extended.exceptions import NoAuthorizationError, RevokedTokenError, WrongTokenError
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 
-def create_app():
+def create_app(config_overrides: dict = None):
+    """Build the app from Config; config_overrides replaces settings before anything reads them."""
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.config.update(config_overrides or {})
 
     DB.init_app(app)
-    JWTManager(app)
+    jwt = JWTManager(app)
+    ServiceContainer(app.config).init_app(app)
+
+    init_scheduler(app)
+
+    @jwt.token_in_blocklist_loader
+    def is_token_revoked(jwt_header, jwt_payload):
+        try:
+            return get_services().auth_service.is_token_revoked(jwt_payload)
+        finally:
+            # The last step of verifying a token, see init_server_timing
+            stop_span(AUTH)
 
     authorizations = {
         'Bearer': {
@@ -41,6 +61,9 @@ def create_app():
     api.add_namespace(auth_ns)
     api.add_namespace(class_ns)
     api.add_namespace(booking_ns)
+    api.add_namespace(metrics_ns)
+    api.add_namespace(notifications_ns)
+    init_server_timing(app, api, jwt, trainer_role=ROLE_TRAINER)
 
     @api.errorhandler(NoAuthorizationError)
     def handle_no_auth(error):
@@ -50,10 +73,26 @@ def create_app():
     def handle_expired_token(error):
         return {"message": "Token has expired. Please log in again."}, HTTPStatus.UNAUTHORIZED
 
+    @api.errorhandler(RevokedTokenError)
+    def handle_revoked_token(error):
+        return {"message": "Token has been revoked. Please log in again."}, HTTPStatus.UNAUTHORIZED
+
+    @api.errorhandler(WrongTokenError)
+    def handle_wrong_token(error):
+        return {"message": str(error)}, HTTPStatus.UNAUTHORIZED
+
     @api.errorhandler(InvalidTokenError)
     def handle_invalid_token(error):
         return {"message": "Invalid token. Please log in again."}, HTTPStatus.UNAUTHORIZED
 
+    @api.errorhandler(HashPoolSaturatedError)
+    def handle_hash_pool_saturated(error):
+        return (
+            {"message": "Server is busy. Please retry shortly."},
+            HTTPStatus.SERVICE_UNAVAILABLE,
+            {"Retry-After": str(error.retry_after)},
+        )
+
     @api.errorhandler(Exception)
     def handle_generic_error(error):
         return {"message": str(error)}, HTTPStatus.INTERNAL_SERVER_ERROR
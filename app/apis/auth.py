@@ -1,8 +1,10 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 from http import HTTPStatus
 from app.db.users import BIRTHDAY, EMAIL, PASSWORD, NAME, ROLE, ROLE_MEMBER, ROLE_TRAINER
-from app.services.auth_service import AuthService
+from app.services.auth_context import get_authenticated_user
+from app.services.container import get_services
 
 api = Namespace("auth", description="Authentication endpoints")
 
@@ -23,9 +25,15 @@ login_model = api.model("Login", {
 
 token_response = api.model("TokenResponse", {
     "access_token": fields.String(description="JWT access token"),
+    "refresh_token": fields.String(description="JWT refresh token, exchanged at /auth/refresh"),
     "user": fields.Raw(description="User information")
 })
 
+refresh_response = api.model("RefreshResponse", {
+    "access_token": fields.String(description="New JWT access token"),
+    "refresh_token": fields.String(description="New JWT refresh token; the one sent is revoked"),
+})
+
 
 @api.route("/register")
 class Register(Resource):
@@ -35,7 +43,7 @@ class Register(Resource):
     def post(self):
         """Register a new user (member or trainer)"""
         data = request.json
-        return AuthService().register_user(data)
+        return get_services().auth_service.register_user(data)
 
 
 @api.route("/login")
@@ -45,4 +53,41 @@ class Login(Resource):
     @api.response(HTTPStatus.UNAUTHORIZED, "Invalid credentials")
     def post(self):
         """Login and receive JWT token"""
-        return AuthService().login_user(request.json)
+        return get_services().auth_service.login_user(request.json)
+
+
+@api.route("/refresh")
+class Refresh(Resource):
+    @api.response(HTTPStatus.OK, "Tokens refreshed", refresh_response)
+    @api.response(HTTPStatus.UNAUTHORIZED, "Missing, expired, or already used refresh token")
+    @api.doc(security='Bearer', description="Send the refresh token as 'Bearer <refresh_token>'")
+    @jwt_required(refresh=True)
+    def post(self):
+        """Exchange a refresh token for a new access and refresh token pair"""
+        return get_services().auth_service.refresh_tokens(get_jwt_identity(), get_jwt())
+
+
+@api.route("/import")
+class ImportUsers(Resource):
+    @api.response(HTTPStatus.OK, "Import finished; see the per-row results")
+    @api.response(HTTPStatus.BAD_REQUEST, "Empty request body")
+    @api.response(HTTPStatus.FORBIDDEN, "Only trainers can import users")
+    @api.response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Too many rows in one import")
+    @api.response(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Body must be CSV or NDJSON")
+    @api.doc(
+        security='Bearer',
+        description=(
+            "Send a CSV (Content-Type: text/csv) with a header row, or NDJSON "
+            "(Content-Type: application/x-ndjson) with one user object per line. "
+            f"Columns: {EMAIL}, {PASSWORD}, {NAME}, {BIRTHDAY} and optional {ROLE}."
+        ),
+    )
+    @jwt_required()
+    def post(self):
+        """Create many users at once from a CSV or NDJSON upload (trainer only)"""
+        auth_user = get_authenticated_user()
+        return get_services().user_import_service.import_users(
+            role=auth_user.role,
+            content_type=request.mimetype,
+            body=request.get_data(as_text=True),
+        )
@@ -15,7 +15,7 @@ from app.db.bookings import (
 )
 from app.db.constants import ID
 from app.services.auth_context import get_authenticated_user
-from app.services.booking_service import BookingService
+from app.services.container import get_services
 
 api = Namespace("bookings", description="Booking management endpoints")
 
@@ -26,7 +26,7 @@ create_booking_model = api.model("CreateBooking", {
 
 notification_preferences_model = api.model("NotificationPreferences", {
     CHANNELS: fields.List(
-        fields.String(enum=["email", "telegram"]),
+        fields.String(enum=["email", "telegram", "webhook"]),
         required=True,
         description="Notification channels selected for this booking",
         example=["email", "telegram"],
@@ -69,7 +69,7 @@ class Bookings(Resource):
     def post(self):
         """Create a new booking for a class (members only)"""
         auth_user = get_authenticated_user()
-        return BookingService().create_booking(
+        return get_services().booking_service.create_booking(
             user_id=auth_user.user_id,
             user_email=auth_user.email,
             role=auth_user.role,
@@ -91,7 +91,7 @@ class MyBookedClasses(Resource):
     def get(self):
         """Retrieve all classes booked by the currently logged-in member."""
         auth_user = get_authenticated_user()
-        return BookingService().get_member_bookings(
+        return get_services().booking_service.get_member_bookings(
             user_id=auth_user.user_id,
             role=auth_user.role
         )
@@ -111,9 +111,9 @@ class BookingNotifications(Resource):
     )
     @jwt_required()
     def patch(self, booking_id):
-        """Configure email and telegram reminders for a booked class"""
+        """Configure email, telegram and webhook reminders for a booked class"""
         auth_user = get_authenticated_user()
-        return BookingService().update_notification_preferences(
+        return get_services().booking_service.update_notification_preferences(
             booking_id=booking_id,
             user_id=auth_user.user_id,
             role=auth_user.role,
@@ -3,7 +3,7 @@ from flask_jwt_extended import jwt_required
 from http import HTTPStatus
 from app.db.bookings import USER_NAME, USER_EMAIL, BOOKING_TIME
 from app.services.auth_context import get_authenticated_user
-from app.services.class_members_service import ClassMembersService
+from app.services.container import get_services
 from app.apis.class_resource import api
 
 member_response = api.model("MemberResponse", {
@@ -23,7 +23,7 @@ class ClassMembers(Resource):
     def get(self, class_id):
         """Get members who booked a class (trainer of the class only)"""
         auth_user = get_authenticated_user()
-        return ClassMembersService().get_class_members(
+        return get_services().class_members_service.get_class_members(
             class_id=class_id,
             user_id=auth_user.user_id,
             role=auth_user.role
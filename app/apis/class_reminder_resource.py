@@ -1,13 +1,8 @@
 from flask_restx import Resource
 from flask_jwt_extended import jwt_required
 from app.db.users import ROLE_TRAINER
-from app.db.bookings import CHANNEL_EMAIL, CHANNEL_TELEGRAM
 from app.services.auth_context import get_authenticated_user
-from app.services.notification_dispatcher import NotificationDispatcher
-from app.services.reminder_service import ReminderService
-from app.services.ses_email_service import SESEmailService
-from app.services.telegram_notification_service import TelegramNotificationService
-from app.config import Config
+from app.services.container import get_services
 from app.apis.class_resource import api
 
 
@@ -17,22 +12,39 @@ class ClassReminder(Resource):
         security="Bearer",
         params={"class_id": "ID of the class whose booked members should receive reminders"},
     )
-    @api.response(200, "Class reminders sent successfully")
+    @api.response(202, "Reminder job queued; poll the job status for delivery results")
     @api.response(404, "Class not found")
     @api.response(403, "Only the assigned trainer of this class can send reminders")
     @api.response(400, "No registered members for this class")
-    @api.response(500, "Failed to send one or more notifications")
     @jwt_required()
     def post(self, class_id):
-        """Send reminders to members using their configured channels (trainer only)"""
+        """Queue reminders to members using their configured channels (trainer only)"""
         auth_user = get_authenticated_user()
 
         if auth_user.role != ROLE_TRAINER:
             return {"message": "Access denied. Only trainers can send class reminders."}, 403
 
-        dispatcher = NotificationDispatcher({
-            CHANNEL_EMAIL: SESEmailService(Config.SES_SENDER_EMAIL),
-            CHANNEL_TELEGRAM: TelegramNotificationService(Config.TELEGRAM_BOT_TOKEN),
-        })
-        reminder_service = ReminderService(dispatcher)
-        return reminder_service.send_reminder(class_id, auth_user.user_id)
+        return get_services().reminder_service.queue_reminder(class_id, auth_user.user_id)
+
+
+@api.route("/<string:class_id>/reminder/jobs/<string:job_id>")
+class ClassReminderJob(Resource):
+    @api.doc(
+        security="Bearer",
+        params={
+            "class_id": "ID of the class the reminder job belongs to",
+            "job_id": "ID returned when the reminder was queued",
+        },
+    )
+    @api.response(200, "Reminder job status with per-recipient results")
+    @api.response(404, "Reminder job not found")
+    @api.response(403, "Only the assigned trainer of this class can view its reminder jobs")
+    @jwt_required()
+    def get(self, class_id, job_id):
+        """Get the status of a queued reminder job (trainer only)"""
+        auth_user = get_authenticated_user()
+
+        if auth_user.role != ROLE_TRAINER:
+            return {"message": "Access denied. Only trainers can view reminder jobs."}, 403
+
+        return get_services().reminder_service.get_reminder_job(class_id, job_id, auth_user.user_id)
@@ -16,7 +16,7 @@ from app.db.classes import (
 )
 from app.db.constants import ID
 from app.services.auth_context import get_authenticated_user
-from app.services.class_service import ClassService
+from app.services.container import get_services
 
 api = Namespace("classes", description="Class management endpoints")
 
@@ -72,9 +72,9 @@ class Classes(Resource):
         """Create a new fitness class (trainer only)"""
         auth_user = get_authenticated_user()
         data = request.json
-        return ClassService().create_class(auth_user.email, auth_user.role, data)
+        return get_services().class_service.create_class(auth_user.email, auth_user.role, data)
 
     @api.response(HTTPStatus.OK, "Upcoming classes retrieved successfully", [class_response])
     def get(self):
         """Get all upcoming classes (any user)"""
-        return ClassService().get_upcoming_classes()
+        return get_services().class_service.get_upcoming_classes()
@@ -0,0 +1,22 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
+from app.db.users import ROLE_TRAINER
+from app.services.auth_context import get_authenticated_user
+from app.services.container import get_services
+
+api = Namespace("metrics", description="Operational metrics endpoints")
+
+
+@api.route("")
+class Metrics(Resource):
+    @api.response(HTTPStatus.OK, "Current in-process metrics")
+    @api.response(HTTPStatus.FORBIDDEN, "Only trainers can view metrics")
+    @api.doc(security='Bearer')
+    @jwt_required()
+    def get(self):
+        """Get counters, gauges and timers for this app process (trainer only)"""
+        auth_user = get_authenticated_user()
+        if auth_user.role != ROLE_TRAINER:
+            return {"message": "Only trainers can view metrics"}, HTTPStatus.FORBIDDEN
+        return get_services().metrics.snapshot(), HTTPStatus.OK
@@ -0,0 +1,46 @@
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required
+from http import HTTPStatus
+from app.services.auth_context import get_authenticated_user
+from app.services.container import get_services
+
+api = Namespace("notifications", description="Notification delivery endpoints")
+
+# Models
+replay_model = api.model("DeadLetterReplay", {
+    "ids": fields.List(
+        fields.String,
+        required=False,
+        description="Dead letters to replay; omit to replay the oldest pending ones",
+        example=["507f1f77bcf86cd799439011"],
+    ),
+})
+
+
+@api.route("/dead-letters")
+class DeadLetters(Resource):
+    @api.doc(security="Bearer", params={"limit": "Most dead letters to return"})
+    @api.response(HTTPStatus.OK, "Pending notifications that failed after all retries, oldest first")
+    @api.response(HTTPStatus.FORBIDDEN, "Only trainers can view failed notifications")
+    @jwt_required()
+    def get(self):
+        """List notifications about your classes that could not be delivered (trainer only)"""
+        auth_user = get_authenticated_user()
+        limit = request.args.get("limit", type=int)
+        return get_services().dead_letter_service.list_dead_letters(auth_user.role, auth_user.user_id, limit)
+
+
+@api.route("/dead-letters/replay")
+class DeadLetterReplay(Resource):
+    @api.doc(security="Bearer")
+    @api.expect(replay_model, validate=False)
+    @api.response(HTTPStatus.OK, "Replay result per dead letter; letters past the time budget are deferred")
+    @api.response(HTTPStatus.BAD_REQUEST, "Invalid ids")
+    @api.response(HTTPStatus.FORBIDDEN, "Only trainers can replay failed notifications")
+    @jwt_required()
+    def post(self):
+        """Resend failed notifications about your classes in bulk (trainer only)"""
+        auth_user = get_authenticated_user()
+        data = request.get_json(silent=True) or {}
+        return get_services().dead_letter_service.replay(auth_user.role, auth_user.user_id, data.get("ids"))
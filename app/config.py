@@ -1,4 +1,5 @@
 import logging
+import os
 from os import environ
 
 from dotenv import load_dotenv
@@ -30,3 +31,66 @@ class Config(object):
     JWT_SECRET_KEY = get_required_environ("JWT_SECRET_KEY")
     SES_SENDER_EMAIL = get_required_environ("SES_SENDER_EMAIL")
     TELEGRAM_BOT_TOKEN = get_optional_environ("TELEGRAM_BOT_TOKEN")
+    TELEGRAM_API_BASE_URL = get_optional_environ("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
+    TELEGRAM_GLOBAL_RATE = float(get_optional_environ("TELEGRAM_GLOBAL_RATE", "30"))
+    TELEGRAM_CHAT_RATE = float(get_optional_environ("TELEGRAM_CHAT_RATE", "1"))
+    TELEGRAM_MAX_RETRIES = int(get_optional_environ("TELEGRAM_MAX_RETRIES", "3"))
+    WEBHOOK_URL = get_optional_environ("WEBHOOK_URL", "")
+    WEBHOOK_SECRET = get_optional_environ("WEBHOOK_SECRET", "")
+    WEBHOOK_BATCH_SIZE = int(get_optional_environ("WEBHOOK_BATCH_SIZE", "100"))
+    WEBHOOK_CONCURRENCY = int(get_optional_environ("WEBHOOK_CONCURRENCY", "4"))
+    WEBHOOK_TIMEOUT = float(get_optional_environ("WEBHOOK_TIMEOUT", "10"))
+    SES_REGION = get_optional_environ("SES_REGION", "us-east-1")
+    SES_ENDPOINT_URL = get_optional_environ("SES_ENDPOINT_URL")
+    SES_MAX_POOL_CONNECTIONS = int(get_optional_environ("SES_MAX_POOL_CONNECTIONS", "32"))
+    SES_TCP_KEEPALIVE = get_optional_environ("SES_TCP_KEEPALIVE", "true").lower() == "true"
+    SES_RETRY_MODE = get_optional_environ("SES_RETRY_MODE", "standard")
+    SES_MAX_ATTEMPTS = int(get_optional_environ("SES_MAX_ATTEMPTS", "3"))
+    EMAIL_BACKEND = get_optional_environ("EMAIL_BACKEND", "ses")
+    SMTP_HOST = get_optional_environ("SMTP_HOST", "localhost")
+    SMTP_PORT = int(get_optional_environ("SMTP_PORT", "587"))
+    SMTP_USERNAME = get_optional_environ("SMTP_USERNAME", "")
+    SMTP_PASSWORD = get_optional_environ("SMTP_PASSWORD", "")
+    SMTP_STARTTLS = get_optional_environ("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_SSL = get_optional_environ("SMTP_SSL", "false").lower() == "true"
+    SMTP_POOL_SIZE = int(get_optional_environ("SMTP_POOL_SIZE", "8"))
+    SMTP_TIMEOUT = float(get_optional_environ("SMTP_TIMEOUT", "10"))
+    SMTP_MAX_MESSAGES_PER_CONNECTION = int(get_optional_environ("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+    PASSWORD_HASH_WORKERS = int(get_optional_environ("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_QUEUE_LIMIT = int(get_optional_environ("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+    PASSWORD_HASH_RETRY_AFTER = int(get_optional_environ("PASSWORD_HASH_RETRY_AFTER", "1"))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(get_optional_environ("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+    PASSWORD_HASH_ALGORITHM = get_optional_environ("PASSWORD_HASH_ALGORITHM", "bcrypt")
+    PASSWORD_HASH_TARGET_MS = float(get_optional_environ("PASSWORD_HASH_TARGET_MS", "250"))
+    PASSWORD_HASH_MIN_BCRYPT_ROUNDS = int(get_optional_environ("PASSWORD_HASH_MIN_BCRYPT_ROUNDS", "10"))
+    PASSWORD_HASH_MAX_BCRYPT_ROUNDS = int(get_optional_environ("PASSWORD_HASH_MAX_BCRYPT_ROUNDS", "16"))
+    PASSWORD_HASH_BCRYPT_ROUNDS = int(get_optional_environ("PASSWORD_HASH_BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_ARGON2_TIME_COST = int(get_optional_environ("PASSWORD_HASH_ARGON2_TIME_COST", "3"))
+    PASSWORD_HASH_ARGON2_MEMORY_KIB = int(get_optional_environ("PASSWORD_HASH_ARGON2_MEMORY_KIB", "65536"))
+    PASSWORD_HASH_ARGON2_PARALLELISM = int(get_optional_environ("PASSWORD_HASH_ARGON2_PARALLELISM", "4"))
+    USER_IMPORT_HASH_WORKERS = int(get_optional_environ("USER_IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+    USER_IMPORT_MAX_ROWS = int(get_optional_environ("USER_IMPORT_MAX_ROWS", "5000"))
+    REMINDER_MAX_WORKERS = int(get_optional_environ("REMINDER_MAX_WORKERS", "32"))
+    REMINDER_EMAIL_CONCURRENCY = int(get_optional_environ("REMINDER_EMAIL_CONCURRENCY", "14"))
+    REMINDER_TELEGRAM_CONCURRENCY = int(get_optional_environ("REMINDER_TELEGRAM_CONCURRENCY", "16"))
+    NOTIFICATION_RETRY_ATTEMPTS = int(get_optional_environ("NOTIFICATION_RETRY_ATTEMPTS", "3"))
+    NOTIFICATION_RETRY_BASE_SECONDS = float(get_optional_environ("NOTIFICATION_RETRY_BASE_SECONDS", "0.5"))
+    NOTIFICATION_RETRY_MAX_SECONDS = float(get_optional_environ("NOTIFICATION_RETRY_MAX_SECONDS", "8"))
+    NOTIFICATION_REPLAY_LIMIT = int(get_optional_environ("NOTIFICATION_REPLAY_LIMIT", "500"))
+    NOTIFICATION_REPLAY_DEADLINE_SECONDS = float(get_optional_environ("NOTIFICATION_REPLAY_DEADLINE_SECONDS", "20"))
+    REMINDER_JOB_LEASE_SECONDS = int(get_optional_environ("REMINDER_JOB_LEASE_SECONDS", "60"))
+    REMINDER_JOB_BATCH_SIZE = int(get_optional_environ("REMINDER_JOB_BATCH_SIZE", "100"))
+    REMINDER_JOB_MAX_ATTEMPTS = int(get_optional_environ("REMINDER_JOB_MAX_ATTEMPTS", "3"))
+    REMINDER_JOB_DEADLINE_SECONDS = float(get_optional_environ("REMINDER_JOB_DEADLINE_SECONDS", "600"))
+    CIRCUIT_FAILURE_THRESHOLD = int(get_optional_environ("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS = float(get_optional_environ("CIRCUIT_RESET_SECONDS", "30"))
+    REMINDER_WORKER_POLL_SECONDS = float(get_optional_environ("REMINDER_WORKER_POLL_SECONDS", "2"))
+    SCHEDULER_ENABLED = get_optional_environ("SCHEDULER_ENABLED", "false").lower() == "true"
+    REMINDER_SCAN_INTERVAL_SECONDS = int(get_optional_environ("REMINDER_SCAN_INTERVAL_SECONDS", "300"))
+    REMINDER_WINDOW_MINUTES = int(get_optional_environ("REMINDER_WINDOW_MINUTES", "1440"))
+    NOTIFICATION_TEMPLATE_DIR = get_optional_environ("NOTIFICATION_TEMPLATE_DIR")
+    NOTIFICATION_TEMPLATE_VERSION = get_optional_environ("NOTIFICATION_TEMPLATE_VERSION", "v1")
+    REMINDER_DIGEST_ENABLED = get_optional_environ("REMINDER_DIGEST_ENABLED", "false").lower() == "true"
+    SCHEDULER_POLL_SECONDS = float(get_optional_environ("SCHEDULER_POLL_SECONDS", "5"))
+    SCHEDULER_LEASE_TTL_SECONDS = float(get_optional_environ("SCHEDULER_LEASE_TTL_SECONDS", "15"))
+    SERVER_TIMING = get_optional_environ("SERVER_TIMING", "all" if DEBUG else "trainers").lower()
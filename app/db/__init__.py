@@ -1,6 +1,7 @@
 from mongomock import MongoClient as mongomockClient
 from pymongo import MongoClient as pyMongoClient
 from pymongo.database import Collection, Database
+from app.server_timing import COMMAND_LISTENER
 
 
 class DB:
@@ -12,8 +13,11 @@ class DB:
         # Initialize the database client based on the environment configuration
         # If USE_MOCK is enabled, then we will use mongomock (in-memory mock DB)
         '''
-        create_db = mongomockClient if app.config["MOCK_DB"] else pyMongoClient
-        client = create_db(app.config["MONGO_URI"])
+        if app.config["MOCK_DB"]:
+            client = mongomockClient(app.config["MONGO_URI"])
+        else:
+            # Reports each command's time to the request that sent it, see app.server_timing
+            client = pyMongoClient(app.config["MONGO_URI"], event_listeners=[COMMAND_LISTENER])
 
         # check if the database is connected. Else fail. (Only for real MongoDB, not mongomock)
         if not app.config["MOCK_DB"]:
@@ -1,8 +1,11 @@
 from app.db.utils import serialize_item, serialize_items
 from app.db import DB
+from app.db.classes import CLASS_COLLECTION, START_DATE
 from datetime import datetime
+import logging
 from bson import ObjectId
 from bson.errors import InvalidId
+from pymongo.errors import OperationFailure
 
 
 # Booking Collection Name
@@ -20,6 +23,8 @@ CHANNELS = "channels"
 TELEGRAM_CHAT_ID = "telegram_chat_id"
 CHANNEL_EMAIL = "email"
 CHANNEL_TELEGRAM = "telegram"
+CHANNEL_WEBHOOK = "webhook"
+REMINDER_SENT_AT = "reminder_sent_at"
 
 DEFAULT_NOTIFICATION_PREFERENCES = {
     CHANNELS: [CHANNEL_EMAIL],
@@ -31,11 +36,18 @@ class BookingResource:
 
     def __init__(self):
         self.collection = DB.get_collection(BOOKING_COLLECTION)
+        # Serves every per-class lookup, including the scheduled reminder scan
+        self.collection.create_index([(CLASS_ID, 1), (REMINDER_SENT_AT, 1)])
+        # One booking per member per class, enforced by the database rather than a lookup first
+        try:
+            self.collection.create_index([(CLASS_ID, 1), (USER_ID, 1)], unique=True)
+        except OperationFailure as error:
+            logging.warning(f"Bookings are not unique per class and user yet, remove the duplicates: {error}")
 
     def create_booking(self, class_id: str, user_id: str, user_email: str,
                        user_name: str, is_trainer: bool = False,
                        notification_preferences: dict = None):
-        """Create a new booking"""
+        """Create a new booking. Raises DuplicateKeyError if the user already booked the class."""
         booking = {
             CLASS_ID: class_id,
             USER_ID: user_id,
@@ -63,6 +75,75 @@ class BookingResource:
         bookings = self.collection.find({CLASS_ID: class_id}).sort(BOOKING_TIME, 1)
         return serialize_items(list(bookings))
 
+    def iter_bookings_by_class(self, class_id: str, batch_size: int = 500):
+        """Stream bookings for a class from the cursor without loading them all"""
+        bookings = self.collection.find({CLASS_ID: class_id}).sort(BOOKING_TIME, 1).batch_size(batch_size)
+        for booking in bookings:
+            yield serialize_item(booking)
+
+    def has_bookings(self, class_id: str):
+        """Check if a class has at least one booking"""
+        return self.collection.find_one({CLASS_ID: class_id}, {"_id": 1}) is not None
+
+    def get_unreminded_bookings(self, class_ids: list):
+        """Get bookings in the given classes that have not had a scheduled reminder yet"""
+        bookings = self.collection.find({CLASS_ID: {"$in": class_ids}, REMINDER_SENT_AT: None})
+        return serialize_items(list(bookings))
+
+    def claim_reminder(self, booking_id: str) -> bool:
+        """Atomically mark a booking as reminded. Only one caller ever gets True."""
+        result = self.collection.update_one(
+            {"_id": ObjectId(booking_id), REMINDER_SENT_AT: None},
+            {"$set": {REMINDER_SENT_AT: datetime.now()}},
+        )
+        return result.modified_count == 1
+
+    def release_reminders(self, booking_ids: list):
+        """Undo claim_reminder for bookings whose reminders were not sent, so a later scan sends them"""
+        object_ids = [ObjectId(booking_id) for booking_id in booking_ids]
+        if object_ids:
+            self.collection.update_many({"_id": {"$in": object_ids}}, {"$set": {REMINDER_SENT_AT: None}})
+
+    def get_unreminded_bookings_by_member(self, start: datetime, end: datetime):
+        """
+        Group un-reminded bookings in classes starting in [start, end) by member, in one aggregation.
+
+        Returns one entry per member: {"_id": user_id, USER_EMAIL, USER_NAME, "bookings": [...]},
+        where each booking carries its class under "class", ordered by class start date.
+        """
+        pipeline = [
+            # The start_date index narrows the scan to the window before joining
+            {"$match": {START_DATE: {"$gte": start, "$lt": end}}},
+            {"$addFields": {"_class_id": {"$toString": "$_id"}}},
+            {"$lookup": {
+                "from": BOOKING_COLLECTION,
+                "localField": "_class_id",
+                "foreignField": CLASS_ID,
+                "as": "booking",
+            }},
+            {"$unwind": "$booking"},
+            {"$match": {f"booking.{REMINDER_SENT_AT}": None}},
+            {"$sort": {START_DATE: 1}},
+            {"$group": {
+                "_id": f"$booking.{USER_ID}",
+                USER_EMAIL: {"$first": f"$booking.{USER_EMAIL}"},
+                USER_NAME: {"$first": f"$booking.{USER_NAME}"},
+                "bookings": {"$push": "$$ROOT"},
+            }},
+        ]
+
+        members = []
+        for member in DB.get_collection(CLASS_COLLECTION).aggregate(pipeline):
+            bookings = []
+            for row in member["bookings"]:
+                booking = serialize_item(row.pop("booking"))
+                row.pop("_class_id", None)
+                booking["class"] = serialize_item(row)
+                bookings.append(booking)
+            member["bookings"] = bookings
+            members.append(member)
+        return members
+
     def get_bookings_by_user(self, user_id: str):
         """Get all bookings for a specific user"""
         bookings = self.collection.find({USER_ID: user_id}).sort(BOOKING_TIME, -1)
@@ -91,6 +172,16 @@ class BookingResource:
         count = self.collection.count_documents({CLASS_ID: class_id, IS_TRAINER: False})
         return count
 
+    def count_member_bookings_by_class(self, class_ids: list) -> dict:
+        """Count non-trainer bookings for several classes in one query; {class_id: count}"""
+        if not class_ids:
+            return {}
+        counts = self.collection.aggregate([
+            {"$match": {CLASS_ID: {"$in": class_ids}, IS_TRAINER: False}},
+            {"$group": {"_id": f"${CLASS_ID}", "count": {"$sum": 1}}},
+        ])
+        return {count["_id"]: count["count"] for count in counts}
+
     def delete_all_bookings(self):
         """Delete all bookings (for testing)"""
         self.collection.delete_many({})
@@ -25,6 +25,8 @@ class ClassResource:
 
     def __init__(self):
         self.collection = DB.get_collection(CLASS_COLLECTION)
+        # Serves upcoming-class listings and the scheduled reminder window scan
+        self.collection.create_index(START_DATE)
 
     def create_class(self, class_data=None, **legacy_fields):
         """Create a new fitness class from a single payload object or dict."""
@@ -38,6 +40,11 @@ class ClassResource:
         classes = self.collection.find({START_DATE: {"$gte": now}}).sort(START_DATE, 1)
         return serialize_items(list(classes))
 
+    def get_classes_starting_between(self, start: datetime, end: datetime):
+        """Get classes whose start date falls in [start, end), using the start_date index"""
+        classes = self.collection.find({START_DATE: {"$gte": start, "$lt": end}}).sort(START_DATE, 1)
+        return serialize_items(list(classes))
+
     def get_class_by_id(self, class_id: str):
         """Get class by ID"""
         try:
@@ -62,6 +69,25 @@ class ClassResource:
         })
         return overlapping is not None
 
+    def init_remaining_spots(self, class_id: str, remaining_spots: int):
+        """Store the open-spot counter on a class created before it existed. A no-op once it is set."""
+        self.collection.update_one(
+            {"_id": ObjectId(class_id), REMAINING_SPOTS: {"$exists": False}},
+            {"$set": {REMAINING_SPOTS: max(remaining_spots, 0)}},
+        )
+
+    def reserve_spot(self, class_id: str) -> bool:
+        """Atomically take one open spot. Never more callers than there are spots get True."""
+        result = self.collection.update_one(
+            {"_id": ObjectId(class_id), REMAINING_SPOTS: {"$gt": 0}},
+            {"$inc": {REMAINING_SPOTS: -1}},
+        )
+        return result.modified_count == 1
+
+    def release_spot(self, class_id: str):
+        """Give back a spot taken by reserve_spot whose booking was not stored."""
+        self.collection.update_one({"_id": ObjectId(class_id)}, {"$inc": {REMAINING_SPOTS: 1}})
+
     def get_class_id(self, cls: dict) -> str:
         return str(cls.get("_id"))
 
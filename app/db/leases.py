@@ -0,0 +1,109 @@
+from app.db import DB
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# Lease Collection Name
+LEASE_COLLECTION = "leases"
+
+# Lease fields (the lease name is the document _id)
+OWNER = "owner"
+FENCING_TOKEN = "fencing_token"
+EXPIRES_AT = "expires_at"
+COMPLETED_AT = "completed_at"
+PURGE_AT = "purge_at"
+
+# Idle lease documents are kept this long after expiring before the TTL index removes them
+DEFAULT_PURGE_AFTER = timedelta(days=7)
+
+
+@dataclass(frozen=True)
+class Lease:
+    name: str
+    owner: str
+    fencing_token: int
+    expires_at: datetime
+
+
+class LeaseResource:
+    """
+    Named, expiring locks shared by every replica through Mongo.
+
+    A lease belongs to one owner until it expires or is released. Every acquisition
+    increments the fencing token. Renewal and release match on the token, and a
+    holder checks is_current before acting on what it did under the lease (the
+    reminder scan does so after claiming bookings), so one that stalled past its
+    expiry while someone else took over backs off instead of carrying on.
+    """
+
+    def __init__(self, purge_after: timedelta = DEFAULT_PURGE_AFTER):
+        self.collection = DB.get_collection(LEASE_COLLECTION)
+        self.purge_after = purge_after
+        # Purging lags well behind expiry so a recreated lease never reuses an old fencing token
+        self.collection.create_index(PURGE_AT, expireAfterSeconds=0)
+
+    def acquire(self, name: str, owner: str, ttl_seconds: float, min_interval_seconds: float = 0):
+        """
+        Take the lease if it is free, or return None.
+
+        With min_interval_seconds, the lease is also refused until that long after the
+        last completed run, so a periodic job runs once per interval across replicas.
+        """
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        query = {"_id": name, EXPIRES_AT: {"$lte": now}}
+        if min_interval_seconds:
+            query["$or"] = [
+                {COMPLETED_AT: None},
+                {COMPLETED_AT: {"$lte": now - timedelta(seconds=min_interval_seconds)}},
+            ]
+
+        try:
+            # A missing lease is created by the upsert; an existing one that does not match
+            # the query makes the upsert collide on _id, meaning somebody else holds it
+            lease = self.collection.find_one_and_update(
+                query,
+                {
+                    "$set": {OWNER: owner, EXPIRES_AT: expires_at, PURGE_AT: expires_at + self.purge_after},
+                    "$inc": {FENCING_TOKEN: 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return None
+        return Lease(name, owner, lease[FENCING_TOKEN], expires_at)
+
+    def renew(self, lease: Lease, ttl_seconds: float):
+        """Extend a lease that is still held. Returns the renewed lease, or None if it was lost."""
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        result = self.collection.update_one(
+            {**self._held(lease), EXPIRES_AT: {"$gt": now}},
+            {"$set": {EXPIRES_AT: expires_at, PURGE_AT: expires_at + self.purge_after}},
+        )
+        if result.matched_count != 1:
+            return None
+        return Lease(lease.name, lease.owner, lease.fencing_token, expires_at)
+
+    def release(self, lease: Lease, completed: bool = False) -> bool:
+        """Give the lease up early. completed=True also starts the next interval."""
+        now = datetime.now(timezone.utc)
+        update = {EXPIRES_AT: now, PURGE_AT: now + self.purge_after}
+        if completed:
+            update[COMPLETED_AT] = now
+        result = self.collection.update_one(self._held(lease), {"$set": update})
+        return result.matched_count == 1
+
+    def is_current(self, name: str, fencing_token: int) -> bool:
+        """Whether fencing_token is still the latest one issued for the lease"""
+        return self.collection.count_documents({"_id": name, FENCING_TOKEN: {"$lte": fencing_token}}) == 1
+
+    def _held(self, lease: Lease):
+        # The token is part of the match so a holder that was taken over cannot touch the new lease
+        return {"_id": lease.name, OWNER: lease.owner, FENCING_TOKEN: lease.fencing_token}
+
+    def delete_all_leases(self):
+        """Delete all leases (for testing)"""
+        self.collection.delete_many({})
@@ -0,0 +1,122 @@
+from app.db.utils import serialize_item, serialize_items
+from app.db import DB
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Notification Dead Letter Collection Name
+NOTIFICATION_DEAD_LETTER_COLLECTION = "notification_dead_letters"
+
+# Dead letter fields
+BOOKING_ID = "booking_id"
+CLASS_IDS = "class_ids"
+CHANNEL = "channel"
+RECIPIENT = "recipient"
+SUBJECT = "subject"
+BODY = "body"
+ERROR = "error"
+TRANSIENT = "transient"
+ATTEMPTS = "attempts"
+STATUS = "status"
+CREATED_AT = "created_at"
+UPDATED_AT = "updated_at"
+
+# Dead letter statuses
+STATUS_PENDING = "pending"
+STATUS_REPLAYING = "replaying"
+STATUS_REPLAYED = "replayed"
+
+# A replay that has held a letter this long is presumed dead and the letter is pending again
+REPLAY_CLAIM_SECONDS = 300
+
+
+class NotificationDeadLetterResource:
+
+    def __init__(self):
+        self.collection = DB.get_collection(NOTIFICATION_DEAD_LETTER_COLLECTION)
+        # Serves listing and replaying the oldest pending letters
+        self.collection.create_index([(STATUS, 1), (CREATED_AT, 1)])
+        # Serves the same for one trainer's classes
+        self.collection.create_index([(CLASS_IDS, 1), (STATUS, 1), (CREATED_AT, 1)])
+
+    def add_dead_letters(self, letters: list):
+        """Store notifications that failed after all retries"""
+        if not letters:
+            return []
+        now = datetime.now()
+        documents = [{**letter, STATUS: STATUS_PENDING, CREATED_AT: now, UPDATED_AT: now} for letter in letters]
+        return self.collection.insert_many(documents).inserted_ids
+
+    def get_pending(self, ids: list = None, limit: int = 0, class_ids: list = None):
+        """
+        Pending dead letters, oldest first; only the given ids when ids is set, and only letters
+        about nothing but the given classes when class_ids is set
+        """
+        query = self._replayable()
+        if ids is not None:
+            query["_id"] = {"$in": self._object_ids(ids)}
+        if class_ids is not None:
+            query[CLASS_IDS] = {"$in": class_ids, "$not": {"$elemMatch": {"$nin": class_ids}}}
+        cursor = self.collection.find(query).sort(CREATED_AT, 1)
+        if limit:
+            cursor = cursor.limit(limit)
+        return serialize_items(list(cursor))
+
+    def claim_for_replay(self, letter_id: str) -> bool:
+        """Take a pending letter for one replay; False if another replay already holds it"""
+        query = self._replayable()
+        query["_id"] = ObjectId(letter_id)
+        claimed = self.collection.find_one_and_update(
+            query, {"$set": {STATUS: STATUS_REPLAYING, UPDATED_AT: datetime.now()}}
+        )
+        return claimed is not None
+
+    def mark_replayed(self, ids: list):
+        self.collection.update_many(
+            {"_id": {"$in": self._object_ids(ids)}, STATUS: STATUS_REPLAYING},
+            {"$set": {STATUS: STATUS_REPLAYED, UPDATED_AT: datetime.now()}},
+        )
+
+    def release_claims(self, ids: list):
+        """Return claimed letters a replay did not get to back to pending, unchanged"""
+        self.collection.update_many(
+            {"_id": {"$in": self._object_ids(ids)}, STATUS: STATUS_REPLAYING},
+            {"$set": {STATUS: STATUS_PENDING, UPDATED_AT: datetime.now()}},
+        )
+
+    def record_failure(self, letter_id: str, error: str, transient: bool, attempts: int):
+        """Return a claimed letter to pending after another failed replay"""
+        self.collection.update_one(
+            {"_id": ObjectId(letter_id), STATUS: STATUS_REPLAYING},
+            {
+                "$set": {STATUS: STATUS_PENDING, ERROR: error, TRANSIENT: transient, UPDATED_AT: datetime.now()},
+                "$inc": {ATTEMPTS: attempts},
+            },
+        )
+
+    def _replayable(self) -> dict:
+        stale = datetime.now() - timedelta(seconds=REPLAY_CLAIM_SECONDS)
+        return {"$or": [
+            {STATUS: STATUS_PENDING},
+            {STATUS: STATUS_REPLAYING, UPDATED_AT: {"$lt": stale}},
+        ]}
+
+    def get_dead_letter(self, letter_id: str):
+        """Get dead letter by ID"""
+        object_ids = self._object_ids([letter_id])
+        if not object_ids:
+            return None
+        return serialize_item(self.collection.find_one({"_id": object_ids[0]}))
+
+    def _object_ids(self, ids: list):
+        object_ids = []
+        for letter_id in ids:
+            try:
+                object_ids.append(ObjectId(letter_id))
+            except (InvalidId, TypeError):
+                continue
+        return object_ids
+
+    def delete_all_dead_letters(self):
+        """Delete all dead letters (for testing)"""
+        self.collection.delete_many({})
@@ -0,0 +1,123 @@
+from app.db.utils import serialize_item
+from app.db import DB
+from datetime import datetime, timedelta
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+# Reminder Job Collection Name
+REMINDER_JOB_COLLECTION = "reminder_jobs"
+
+# Reminder job fields
+CLASS_ID = "class_id"
+TRAINER_ID = "trainer_id"
+STATUS = "status"
+CREATED_AT = "created_at"
+STARTED_AT = "started_at"
+FINISHED_AT = "finished_at"
+LEASE_OWNER = "lease_owner"
+LEASE_EXPIRES_AT = "lease_expires_at"
+ATTEMPTS = "attempts"
+RESULTS = "results"
+SENT_COUNT = "sent"
+FAILED_COUNT = "failed"
+ERROR = "error"
+
+# Job statuses
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class ReminderJobResource:
+
+    def __init__(self):
+        self.collection = DB.get_collection(REMINDER_JOB_COLLECTION)
+        # Serves the claim query: queued jobs, or running jobs whose lease has expired
+        self.collection.create_index([(STATUS, 1), (LEASE_EXPIRES_AT, 1), (CREATED_AT, 1)])
+
+    def enqueue(self, class_id: str, trainer_id: str):
+        """Queue a reminder job for a class"""
+        job = {
+            CLASS_ID: class_id,
+            TRAINER_ID: trainer_id,
+            STATUS: STATUS_QUEUED,
+            CREATED_AT: datetime.now(),
+            ATTEMPTS: 0,
+            RESULTS: [],
+            SENT_COUNT: 0,
+            FAILED_COUNT: 0,
+        }
+        result = self.collection.insert_one(job)
+        return result.inserted_id
+
+    def claim_next(self, owner: str, lease_seconds: int):
+        """Atomically lease the oldest runnable job to owner, or return None"""
+        now = datetime.now()
+        job = self.collection.find_one_and_update(
+            {"$or": [
+                {STATUS: STATUS_QUEUED},
+                {STATUS: STATUS_RUNNING, LEASE_EXPIRES_AT: {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    STATUS: STATUS_RUNNING,
+                    LEASE_OWNER: owner,
+                    LEASE_EXPIRES_AT: now + timedelta(seconds=lease_seconds),
+                    STARTED_AT: now,
+                },
+                "$inc": {ATTEMPTS: 1},
+            },
+            sort=[(CREATED_AT, 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return serialize_item(job)
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: int) -> bool:
+        """Extend the lease; False means another worker has taken the job over"""
+        result = self.collection.update_one(
+            self._owned_by(job_id, owner),
+            {"$set": {LEASE_EXPIRES_AT: datetime.now() + timedelta(seconds=lease_seconds)}},
+        )
+        return result.matched_count == 1
+
+    def record_results(self, job_id: str, owner: str, results: list) -> bool:
+        """Append per-recipient results while owner still holds the lease"""
+        sent = sum(1 for result in results if result["status"] == "sent")
+        update = self.collection.update_one(
+            self._owned_by(job_id, owner),
+            {
+                "$push": {RESULTS: {"$each": results}},
+                "$inc": {SENT_COUNT: sent, FAILED_COUNT: len(results) - sent},
+            },
+        )
+        return update.matched_count == 1
+
+    def finish(self, job_id: str, owner: str, status: str, error: str = None) -> bool:
+        """Mark a leased job as completed or failed"""
+        result = self.collection.update_one(
+            self._owned_by(job_id, owner),
+            {
+                "$set": {STATUS: status, FINISHED_AT: datetime.now(), ERROR: error},
+                "$unset": {LEASE_OWNER: "", LEASE_EXPIRES_AT: ""},
+            },
+        )
+        return result.matched_count == 1
+
+    def get_job(self, job_id: str):
+        """Get reminder job by ID"""
+        try:
+            object_id = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+
+        job = self.collection.find_one({"_id": object_id})
+        return serialize_item(job)
+
+    def _owned_by(self, job_id: str, owner: str):
+        return {"_id": ObjectId(job_id), STATUS: STATUS_RUNNING, LEASE_OWNER: owner}
+
+    def delete_all_jobs(self):
+        """Delete all reminder jobs (for testing)"""
+        self.collection.delete_many({})
@@ -0,0 +1,41 @@
+from app.db import DB
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
+
+# Revoked Token Collection Name
+REVOKED_TOKEN_COLLECTION = "revoked_tokens"
+
+# Revoked token fields
+JTI = "jti"
+EXPIRES_AT = "expires_at"
+REVOKED_AT = "revoked_at"
+
+
+class RevokedTokenResource:
+
+    def __init__(self):
+        self.collection = DB.get_collection(REVOKED_TOKEN_COLLECTION)
+        # Unique index gives O(1) lookups and makes revocation a single atomic insert
+        self.collection.create_index(JTI, unique=True)
+        # Entries are only needed until the token would have expired anyway
+        self.collection.create_index(EXPIRES_AT, expireAfterSeconds=0)
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        """Revoke a token by its jti. Returns False if it was already revoked."""
+        try:
+            self.collection.insert_one({
+                JTI: jti,
+                EXPIRES_AT: datetime.fromtimestamp(expires_at, timezone.utc),
+                REVOKED_AT: datetime.now(timezone.utc),
+            })
+        except DuplicateKeyError:
+            return False
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        """Check if a token has been revoked"""
+        return self.collection.find_one({JTI: jti}, {"_id": 1}) is not None
+
+    def delete_all_revoked_tokens(self):
+        """Delete all revoked tokens (for testing)"""
+        self.collection.delete_many({})
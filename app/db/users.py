@@ -1,6 +1,12 @@
 from app.db.utils import serialize_item, serialize_items
 from app.db import DB
+from app.server_timing import AUTH, span
+from dataclasses import dataclass, field, replace
+import logging
+import threading
+import time
 import bcrypt
+from pymongo.errors import BulkWriteError
 
 # User Collection Name
 USER_COLLECTION = "users"
@@ -8,6 +14,8 @@ USER_COLLECTION = "users"
 # User fields
 EMAIL = "email"
 PASSWORD = "password"
+PASSWORD_ALGORITHM = "password_algorithm"
+PASSWORD_COST = "password_cost"
 BIRTHDAY = "birthday"
 NAME = "name"
 ROLE = "role"
@@ -16,47 +24,255 @@ ROLE = "role"
 ROLE_MEMBER = "member"
 ROLE_TRAINER = "trainer"
 
+# Password hash algorithms
+ALGORITHM_BCRYPT = "bcrypt"
+ALGORITHM_ARGON2ID = "argon2id"
+
+# Fields never returned to callers (security)
+PASSWORD_FIELDS = (PASSWORD, PASSWORD_ALGORITHM, PASSWORD_COST)
+
+# MongoDB error code for unique index violations
+DUPLICATE_KEY_ERROR = 11000
+
+# bcrypt rounds used when no calibration has been done (same as bcrypt.gensalt())
+DEFAULT_BCRYPT_ROUNDS = 12
+# Rounds used to take the calibration sample; cheap but well above timer noise
+CALIBRATION_BCRYPT_ROUNDS = 6
+CALIBRATION_SAMPLES = 5
+
+
+def _argon2_hasher(**params):
+    try:
+        from argon2 import PasswordHasher, Type
+    except ImportError as error:
+        raise RuntimeError("argon2id password hashing requires the argon2-cffi package") from error
+    return PasswordHasher(type=Type.ID, **params)
+
+
+@dataclass(frozen=True)
+class PasswordHashPolicy:
+    """
+    Algorithm and cost used for new password hashes.
+
+    The algorithm and cost are stored next to each user's hash, so a policy change
+    (new hardware, new target latency, switch to argon2id) is detected on the next
+    successful login and the password is rehashed then. Only a weaker hash is
+    replaced: a replica that calibrated a little lower leaves a stronger one alone.
+    """
+    algorithm: str = ALGORITHM_BCRYPT
+    bcrypt_rounds: int = DEFAULT_BCRYPT_ROUNDS
+    argon2_time_cost: int = 3
+    argon2_memory_kib: int = 65536
+    argon2_parallelism: int = 4
+    calibrated_ms: float = field(default=None, compare=False)
+
+    @classmethod
+    def calibrate(cls, algorithm: str = ALGORITHM_BCRYPT, target_ms: float = 250,
+                  min_bcrypt_rounds: int = 10, max_bcrypt_rounds: int = 16, **argon2_params):
+        """Measure this machine and return the strongest policy that hashes within target_ms."""
+        policy = cls(algorithm=algorithm, **argon2_params)
+        if algorithm == ALGORITHM_BCRYPT:
+            sample = replace(policy, bcrypt_rounds=CALIBRATION_BCRYPT_ROUNDS)
+            sample_ms = sample._measure_ms(CALIBRATION_SAMPLES)
+            rounds = CALIBRATION_BCRYPT_ROUNDS
+            # Each bcrypt round doubles (or halves) the work
+            while rounds < max_bcrypt_rounds and sample_ms * 2 <= target_ms:
+                sample_ms *= 2
+                rounds += 1
+            while rounds > min_bcrypt_rounds and sample_ms > target_ms:
+                sample_ms /= 2
+                rounds -= 1
+            policy = replace(policy, bcrypt_rounds=min(max(rounds, min_bcrypt_rounds), max_bcrypt_rounds))
+        elif algorithm == ALGORITHM_ARGON2ID:
+            # argon2 time cost scales linearly; memory stays as configured
+            sample_ms = replace(policy, argon2_time_cost=1)._measure_ms(CALIBRATION_SAMPLES)
+            policy = replace(policy, argon2_time_cost=max(1, int(target_ms // max(sample_ms, 0.001))))
+        else:
+            raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+
+        return replace(policy, calibrated_ms=policy._measure_ms())
+
+    @property
+    def cost(self) -> dict:
+        if self.algorithm == ALGORITHM_ARGON2ID:
+            return {
+                "time_cost": self.argon2_time_cost,
+                "memory_kib": self.argon2_memory_kib,
+                "parallelism": self.argon2_parallelism,
+            }
+        return {"rounds": self.bcrypt_rounds}
+
+    def hash(self, password: str):
+        if self.algorithm == ALGORITHM_ARGON2ID:
+            hasher = _argon2_hasher(
+                time_cost=self.argon2_time_cost,
+                memory_cost=self.argon2_memory_kib,
+                parallelism=self.argon2_parallelism,
+            )
+            return hasher.hash(password)
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.bcrypt_rounds))
+
+    @staticmethod
+    def verify(password: str, hashed, algorithm: str = ALGORITHM_BCRYPT) -> bool:
+        if algorithm == ALGORITHM_ARGON2ID:
+            from argon2.exceptions import VerificationError, InvalidHashError
+            try:
+                # Parameters are encoded in the hash itself
+                return _argon2_hasher().verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return bcrypt.checkpw(password.encode('utf-8'), hashed)
+
+    def needs_rehash(self, user: dict) -> bool:
+        """True for a hash made with another algorithm or with less of any cost parameter than this policy."""
+        if stored_algorithm(user) != self.algorithm:
+            return True
+        cost = stored_cost(user)
+        return any(cost.get(name, 0) < value for name, value in self.cost.items())
+
+    def _measure_ms(self, samples: int = 1) -> float:
+        """Fastest of `samples` hashes; slower ones measured interference, not the hash."""
+        timings = []
+        for _ in range(samples):
+            started_at = time.perf_counter()
+            self.hash("calibration-password")
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return min(timings)
+
+
+DEFAULT_HASH_POLICY = PasswordHashPolicy()
+
+
+def stored_algorithm(user: dict) -> str:
+    return user.get(PASSWORD_ALGORITHM, ALGORITHM_BCRYPT)
+
+
+def stored_cost(user: dict) -> dict:
+    if PASSWORD_COST in user:
+        return user[PASSWORD_COST]
+    # Users created before costs were stored: bcrypt hashes look like $2b$12$...
+    return {"rounds": int(user[PASSWORD][4:6])}
+
 
 class UserResource:
 
-    def __init__(self):
+    def __init__(self, hash_executor=None, hash_policy: PasswordHashPolicy = DEFAULT_HASH_POLICY,
+                 get_hash_policy=None):
         self.collection = DB.get_collection(USER_COLLECTION)
         # Ensure email is unique at database level
         self.collection.create_index(EMAIL, unique=True)
+        # Optional pool (see PasswordHashPool) that runs hashing off the request thread
+        self.hash_executor = hash_executor
+        # get_hash_policy, when given, supplies the policy on first use, so it can be calibrated lazily
+        self._get_hash_policy = get_hash_policy or (lambda: hash_policy)
+
+    @property
+    def hash_policy(self) -> PasswordHashPolicy:
+        return self._get_hash_policy()
 
     def create_user(self, email: str, password: str, name: str, birthday: str, role: str = ROLE_MEMBER):
         """Create a new user with hashed password"""
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-        user = {
+        hashed_password = self._run_hash(self.hash_policy.hash, password)
+        user = self._user_document(email, hashed_password, name, birthday, role)
+        result = self.collection.insert_one(user)
+        return result.inserted_id
+
+    def create_users(self, users: list, hashed_passwords: list):
+        """
+        Insert many users with already hashed passwords in one unordered batch.
+        Duplicate emails are rejected by the unique index, not by a lookup first.
+        Returns one (user_id, error) pair per user, in input order.
+        """
+        if not users:
+            return []
+
+        documents = [
+            self._user_document(user[EMAIL], hashed_password, user[NAME], user[BIRTHDAY], user.get(ROLE, ROLE_MEMBER))
+            for user, hashed_password in zip(users, hashed_passwords)
+        ]
+        write_errors = {}
+        try:
+            self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            write_errors = {write_error["index"]: write_error for write_error in error.details["writeErrors"]}
+
+        results = []
+        for index, document in enumerate(documents):
+            write_error = write_errors.get(index)
+            if write_error is None:
+                results.append((document["_id"], None))
+            elif write_error["code"] == DUPLICATE_KEY_ERROR:
+                results.append((None, "User already exists"))
+            else:
+                results.append((None, write_error["errmsg"]))
+        return results
+
+    def _user_document(self, email: str, hashed_password, name: str, birthday: str, role: str):
+        return {
             EMAIL: email,
             PASSWORD: hashed_password,
+            PASSWORD_ALGORITHM: self.hash_policy.algorithm,
+            PASSWORD_COST: self.hash_policy.cost,
             NAME: name,
             BIRTHDAY: birthday,
             ROLE: role
         }
-        result = self.collection.insert_one(user)
-        return result.inserted_id
 
     def get_user_by_email(self, email: str):
         """Get user by email"""
         user = self.collection.find_one({EMAIL: email})
-        if user and PASSWORD in user:
-            user.pop(PASSWORD, None)  # Remove password from returned data (security)
-        return serialize_item(user)
+        return serialize_item(self._strip_password(user))
 
     def verify_password(self, email: str, password: str):
-        """Verify user password"""
+        """Verify user password, rehashing it in the background if the hash policy changed"""
         user = self.collection.find_one({EMAIL: email})
-        if user and bcrypt.checkpw(password.encode('utf-8'), user[PASSWORD]):
-            user.pop(PASSWORD, None)  # Remove password from returned data (security)
-            return serialize_item(user)
+        if user and self._run_hash(PasswordHashPolicy.verify, password, user[PASSWORD], stored_algorithm(user)):
+            if self.hash_policy.needs_rehash(user):
+                self._rehash_in_background({"_id": user["_id"], EMAIL: email, PASSWORD: user[PASSWORD]}, password)
+            return serialize_item(self._strip_password(user))
         return None
 
+    def _run_hash(self, fn, *args):
+        with span(AUTH):
+            if self.hash_executor is None:
+                return fn(*args)
+            return self.hash_executor.run(fn, *args)
+
+    def _rehash_in_background(self, user: dict, password: str):
+        try:
+            if self.hash_executor is None:
+                threading.Thread(target=self.rehash_password, args=(user, password), daemon=True).start()
+            else:
+                self.hash_executor.submit(self.rehash_password, user, password)
+        except Exception as error:
+            # Rehashing is best-effort; the next login will try again
+            logging.warning(f"Skipping password rehash for {user.get(EMAIL)}: {error}")
+
+    def rehash_password(self, user: dict, password: str):
+        """Store a new hash of password under the current policy"""
+        new_hash = self.hash_policy.hash(password)
+        # Only replace the hash we verified, never a password changed in the meantime
+        self.collection.update_one(
+            {"_id": user["_id"], PASSWORD: user[PASSWORD]},
+            {"$set": {
+                PASSWORD: new_hash,
+                PASSWORD_ALGORITHM: self.hash_policy.algorithm,
+                PASSWORD_COST: self.hash_policy.cost,
+            }},
+        )
+
+    @staticmethod
+    def _strip_password(user: dict):
+        if user:
+            for password_field in PASSWORD_FIELDS:
+                user.pop(password_field, None)  # Remove password from returned data (security)
+        return user
+
     def get_all_members(self):
         """Get all members"""
         members = self.collection.find(
             {ROLE: ROLE_MEMBER},
-            {"password": 0}  # Remove password from returned data (security)
+            {password_field: 0 for password_field in PASSWORD_FIELDS}  # Remove password from returned data (security)
         )
         return serialize_items(list(members))
 
@@ -1,4 +1,5 @@
 from app.db.constants import ID
+from app.server_timing import SERIALIZE, span
 from datetime import datetime
 
 
@@ -44,4 +45,5 @@ def serialize_items(items):
     Returns:
         list: A list of serialized items.
     """
-    return [serialize_item(item) for item in items]
+    with span(SERIALIZE):
+        return [serialize_item(item) for item in items]
@@ -0,0 +1,58 @@
+import functools
+import logging
+from datetime import timedelta
+
+from flask_apscheduler import APScheduler
+
+from app.services.container import get_services
+from app.services.leased_job import leased
+
+SCHEDULED_REMINDERS_JOB = "scheduled-reminders"
+
+
+def init_scheduler(app):
+    """Start the periodic reminder scan when SCHEDULER_ENABLED is set."""
+    if not app.config["SCHEDULER_ENABLED"]:
+        return None
+
+    scheduler = APScheduler()
+    scheduler.init_app(app)
+    # Every replica polls often; the lease lets one of them run the scan once per interval
+    scan = leased(
+        SCHEDULED_REMINDERS_JOB,
+        ttl_seconds=app.config["SCHEDULER_LEASE_TTL_SECONDS"],
+        interval_seconds=app.config["REMINDER_SCAN_INTERVAL_SECONDS"],
+        lease_resource_factory=lambda: get_services().lease_resource,
+    )(send_scheduled_reminders)
+    scheduler.add_job(
+        id=SCHEDULED_REMINDERS_JOB,
+        func=_in_app_context,
+        args=[app, scan],
+        trigger="interval",
+        seconds=app.config["SCHEDULER_POLL_SECONDS"],
+        # A slow scan delays the next one instead of overlapping it
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    return scheduler
+
+
+def _in_app_context(app, job):
+    with app.app_context():
+        return job(app)
+
+
+def send_scheduled_reminders(app, lease=None):
+    """Run one reminder scan. Called inside an app context, which _in_app_context provides for the scheduler."""
+    window = timedelta(minutes=app.config["REMINDER_WINDOW_MINUTES"])
+    still_held = None
+    if lease:
+        # Checked once the bookings are claimed, so a replica that stalled past its lease backs off
+        still_held = functools.partial(get_services().lease_resource.is_current, lease.name, lease.fencing_token)
+    summary = get_services().reminder_service.send_upcoming_reminders(window, still_held=still_held)
+    if lease:
+        logging.info(f"Scheduled reminder scan (lease token {lease.fencing_token}): {summary}")
+    else:
+        logging.info(f"Scheduled reminder scan: {summary}")
+    return summary
@@ -0,0 +1,180 @@
+"""
+Server-Timing breakdown of each request.
+
+Every request gets a RequestTiming that adds up how long it spent in each phase:
+
+- auth: JWT verification and password hashing
+- db: MongoDB commands, from pymongo command monitoring
+- serialize: turning documents into API dicts and encoding the JSON response
+- notify: outbound email, Telegram and webhook calls
+
+Spans nest, and time spent in an inner span is taken off the outer one, so the
+revocation lookup inside JWT verification counts as db rather than auth. The
+totals are sent in a Server-Timing header, next to the request's total, so
+browser devtools and proxy logs can show where a slow request went.
+
+SERVER_TIMING decides who gets the header: "all", "trainers" (requests carrying
+a trainer token, the role that can already read /metrics) or "off". It defaults
+to "all" with DEBUG and to "trainers" otherwise. Work done on other threads,
+such as a reminder job's sends, has no request to report to and is not timed.
+"""
+
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from flask_jwt_extended.default_callbacks import default_decode_key_callback
+from flask_restx.representations import output_json
+from pymongo import monitoring
+
+from app.services.auth_context import ROLE_CLAIM
+
+SERVER_TIMING_HEADER = "Server-Timing"
+SERVER_TIMING_ALL = "all"
+SERVER_TIMING_OFF = "off"
+
+AUTH = "auth"
+DB = "db"
+SERIALIZE = "serialize"
+NOTIFY = "notify"
+TOTAL = "total"
+
+SPAN_DESCRIPTIONS = {
+    AUTH: "JWT and password checks",
+    DB: "MongoDB",
+    SERIALIZE: "Serialization",
+    NOTIFY: "Notifications",
+}
+
+
+class RequestTiming:
+    """Exclusive time per span for one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.totals = dict.fromkeys(SPAN_DESCRIPTIONS, 0.0)
+        # [name, since] for each open span, innermost last
+        self._open = []
+
+    def start(self, name: str):
+        now = time.perf_counter()
+        if self._open:
+            outer, since = self._open[-1]
+            self.totals[outer] += now - since
+        self._open.append([name, now])
+
+    def stop(self, name: str):
+        """Close the innermost open span called name, and any opened inside it."""
+        if not any(span[0] == name for span in self._open):
+            return
+        now = time.perf_counter()
+        while self._open:
+            current, since = self._open.pop()
+            self.totals[current] += now - since
+            if current == name:
+                break
+        if self._open:
+            self._open[-1][1] = now
+
+    def header(self) -> str:
+        """Close whatever is still open and format the totals as a Server-Timing value."""
+        while self._open:
+            self.stop(self._open[-1][0])
+        metrics = [f'{name};dur={seconds * 1000:.3f};desc="{SPAN_DESCRIPTIONS[name]}"'
+                   for name, seconds in self.totals.items()]
+        metrics.append(f"{TOTAL};dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+def current_timing():
+    """The RequestTiming of the request this thread is serving, if it is being timed."""
+    if not has_request_context():
+        return None
+    return g.get("server_timing")
+
+
+def start_span(name: str):
+    timing = current_timing()
+    if timing is not None:
+        timing.start(name)
+
+
+def stop_span(name: str):
+    timing = current_timing()
+    if timing is not None:
+        timing.stop(name)
+
+
+@contextmanager
+def span(name: str):
+    """Count the enclosed block toward span name of the current request; a no-op outside requests."""
+    timing = current_timing()
+    if timing is None:
+        yield
+        return
+    timing.start(name)
+    try:
+        yield
+    finally:
+        timing.stop(name)
+
+
+class ServerTimingListener(monitoring.CommandListener):
+    """Counts MongoDB commands toward the db span. pymongo calls it on the thread that sent the command."""
+
+    def started(self, event):
+        start_span(DB)
+
+    def succeeded(self, event):
+        stop_span(DB)
+
+    def failed(self, event):
+        stop_span(DB)
+
+
+COMMAND_LISTENER = ServerTimingListener()
+
+
+def init_server_timing(app, api, jwt, trainer_role: str):
+    """
+    Time every request and add the Server-Timing header for those SERVER_TIMING allows.
+    trainer_role is the role claim that "trainers" lets through.
+    """
+    @app.before_request
+    def start_timing():
+        if app.config["SERVER_TIMING"] != SERVER_TIMING_OFF:
+            g.server_timing = RequestTiming()
+
+    @app.after_request
+    def add_server_timing(response):
+        timing = g.pop("server_timing", None)
+        if timing is not None and (app.config["SERVER_TIMING"] == SERVER_TIMING_ALL or _role() == trainer_role):
+            response.headers[SERVER_TIMING_HEADER] = timing.header()
+        return response
+
+    # Verification starts by fetching the key to check the signature with; the blocklist
+    # loader in create_app closes the span once the token is known not to be revoked
+    @jwt.decode_key_loader
+    def decode_key(jwt_header, jwt_payload):
+        start_span(AUTH)
+        return default_decode_key_callback(jwt_header, jwt_payload)
+
+    @api.representation("application/json")
+    def timed_output_json(data, code, headers=None):
+        with span(SERIALIZE):
+            return output_json(data, code, headers)
+
+
+def _role():
+    """The role claim of the request's token, or None without a valid one."""
+    try:
+        return get_jwt().get(ROLE_CLAIM)
+    except RuntimeError:
+        pass
+    try:
+        # Public routes never verified a token; the role claim is all that is needed here
+        verify_jwt_in_request(optional=True, skip_revocation_check=True)
+        return get_jwt().get(ROLE_CLAIM)
+    except Exception:
+        return None
@@ -1,14 +1,16 @@
 from http import HTTPStatus
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, create_refresh_token
 from app.db.constants import ID
+from app.db.revoked_tokens import RevokedTokenResource
 from app.db.users import UserResource, EMAIL, PASSWORD, NAME, BIRTHDAY, ROLE, ROLE_MEMBER, ROLE_TRAINER
 from app.services.auth_context import ROLE_CLAIM, USER_ID_CLAIM
 
 
 class AuthService:
 
-    def __init__(self):
-        self.user_resource = UserResource()
+    def __init__(self, user_resource: UserResource = None, revoked_token_resource: RevokedTokenResource = None):
+        self.user_resource = user_resource or UserResource()
+        self.revoked_token_resource = revoked_token_resource or RevokedTokenResource()
 
     def register_user(self, data: dict):
         """Validate, create a new user, and return a JWT token."""
@@ -34,13 +36,8 @@ class AuthService:
                 return {"message": "User already exists"}, HTTPStatus.BAD_REQUEST
             raise
 
-        access_token = create_access_token(
-            identity=email,
-            additional_claims={ROLE_CLAIM: role, USER_ID_CLAIM: str(user_id)}
-        )
-
         return {
-            "access_token": access_token,
+            **self._issue_tokens(email, role, str(user_id)),
             "user": {EMAIL: email, NAME: name, ROLE: role, ID: str(user_id)}
         }, HTTPStatus.CREATED
 
@@ -56,13 +53,27 @@ class AuthService:
         if not user:
             return {"message": "Invalid email or password"}, HTTPStatus.UNAUTHORIZED
 
-        access_token = create_access_token(
-            identity=email,
-            additional_claims={ROLE_CLAIM: user[ROLE], USER_ID_CLAIM: user[ID]}
-        )
-
         user.pop(PASSWORD, None)
         return {
-            "access_token": access_token,
+            **self._issue_tokens(email, user[ROLE], user[ID]),
             "user": user
         }, HTTPStatus.OK
+
+    def refresh_tokens(self, identity: str, claims: dict):
+        """Rotate a refresh token: revoke the presented one and issue a new token pair."""
+        # The insert is atomic, so a refresh token replayed concurrently is only honoured once
+        if not self.revoked_token_resource.revoke(claims["jti"], claims["exp"]):
+            return {"message": "Refresh token has already been used. Please log in again."}, HTTPStatus.UNAUTHORIZED
+
+        return self._issue_tokens(identity, claims.get(ROLE_CLAIM), claims.get(USER_ID_CLAIM)), HTTPStatus.OK
+
+    def is_token_revoked(self, claims: dict) -> bool:
+        """Only refresh tokens are tracked, so access token checks never touch the database."""
+        return claims.get("type") == "refresh" and self.revoked_token_resource.is_revoked(claims["jti"])
+
+    def _issue_tokens(self, email: str, role: str, user_id: str):
+        additional_claims = {ROLE_CLAIM: role, USER_ID_CLAIM: user_id}
+        return {
+            "access_token": create_access_token(identity=email, additional_claims=additional_claims),
+            "refresh_token": create_refresh_token(identity=email, additional_claims=additional_claims),
+        }
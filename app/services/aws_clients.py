@@ -0,0 +1,39 @@
+import threading
+import boto3
+from botocore.config import Config as BotoConfig
+
+# One client per distinct setting, shared by every thread in the process
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_ses_client(region: str = "us-east-1", endpoint_url: str = None, max_pool_connections: int = 10,
+                   tcp_keepalive: bool = True, retry_mode: str = "standard", max_attempts: int = 3):
+    """
+    Return the process-wide SES client for these settings, creating it on first use.
+
+    Creating a client loads the service model and costs tens of milliseconds, while a
+    created client is thread-safe, so callers should share it. endpoint_url points the
+    client at a local SES stand-in.
+    """
+    key = ("ses", region, endpoint_url or None, max_pool_connections, tcp_keepalive, retry_mode, max_attempts)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # boto3's default session is not safe to share while creating clients, so use our own
+            client = boto3.session.Session().client(
+                "ses",
+                region_name=region,
+                endpoint_url=endpoint_url or None,
+                config=BotoConfig(
+                    max_pool_connections=max_pool_connections,
+                    tcp_keepalive=tcp_keepalive,
+                    retries={"mode": retry_mode, "total_max_attempts": max_attempts},
+                ),
+            )
+            _clients[key] = client
+    return client
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from pymongo.errors import DuplicateKeyError
 from app.db.bookings import (
     BookingResource,
     CHANNEL_EMAIL,
@@ -10,16 +11,19 @@ from app.db.bookings import (
     USER_EMAIL,
     USER_ID,
 )
-from app.db.classes import ClassResource, CAPACITY
+from app.db.classes import ClassResource, CAPACITY, REMAINING_SPOTS
 from app.db.users import UserResource, ROLE_MEMBER, ROLE_TRAINER, NAME
 
 
 class BookingService:
 
-    def __init__(self):
-        self.booking_resource = BookingResource()
-        self.class_resource = ClassResource()
-        self.user_resource = UserResource()
+    def __init__(self, booking_resource: BookingResource = None, class_resource: ClassResource = None,
+                 user_resource: UserResource = None, notification_channels=None):
+        self.booking_resource = booking_resource or BookingResource()
+        self.class_resource = class_resource or ClassResource()
+        self.user_resource = user_resource or UserResource()
+        # Returns the channels members may pick: only those the deployment can deliver on
+        self.notification_channels = notification_channels or (lambda: [CHANNEL_EMAIL, CHANNEL_TELEGRAM])
 
     def create_booking(self, user_id: str, user_email: str, role: str, data: dict):
         """Validate and create a new class booking for a member."""
@@ -39,7 +43,20 @@ class BookingService:
         if error:
             return error
 
-        booking_id = self._create_booking(class_id, user_id, user_email, user)
+        error = self._reserve_spot(class_id, fitness_class)
+        if error:
+            return error
+
+        try:
+            booking_id = self._create_booking(class_id, user_id, user_email, user)
+        except DuplicateKeyError:
+            # A concurrent request from the same member stored its booking first
+            self.class_resource.release_spot(class_id)
+            return self._already_booked()
+        except Exception:
+            # The booking was not stored, so its spot must not stay taken
+            self.class_resource.release_spot(class_id)
+            raise
         return self._booking_created_response(booking_id, class_id, user_email)
 
     def _validate_booking_actor(self, user_id: str, role: str):
@@ -66,15 +83,28 @@ class BookingService:
         if not fitness_class:
             return None, ({"message": "Class not found"}, HTTPStatus.BAD_REQUEST)
 
+        # Fast path only; the unique (class_id, user_id) index is what rules out duplicates
         if self.booking_resource.check_existing_booking(class_id, user_id):
-            return None, ({"message": "You have already booked this class"}, HTTPStatus.CONFLICT)
-
-        member_count = self.booking_resource.count_member_bookings(class_id)
-        if member_count >= fitness_class.get(CAPACITY, 0):
-            return None, ({"message": "Class is full"}, HTTPStatus.CONFLICT)
+            return None, self._already_booked()
 
         return fitness_class, None
 
+    def _reserve_spot(self, class_id: str, fitness_class: dict):
+        """Take a spot from the class's counter, so concurrent bookings cannot exceed capacity."""
+        if REMAINING_SPOTS not in fitness_class:
+            # Classes created before the counter existed start from their current bookings
+            member_count = self.booking_resource.count_member_bookings(class_id)
+            self.class_resource.init_remaining_spots(class_id, fitness_class.get(CAPACITY, 0) - member_count)
+
+        if not self.class_resource.reserve_spot(class_id):
+            return {"message": "Class is full"}, HTTPStatus.CONFLICT
+
+        return None
+
+    @staticmethod
+    def _already_booked():
+        return {"message": "You have already booked this class"}, HTTPStatus.CONFLICT
+
     def _get_booking_user(self, user_email: str):
         user = self.user_resource.get_user_by_email(user_email)
         if not user:
@@ -138,7 +168,7 @@ class BookingService:
             return None, ({"message": "channels must be a non-empty list"}, HTTPStatus.BAD_REQUEST)
 
         normalized_channels = []
-        allowed_channels = {CHANNEL_EMAIL, CHANNEL_TELEGRAM}
+        allowed_channels = set(self.notification_channels())
         for channel in channels:
             if channel not in allowed_channels:
                 return None, ({"message": f"Unsupported notification channel: {channel}"}, HTTPStatus.BAD_REQUEST)
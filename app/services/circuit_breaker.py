@@ -0,0 +1,90 @@
+import threading
+import time
+
+from app.services.metrics import Metrics
+from app.services.notification_errors import TransientNotificationError
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+# Gauge values, so dashboards can plot the state over time
+STATE_GAUGE = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+
+class CircuitOpenError(TransientNotificationError):
+    """The channel's circuit is open, so the send was not attempted."""
+
+
+class DeadlineExceededError(TransientNotificationError):
+    """The job ran out of time before this send was attempted."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for a while.
+
+    Closed: calls go through; failure_threshold consecutive failures open the circuit.
+    Open: calls are refused until reset_timeout seconds have passed.
+    Half-open: one probe call is let through; success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30,
+                 metrics: Metrics = None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or Metrics()
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == STATE_OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                return STATE_HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now. A True in half-open state reserves the single probe."""
+        with self._lock:
+            if self._state == STATE_OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._set_state(STATE_HALF_OPEN)
+
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+
+        self.metrics.increment(f"circuit.{self.name}.rejected")
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != STATE_CLOSED:
+                self._set_state(STATE_CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = self.clock()
+                if self._state != STATE_OPEN:
+                    self._set_state(STATE_OPEN)
+                    self.metrics.increment(f"circuit.{self.name}.opened")
+
+    def _set_state(self, state: str):
+        self._state = state
+        self._publish()
+
+    def _publish(self):
+        self.metrics.set_gauge(f"circuit.{self.name}.state", STATE_GAUGE[self._state])
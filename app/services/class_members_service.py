@@ -6,9 +6,9 @@ from app.db.users import ROLE_TRAINER
 
 class ClassMembersService:
 
-    def __init__(self):
-        self.class_resource = ClassResource()
-        self.booking_resource = BookingResource()
+    def __init__(self, class_resource: ClassResource = None, booking_resource: BookingResource = None):
+        self.class_resource = class_resource or ClassResource()
+        self.booking_resource = booking_resource or BookingResource()
 
     def get_class_members(self, class_id: str, user_id: str, role: str):
         """Return the list of members booked in a class (trainer of the class only)."""
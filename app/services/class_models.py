@@ -8,6 +8,7 @@ from app.db.classes import (
     DESCRIPTION,
     END_DATE,
     LOCATION,
+    REMAINING_SPOTS,
     START_DATE,
     TITLE,
     TRAINER_ID,
@@ -187,4 +188,6 @@ class ClassRecord:
             LOCATION: self.location,
             DESCRIPTION: self.description,
             CREATED_AT: datetime.now(),
+            # Bookings take spots from this counter atomically, see ClassResource.reserve_spot
+            REMAINING_SPOTS: self.capacity,
         }
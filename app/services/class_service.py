@@ -1,5 +1,5 @@
 from http import HTTPStatus
-from app.db.classes import ClassResource
+from app.db.classes import ClassResource, REMAINING_SPOTS
 from app.db.bookings import BookingResource
 from app.db.users import UserResource, ROLE_TRAINER, NAME
 from app.services.class_models import CreateClassRequest
@@ -7,10 +7,11 @@ from app.services.class_models import CreateClassRequest
 
 class ClassService:
 
-    def __init__(self):
-        self.class_resource = ClassResource()
-        self.booking_resource = BookingResource()
-        self.user_resource = UserResource()
+    def __init__(self, class_resource: ClassResource = None, booking_resource: BookingResource = None,
+                 user_resource: UserResource = None):
+        self.class_resource = class_resource or ClassResource()
+        self.booking_resource = booking_resource or BookingResource()
+        self.user_resource = user_resource or UserResource()
 
     def create_class(self, trainer_email: str, role: str, data: dict):
         """Create a new fitness class after validating role, input, and scheduling."""
@@ -53,13 +54,20 @@ class ClassService:
     def get_upcoming_classes(self):
         """Return upcoming classes with remaining spots for the list endpoint."""
         upcoming_classes = self.class_resource.get_upcoming_classes()
+        # Classes keep their own counter; only those created before it existed need their bookings counted
+        legacy_counts = self.booking_resource.count_member_bookings_by_class([
+            self.class_resource.get_class_id(fitness_class)
+            for fitness_class in upcoming_classes
+            if REMAINING_SPOTS not in fitness_class
+        ])
         result = []
 
         for fitness_class in upcoming_classes:
-            class_id = self.class_resource.get_class_id(fitness_class)
-            capacity = self.class_resource.get_capacity(fitness_class)
-            booked_count = self.booking_resource.count_member_bookings(class_id)
-            remaining_spots = max(capacity - booked_count, 0)
+            if REMAINING_SPOTS in fitness_class:
+                remaining_spots = fitness_class[REMAINING_SPOTS]
+            else:
+                booked_count = legacy_counts.get(self.class_resource.get_class_id(fitness_class), 0)
+                remaining_spots = max(self.class_resource.get_capacity(fitness_class) - booked_count, 0)
             result.append(self.class_resource.to_dict(fitness_class, remaining_spots))
 
         return result, HTTPStatus.OK
@@ -0,0 +1,288 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flask import current_app
+
+from app.db.bookings import BookingResource, CHANNEL_EMAIL, CHANNEL_TELEGRAM, CHANNEL_WEBHOOK
+from app.db.classes import ClassResource
+from app.db.leases import LeaseResource
+from app.db.notification_dead_letters import NotificationDeadLetterResource
+from app.db.reminder_jobs import ReminderJobResource
+from app.db.revoked_tokens import RevokedTokenResource
+from app.db.users import PasswordHashPolicy, UserResource
+from app.services.auth_service import AuthService
+from app.services.aws_clients import get_ses_client
+from app.services.booking_service import BookingService
+from app.services.class_members_service import ClassMembersService
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.class_service import ClassService
+from app.services.dead_letter_service import DeadLetterService
+from app.services.metrics import Metrics
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_templates import DEFAULT_TEMPLATE_DIR, NotificationTemplates
+from app.services.password_hash_pool import PasswordHashPool
+from app.services.reminder_service import ReminderService
+from app.services.reminder_worker import ReminderWorker
+from app.services.retry_policy import RetryPolicy
+from app.services.ses_email_service import SESEmailService
+from app.services.smtp_email_service import SMTPEmailService
+from app.services.telegram_notification_service import TelegramNotificationService
+from app.services.user_import_service import UserImportService
+from app.services.webhook_notification_service import WebhookNotificationService
+
+
+SERVICES_EXTENSION = "services"
+
+
+class ServiceContainer:
+    """
+    Application-scoped holder for resources, services and notification clients.
+
+    Everything is built once per process in create_app() and shared by all request
+    threads. Resources and services keep no per-request state (pymongo collections
+    are thread-safe), so sharing them is safe. Notification clients are created
+    lazily under a lock because building them is slow and not every process sends
+    notifications.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._notification_dispatcher = None
+        self._reminder_service = None
+        self._user_import_service = None
+        self._user_import_executor = None
+        self._dead_letter_service = None
+        self._reminder_executor = None
+
+        self.metrics = Metrics()
+        self.password_hash_pool = PasswordHashPool(
+            max_workers=config["PASSWORD_HASH_WORKERS"],
+            queue_limit=config["PASSWORD_HASH_QUEUE_LIMIT"],
+            retry_after=config["PASSWORD_HASH_RETRY_AFTER"],
+            metrics=self.metrics,
+            queue_timeout=config["PASSWORD_HASH_QUEUE_TIMEOUT"] or None,
+        )
+
+        self._hash_policy = None
+        self.user_resource = UserResource(hash_executor=self.password_hash_pool,
+                                          get_hash_policy=lambda: self.hash_policy)
+        self.class_resource = ClassResource()
+        self.booking_resource = BookingResource()
+        self.revoked_token_resource = RevokedTokenResource()
+        self.lease_resource = LeaseResource()
+        self.dead_letter_resource = NotificationDeadLetterResource()
+        self.reminder_job_resource = ReminderJobResource()
+
+        self.auth_service = AuthService(self.user_resource, self.revoked_token_resource)
+        self.class_service = ClassService(self.class_resource, self.booking_resource, self.user_resource)
+        self.booking_service = BookingService(self.booking_resource, self.class_resource, self.user_resource,
+                                              notification_channels=self.notification_channels)
+        self.class_members_service = ClassMembersService(self.class_resource, self.booking_resource)
+
+    @property
+    def notification_dispatcher(self) -> NotificationDispatcher:
+        if self._notification_dispatcher is None:
+            with self._lock:
+                if self._notification_dispatcher is None:
+                    strategies = {
+                        CHANNEL_EMAIL: self._email_service(),
+                        CHANNEL_TELEGRAM: TelegramNotificationService(
+                            self.config["TELEGRAM_BOT_TOKEN"],
+                            base_url=self.config["TELEGRAM_API_BASE_URL"],
+                            pool_size=self.config["REMINDER_TELEGRAM_CONCURRENCY"],
+                            global_rate=self.config["TELEGRAM_GLOBAL_RATE"],
+                            chat_rate=self.config["TELEGRAM_CHAT_RATE"],
+                            max_retries=self.config["TELEGRAM_MAX_RETRIES"],
+                        ),
+                    }
+                    if CHANNEL_WEBHOOK in self.notification_channels():
+                        strategies[CHANNEL_WEBHOOK] = WebhookNotificationService(
+                            self.config["WEBHOOK_URL"],
+                            secret=self.config["WEBHOOK_SECRET"],
+                            batch_size=self.config["WEBHOOK_BATCH_SIZE"],
+                            pool_size=self.config["WEBHOOK_CONCURRENCY"],
+                            timeout=self.config["WEBHOOK_TIMEOUT"],
+                        )
+                    self._notification_dispatcher = NotificationDispatcher(
+                        strategies,
+                        channel_limits={
+                            CHANNEL_EMAIL: self.config["REMINDER_EMAIL_CONCURRENCY"],
+                            CHANNEL_TELEGRAM: self.config["REMINDER_TELEGRAM_CONCURRENCY"],
+                            CHANNEL_WEBHOOK: self.config["WEBHOOK_CONCURRENCY"],
+                        },
+                        retry_policy=RetryPolicy(
+                            max_attempts=self.config["NOTIFICATION_RETRY_ATTEMPTS"],
+                            base_delay=self.config["NOTIFICATION_RETRY_BASE_SECONDS"],
+                            max_delay=self.config["NOTIFICATION_RETRY_MAX_SECONDS"],
+                        ),
+                        dead_letter_resource=self.dead_letter_resource,
+                        breakers={
+                            channel: CircuitBreaker(
+                                channel,
+                                failure_threshold=self.config["CIRCUIT_FAILURE_THRESHOLD"],
+                                reset_timeout=self.config["CIRCUIT_RESET_SECONDS"],
+                                metrics=self.metrics,
+                            )
+                            for channel in strategies
+                        },
+                    )
+        return self._notification_dispatcher
+
+    def notification_channels(self) -> list:
+        """Channels reminders can go out on; webhook only once WEBHOOK_URL points somewhere."""
+        channels = [CHANNEL_EMAIL, CHANNEL_TELEGRAM]
+        if self.config["WEBHOOK_URL"]:
+            channels.append(CHANNEL_WEBHOOK)
+        return channels
+
+    def _email_service(self):
+        if self.config["EMAIL_BACKEND"] == "smtp":
+            return SMTPEmailService(
+                self.config["SES_SENDER_EMAIL"],
+                host=self.config["SMTP_HOST"],
+                port=self.config["SMTP_PORT"],
+                username=self.config["SMTP_USERNAME"],
+                password=self.config["SMTP_PASSWORD"],
+                starttls=self.config["SMTP_STARTTLS"],
+                use_ssl=self.config["SMTP_SSL"],
+                pool_size=self.config["SMTP_POOL_SIZE"],
+                timeout=self.config["SMTP_TIMEOUT"],
+                max_messages_per_connection=self.config["SMTP_MAX_MESSAGES_PER_CONNECTION"],
+            )
+        return SESEmailService(self.config["SES_SENDER_EMAIL"], client=self._ses_client())
+
+    def _ses_client(self):
+        return get_ses_client(
+            region=self.config["SES_REGION"],
+            endpoint_url=self.config["SES_ENDPOINT_URL"],
+            max_pool_connections=self.config["SES_MAX_POOL_CONNECTIONS"],
+            tcp_keepalive=self.config["SES_TCP_KEEPALIVE"],
+            retry_mode=self.config["SES_RETRY_MODE"],
+            max_attempts=self.config["SES_MAX_ATTEMPTS"],
+        )
+
+    @property
+    def reminder_service(self) -> ReminderService:
+        if self._reminder_service is None:
+            dispatcher = self.notification_dispatcher
+            with self._lock:
+                if self._reminder_service is None:
+                    self._reminder_executor = ThreadPoolExecutor(
+                        max_workers=self.config["REMINDER_MAX_WORKERS"],
+                        thread_name_prefix="reminder",
+                    )
+                    self._reminder_service = ReminderService(
+                        dispatcher,
+                        class_resource=self.class_resource,
+                        booking_resource=self.booking_resource,
+                        executor=self._reminder_executor,
+                        job_resource=self.reminder_job_resource,
+                        lease_seconds=self.config["REMINDER_JOB_LEASE_SECONDS"],
+                        batch_size=self.config["REMINDER_JOB_BATCH_SIZE"],
+                        max_attempts=self.config["REMINDER_JOB_MAX_ATTEMPTS"],
+                        deadline_seconds=self.config["REMINDER_JOB_DEADLINE_SECONDS"] or None,
+                        digest=self.config["REMINDER_DIGEST_ENABLED"],
+                        templates=NotificationTemplates(
+                            self.config["NOTIFICATION_TEMPLATE_DIR"] or DEFAULT_TEMPLATE_DIR,
+                            version=self.config["NOTIFICATION_TEMPLATE_VERSION"],
+                        ),
+                    )
+        return self._reminder_service
+
+    @property
+    def reminder_worker(self) -> ReminderWorker:
+        """A new worker each time: workers own a stop flag and an id, so they are not shared."""
+        return ReminderWorker(
+            self.reminder_job_resource,
+            self.reminder_service,
+            poll_seconds=self.config["REMINDER_WORKER_POLL_SECONDS"],
+        )
+
+    @property
+    def dead_letter_service(self) -> DeadLetterService:
+        if self._dead_letter_service is None:
+            dispatcher = self.notification_dispatcher
+            with self._lock:
+                if self._dead_letter_service is None:
+                    self._dead_letter_service = DeadLetterService(
+                        self.dead_letter_resource,
+                        dispatcher,
+                        self.class_resource,
+                        replay_limit=self.config["NOTIFICATION_REPLAY_LIMIT"],
+                        replay_deadline_seconds=self.config["NOTIFICATION_REPLAY_DEADLINE_SECONDS"],
+                    )
+        return self._dead_letter_service
+
+    @property
+    def user_import_service(self) -> UserImportService:
+        if self._user_import_service is None:
+            with self._lock:
+                if self._user_import_service is None:
+                    workers = self.config["USER_IMPORT_HASH_WORKERS"]
+                    # spawn, not fork: forking a process that already runs request threads is unsafe
+                    self._user_import_executor = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    self._user_import_service = UserImportService(
+                        self.user_resource,
+                        self._user_import_executor,
+                        hash_workers=workers,
+                        max_rows=self.config["USER_IMPORT_MAX_ROWS"],
+                        hash_pool=self.password_hash_pool,
+                    )
+        return self._user_import_service
+
+    @property
+    def hash_policy(self) -> PasswordHashPolicy:
+        """
+        Built on first use rather than in create_app, so processes that never hash (the reminder
+        worker, most benchmarks) never spend the seconds calibration takes.
+        """
+        if self._hash_policy is None:
+            with self._lock:
+                if self._hash_policy is None:
+                    self._hash_policy = self._build_hash_policy(self.config)
+        return self._hash_policy
+
+    @staticmethod
+    def _build_hash_policy(config) -> PasswordHashPolicy:
+        argon2_params = {
+            "argon2_time_cost": config["PASSWORD_HASH_ARGON2_TIME_COST"],
+            "argon2_memory_kib": config["PASSWORD_HASH_ARGON2_MEMORY_KIB"],
+            "argon2_parallelism": config["PASSWORD_HASH_ARGON2_PARALLELISM"],
+        }
+        if config["PASSWORD_HASH_TARGET_MS"] <= 0:
+            return PasswordHashPolicy(algorithm=config["PASSWORD_HASH_ALGORITHM"],
+                                      bcrypt_rounds=config["PASSWORD_HASH_BCRYPT_ROUNDS"], **argon2_params)
+
+        policy = PasswordHashPolicy.calibrate(
+            algorithm=config["PASSWORD_HASH_ALGORITHM"],
+            target_ms=config["PASSWORD_HASH_TARGET_MS"],
+            min_bcrypt_rounds=config["PASSWORD_HASH_MIN_BCRYPT_ROUNDS"],
+            max_bcrypt_rounds=config["PASSWORD_HASH_MAX_BCRYPT_ROUNDS"],
+            **argon2_params,
+        )
+        logging.info(f"Password hash policy {policy.algorithm} {policy.cost} takes {policy.calibrated_ms:.0f}ms; "
+                     f"pin it with PASSWORD_HASH_TARGET_MS=0 and the matching cost settings so every replica agrees")
+        return policy
+
+    def init_app(self, app):
+        app.extensions[SERVICES_EXTENSION] = self
+        atexit.register(self.shutdown)
+
+    def shutdown(self):
+        """Stop the worker threads and processes the container started. Safe to call more than once."""
+        atexit.unregister(self.shutdown)
+        self.password_hash_pool.shutdown()
+        if self._user_import_executor is not None:
+            self._user_import_executor.shutdown(wait=True)
+
+
+def get_services() -> ServiceContainer:
+    """Return the container registered on the current Flask app."""
+    return current_app.extensions[SERVICES_EXTENSION]
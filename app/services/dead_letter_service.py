@@ -0,0 +1,97 @@
+import time
+from http import HTTPStatus
+from app.db.classes import ClassResource
+from app.db.constants import ID
+from app.db.notification_dead_letters import (
+    NotificationDeadLetterResource,
+    BODY,
+    CHANNEL,
+    RECIPIENT,
+    SUBJECT,
+)
+from app.db.users import ROLE_TRAINER
+from app.services.circuit_breaker import DeadlineExceededError
+from app.services.notification_dispatcher import STATUS_FAILED, STATUS_SENT, NotificationDispatcher
+from app.services.notification_errors import is_transient
+
+STATUS_DEFERRED = "deferred"
+
+
+class DeadLetterService:
+    """
+    Lists notifications that could not be delivered and replays them in bulk. A trainer sees
+    and replays only letters about their own classes.
+
+    A replay runs inside the HTTP request, so it stops sending and retrying after
+    replay_deadline_seconds and hands the letters it did not get to back for the next call.
+    """
+
+    def __init__(self, dead_letter_resource: NotificationDeadLetterResource, notification_dispatcher: NotificationDispatcher,
+                 class_resource: ClassResource, replay_limit: int = 500, replay_deadline_seconds: float = 20):
+        self.dead_letter_resource = dead_letter_resource
+        self.class_resource = class_resource
+        self.notification_dispatcher = notification_dispatcher
+        self.replay_limit = replay_limit
+        self.replay_deadline_seconds = replay_deadline_seconds
+
+    def list_dead_letters(self, role: str, user_id: str, limit: int = None):
+        if role != ROLE_TRAINER:
+            return {"message": "Only trainers can view failed notifications"}, HTTPStatus.FORBIDDEN
+
+        letters = self.dead_letter_resource.get_pending(
+            limit=min(limit or self.replay_limit, self.replay_limit),
+            class_ids=self._trainer_class_ids(user_id),
+        )
+        return {"dead_letters": letters, "count": len(letters)}, HTTPStatus.OK
+
+    def replay(self, role: str, user_id: str, ids: list = None):
+        """
+        Resend the trainer's pending dead letters (the given ids, or the oldest replay_limit), grouped
+        by channel. Each letter is claimed first, so concurrent replays never send one twice.
+        Delivered letters are marked replayed; the rest go back to pending with the new error,
+        except those cut off by the deadline, which go back unchanged and are reported as deferred.
+        """
+        if role != ROLE_TRAINER:
+            return {"message": "Only trainers can replay failed notifications"}, HTTPStatus.FORBIDDEN
+        if ids is not None and (not isinstance(ids, list) or len(ids) > self.replay_limit):
+            return {"message": f"ids must be a list of at most {self.replay_limit} dead letter IDs"}, \
+                HTTPStatus.BAD_REQUEST
+
+        letters = self.dead_letter_resource.get_pending(
+            ids=ids, limit=self.replay_limit, class_ids=self._trainer_class_ids(user_id)
+        )
+        by_channel = {}
+        for letter in letters:
+            if not self.dead_letter_resource.claim_for_replay(letter[ID]):
+                continue
+            by_channel.setdefault(letter[CHANNEL], []).append(letter)
+
+        deadline = time.monotonic() + self.replay_deadline_seconds
+        results = []
+        replayed_ids = []
+        deferred_ids = []
+        for channel, channel_letters in by_channel.items():
+            messages = [(letter[RECIPIENT], letter[SUBJECT], letter[BODY]) for letter in channel_letters]
+            outcomes = self.notification_dispatcher.deliver(channel, messages, deadline)
+            for letter, (error, attempts) in zip(channel_letters, outcomes):
+                if error is None:
+                    replayed_ids.append(letter[ID])
+                    results.append({ID: letter[ID], CHANNEL: channel, "status": STATUS_SENT})
+                elif isinstance(error, DeadlineExceededError):
+                    deferred_ids.append(letter[ID])
+                    results.append({ID: letter[ID], CHANNEL: channel, "status": STATUS_DEFERRED})
+                else:
+                    self.dead_letter_resource.record_failure(letter[ID], str(error), is_transient(error), attempts)
+                    results.append({ID: letter[ID], CHANNEL: channel, "status": STATUS_FAILED, "error": str(error)})
+
+        self.dead_letter_resource.mark_replayed(replayed_ids)
+        self.dead_letter_resource.release_claims(deferred_ids)
+        return {
+            "replayed": len(replayed_ids),
+            "failed": len(results) - len(replayed_ids) - len(deferred_ids),
+            "deferred": len(deferred_ids),
+            "results": results,
+        }, HTTPStatus.OK
+
+    def _trainer_class_ids(self, trainer_id: str) -> list:
+        return [self.class_resource.get_class_id(cls) for cls in self.class_resource.get_classes_by_trainer(trainer_id)]
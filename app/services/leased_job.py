@@ -0,0 +1,95 @@
+import functools
+import logging
+import os
+import socket
+import threading
+import uuid
+from app.db.leases import LeaseResource
+
+# One owner id per process: every replica competes for leases under its own name
+PROCESS_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Heartbeat:
+    """
+    Calls renew every interval_seconds on a background thread while a job runs. Once renew
+    returns False the job no longer owns its work: lost is set and renewing stops.
+    """
+
+    def __init__(self, renew, interval_seconds: float, name: str):
+        self.renew = renew
+        self.interval_seconds = interval_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                renewed = self.renew()
+            except Exception:
+                # A failed round trip is not a lost lease; the next beat tries again before it expires
+                logging.exception(f"Could not renew {self._thread.name}")
+                continue
+            if not renewed:
+                self.lost.set()
+                return
+
+
+class LeaseHeartbeat(Heartbeat):
+    """Renews a lease in the background while the job holding it runs."""
+
+    def __init__(self, lease_resource: LeaseResource, lease, ttl_seconds: float):
+        self.lease_resource = lease_resource
+        self.lease = lease
+        self.ttl_seconds = ttl_seconds
+        # Renewing three times per TTL tolerates one slow or failed round trip
+        super().__init__(self._renew_lease, ttl_seconds / 3, name=f"lease-{lease.name}")
+
+    def _renew_lease(self) -> bool:
+        renewed = self.lease_resource.renew(self.lease, self.ttl_seconds)
+        if renewed is None:
+            logging.warning(f"Lost lease {self.lease.name} (fencing token {self.lease.fencing_token})")
+            return False
+        self.lease = renewed
+        return True
+
+
+def leased(name: str, ttl_seconds: float, interval_seconds: float = 0, lease_resource_factory=LeaseResource):
+    """
+    Run the decorated periodic task on one replica at a time.
+
+    Every replica can call the task on its own schedule; only the caller that takes
+    the lease runs it, and the others get None back. With interval_seconds the task
+    also runs at most once per interval cluster-wide. The held lease is passed to the
+    task as the `lease` keyword so its writes can be fenced. If the holder dies, the
+    lease expires after ttl_seconds and the next replica to call takes over.
+    """
+    def decorator(task):
+        @functools.wraps(task)
+        def wrapper(*args, **kwargs):
+            lease_resource = lease_resource_factory()
+            lease = lease_resource.acquire(name, PROCESS_OWNER, ttl_seconds, interval_seconds)
+            if lease is None:
+                return None
+
+            heartbeat = LeaseHeartbeat(lease_resource, lease, ttl_seconds)
+            completed = False
+            try:
+                with heartbeat:
+                    result = task(*args, lease=lease, **kwargs)
+                completed = not heartbeat.lost.is_set()
+                return result
+            finally:
+                # A failed run releases without completing, so another replica retries it right away
+                lease_resource.release(heartbeat.lease, completed=completed)
+        return wrapper
+    return decorator
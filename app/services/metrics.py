@@ -0,0 +1,44 @@
+import threading
+
+
+class Metrics:
+    """
+    Thread-safe in-process metrics registry.
+
+    Counters only go up, gauges hold the latest value and timers keep the count,
+    total, and max of observed durations (in seconds). snapshot() returns a plain
+    dict that can be served as JSON.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._timers = {}
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timer = self._timers.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            timer["count"] += 1
+            timer["total_seconds"] += seconds
+            timer["max_seconds"] = max(timer["max_seconds"], seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            timers = {}
+            for name, timer in self._timers.items():
+                timers[name] = dict(timer)
+                timers[name]["avg_seconds"] = timer["total_seconds"] / timer["count"]
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timers": timers,
+            }
@@ -1,30 +1,223 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
 from app.db.bookings import (
     CHANNEL_EMAIL,
+    CLASS_ID,
+    CHANNEL_TELEGRAM,
     CHANNELS,
     DEFAULT_NOTIFICATION_PREFERENCES,
     NOTIFICATION_PREFERENCES,
     TELEGRAM_CHAT_ID,
     USER_EMAIL,
 )
+from app.db.constants import ID
+from app.db.notification_dead_letters import (
+    NotificationDeadLetterResource,
+    ATTEMPTS,
+    BODY,
+    BOOKING_ID,
+    CHANNEL,
+    CLASS_IDS,
+    ERROR,
+    RECIPIENT,
+    SUBJECT,
+    TRANSIENT,
+)
+from app.server_timing import NOTIFY, span
+from app.services.circuit_breaker import CircuitOpenError, DeadlineExceededError
+from app.services.notification_errors import is_transient
+from app.services.retry_policy import NO_RETRY, RetryPolicy
+
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class RecipientResult:
+    """Outcome of notifying one booking, with one entry per channel."""
+    booking_id: str
+    user_email: str
+    channels: dict = field(default_factory=dict)
+    # Classes the message is about; dead letters keep them so trainers only see their own
+    class_ids: list = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(result["status"] == STATUS_SENT for result in self.channels.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "booking_id": self.booking_id,
+            USER_EMAIL: self.user_email,
+            "status": STATUS_SENT if self.ok else STATUS_FAILED,
+            CHANNELS: self.channels,
+        }
 
 
 class NotificationDispatcher:
-    def __init__(self, strategies: dict):
+    def __init__(self, strategies: dict, channel_limits: dict = None, retry_policy: RetryPolicy = NO_RETRY,
+                 dead_letter_resource: NotificationDeadLetterResource = None, breakers: dict = None):
         self.strategies = strategies
+        self.retry_policy = retry_policy
+        # Optional CircuitBreaker per channel: while one is open its sends fail fast
+        self.breakers = breakers or {}
+        # Where messages that failed permanently or ran out of retries are kept for replay
+        self.dead_letter_resource = dead_letter_resource
+        # Caps how many sends may be in flight per channel across all threads
+        self._channel_slots = {
+            channel: threading.BoundedSemaphore(limit)
+            for channel, limit in (channel_limits or {}).items()
+        }
+
+    def send_notification(self, booking: dict, subject: str, body: str) -> RecipientResult:
+        """Send through every channel the booking selected; failures are reported, not raised."""
+        return self.send_batch([(booking, subject, body)])[0]
+
+    def send_batch(self, messages: list, executor=None, deadline: float = None) -> list:
+        """
+        Send (booking, subject, body) messages and return one RecipientResult per message, in order.
+        A message may instead be (booking, render), where render(channel) returns that
+        channel's (subject, body).
+
+        Recipients are grouped by channel and handed to each strategy in chunks of its
+        batch_size, so bulk-capable channels make one API call per chunk. Chunks run on
+        executor when one is given. Transient failures are retried per recipient; what
+        still fails is stored as a dead letter. Nothing is sent after deadline
+        (a time.monotonic() value); those messages are dead-lettered for replay.
+        """
+        results = []
+        by_channel = {}
+        for message in messages:
+            booking = message[0]
+            preferences = booking.get(NOTIFICATION_PREFERENCES) or DEFAULT_NOTIFICATION_PREFERENCES
+            channels = preferences.get(CHANNELS) or [CHANNEL_EMAIL]
+            result = RecipientResult(booking_id=booking.get(ID), user_email=booking.get(USER_EMAIL),
+                                     class_ids=self._get_class_ids(booking))
+            results.append(result)
+            for channel in channels:
+                subject, body = message[1](channel) if len(message) == 2 else message[1:]
+                recipient = self._get_recipient(channel, booking, preferences)
+                by_channel.setdefault(channel, []).append((result, (recipient, subject, body)))
+
+        chunks = []
+        for channel, entries in by_channel.items():
+            size = max(1, getattr(self.strategies.get(channel), "batch_size", 1))
+            chunks.extend((channel, entries[start:start + size]) for start in range(0, len(entries), size))
+
+        if executor is None:
+            outcomes = [
+                self.deliver(channel, [message for _, message in entries], deadline)
+                for channel, entries in chunks
+            ]
+        else:
+            futures = [
+                executor.submit(self.deliver, channel, [message for _, message in entries], deadline)
+                for channel, entries in chunks
+            ]
+            outcomes = [future.result() for future in futures]
+
+        dead_letters = []
+        for (channel, entries), outcome in zip(chunks, outcomes):
+            for (result, (recipient, subject, body)), (error, attempts) in zip(entries, outcome):
+                if error is None:
+                    result.channels[channel] = {"status": STATUS_SENT}
+                    continue
+                result.channels[channel] = {"status": STATUS_FAILED, "error": str(error)}
+                dead_letters.append({
+                    BOOKING_ID: result.booking_id,
+                    CLASS_IDS: result.class_ids,
+                    CHANNEL: channel,
+                    RECIPIENT: recipient,
+                    SUBJECT: subject,
+                    BODY: body,
+                    ERROR: str(error),
+                    TRANSIENT: is_transient(error),
+                    ATTEMPTS: attempts,
+                })
+
+        self._store_dead_letters(dead_letters)
+        return results
+
+    def deliver(self, channel: str, messages: list, deadline: float = None) -> list:
+        """
+        Send (recipient, subject, body) messages on one channel, retrying transient failures
+        with backoff until deadline. Returns an (error or None, attempts) pair per message.
+        """
+        outcomes = [(None, 0)] * len(messages)
+        pending = list(range(len(messages)))
+        attempt = 0
+        while pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                error = DeadlineExceededError("Reminder job deadline exceeded before sending")
+                for index in pending:
+                    outcomes[index] = (error, outcomes[index][1])
+                break
+
+            attempt += 1
+            errors = self._send_safely(channel, [messages[index] for index in pending])
+            retry = []
+            for index, error in zip(pending, errors):
+                outcomes[index] = (error, attempt)
+                # Retrying into an open circuit would only fail fast again
+                if (error is not None and is_transient(error) and not isinstance(error, CircuitOpenError)
+                        and attempt < self.retry_policy.max_attempts):
+                    retry.append(index)
+            pending = retry
+            if pending:
+                max_wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                self.retry_policy.backoff(attempt, max_wait)
+        return outcomes
+
+    def _send_safely(self, channel: str, messages: list) -> list:
+        breaker = self.breakers.get(channel)
+        if breaker is not None and not breaker.allow():
+            return [CircuitOpenError(f"The {channel} channel is unavailable; try again later")] * len(messages)
+
+        try:
+            errors = self._send(channel, messages)
+        except Exception as error:
+            errors = [error] * len(messages)
+
+        if breaker is not None:
+            # Only an outage trips the breaker; rejected recipients mean the channel itself is up
+            if errors and all(error is not None and is_transient(error) for error in errors):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        return errors
+
+    def _store_dead_letters(self, dead_letters: list):
+        if not dead_letters or self.dead_letter_resource is None:
+            return
+        try:
+            self.dead_letter_resource.add_dead_letters(dead_letters)
+        except Exception:
+            # Losing the dead letter must not turn into failing the whole send
+            logging.exception(f"Could not store {len(dead_letters)} notification dead letters")
+
+    def _send(self, channel: str, messages: list) -> list:
+        strategy = self.strategies.get(channel)
+        if not strategy:
+            raise ValueError(f"Unsupported notification channel: {channel}")
 
-    def send_notification(self, booking: dict, subject: str, body: str):
-        preferences = booking.get(NOTIFICATION_PREFERENCES) or DEFAULT_NOTIFICATION_PREFERENCES
-        channels = preferences.get(CHANNELS) or [CHANNEL_EMAIL]
+        slots = self._channel_slots.get(channel)
+        with span(NOTIFY):
+            if slots is None:
+                return strategy.send_batch(messages)
 
-        for channel in channels:
-            strategy = self.strategies.get(channel)
-            if not strategy:
-                raise ValueError(f"Unsupported notification channel: {channel}")
+            with slots:
+                return strategy.send_batch(messages)
 
-            recipient = self._get_recipient(channel, booking, preferences)
-            strategy.send_notification(recipient, subject, body)
+    def _get_class_ids(self, booking: dict) -> list:
+        # A digest covers several classes and lists them; a booking names its one class
+        if booking.get(CLASS_IDS) is not None:
+            return list(booking[CLASS_IDS])
+        return [booking[CLASS_ID]] if booking.get(CLASS_ID) else []
 
     def _get_recipient(self, channel: str, booking: dict, preferences: dict):
-        if channel == CHANNEL_EMAIL:
-            return booking.get(USER_EMAIL)
-        return preferences.get(TELEGRAM_CHAT_ID)
+        if channel == CHANNEL_TELEGRAM:
+            return preferences.get(TELEGRAM_CHAT_ID)
+        # Email and webhook partners both know the member by email
+        return booking.get(USER_EMAIL)
@@ -0,0 +1,15 @@
+class NotificationError(Exception):
+    """A notification could not be delivered."""
+
+
+class TransientNotificationError(NotificationError):
+    """Delivery failed for a reason that may clear up (throttling, timeouts, 5xx); worth retrying."""
+
+
+class PermanentNotificationError(NotificationError):
+    """Delivery can never succeed as sent (rejected address, unknown chat); retrying is pointless."""
+
+
+def is_transient(error: Exception) -> bool:
+    # Errors a channel did not classify are treated as permanent so bugs are not retried in a loop
+    return isinstance(error, TransientNotificationError)
@@ -1,3 +1,20 @@
 class NotificationService:
+    # Most messages a single send_batch call should carry; 1 means the channel has no bulk API
+    batch_size = 1
+
     def send_notification(self, recipient: str, subject: str, body: str):
         raise NotImplementedError
+
+    def send_batch(self, messages: list) -> list:
+        """
+        Send (recipient, subject, body) messages. Returns one entry per message:
+        None when it was sent, otherwise the exception it failed with.
+        """
+        errors = []
+        for recipient, subject, body in messages:
+            try:
+                self.send_notification(recipient, subject, body)
+                errors.append(None)
+            except Exception as error:
+                errors.append(error)
+        return errors
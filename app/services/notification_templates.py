@@ -0,0 +1,171 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "notifications")
+DEFAULT_TEMPLATE_VERSION = "v1"
+
+SUBJECT_HEADER = "Subject: "
+_PLACEHOLDER = re.compile(r"{{\s*(\w+)\s*}}")
+
+
+class RenderedText(str):
+    """
+    Rendered subject or body that remembers its template and variables.
+
+    Behaves as a plain string everywhere; batch senders (SES templated email) can use
+    the template and the shared variables to send one copy of the shared content.
+    """
+
+    def __new__(cls, text: str, template: "CompiledTemplate" = None, shared: dict = None, personal: dict = None):
+        rendered = super().__new__(cls, text)
+        rendered.template = template
+        rendered.shared = shared or {}
+        rendered.personal = personal or {}
+        return rendered
+
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal and placeholder segments.
+
+    bind() fills in the shared variables and returns a smaller template in which only
+    the per-recipient placeholders are left, so render() inside the send loop is a
+    join over a handful of segments.
+    """
+
+    def __init__(self, name: str, channel: str, version: str, subject, body, shared: dict = None, source=None):
+        self.name = name
+        self.channel = channel
+        self.version = version
+        self.subject = subject
+        self.body = body
+        self.shared = shared or {}
+        # The unbound template this one was bound from
+        self.source = source or self
+
+    @classmethod
+    def parse(cls, name: str, channel: str, version: str, text: str):
+        subject = ""
+        if text.startswith(SUBJECT_HEADER):
+            subject_line, _, text = text.partition("\n")
+            subject = subject_line[len(SUBJECT_HEADER):]
+            text = text[1:] if text.startswith("\n") else text
+        return cls(name, channel, version, _compile(subject), _compile(text.rstrip("\n")))
+
+    @property
+    def key(self) -> str:
+        """Stable name for this template file, e.g. reminder-email-v1"""
+        return f"{self.name}-{self.channel}-{self.version}"
+
+    def bind(self, **shared) -> "CompiledTemplate":
+        shared = {name: str(value) for name, value in shared.items()}
+        return CompiledTemplate(self.name, self.channel, self.version, _fill(self.subject, shared),
+                                _fill(self.body, shared), shared={**self.shared, **shared}, source=self.source)
+
+    def render(self, **personal):
+        """Return (subject, body) as RenderedText"""
+        personal = {name: str(value) for name, value in personal.items()}
+        subject = _join(_fill(self.subject, personal))
+        body = _join(_fill(self.body, personal))
+        return (RenderedText(subject, self, self.shared, personal),
+                RenderedText(body, self, self.shared, personal))
+
+    def handlebars(self):
+        """The unbound template in SES (Handlebars) syntax: (subject, text)"""
+        return _handlebars(self.source.subject), _handlebars(self.source.body)
+
+
+class NotificationTemplates:
+    """
+    Loads notification templates from a versioned directory (<template_dir>/<version>/).
+
+    <name>.<channel>.txt is the variant for one channel and <name>.txt the default.
+    A file may start with a "Subject: ..." line followed by a blank line; the rest is
+    the body. Placeholders are written {{name}}. Files are read and compiled once;
+    templates bound to a class are kept in a small LRU cache.
+    """
+
+    def __init__(self, template_dir: str = DEFAULT_TEMPLATE_DIR, version: str = DEFAULT_TEMPLATE_VERSION,
+                 cache_size: int = 1024):
+        self.template_dir = template_dir
+        self.version = version
+        self.cache_size = cache_size
+        self._compiled = {}
+        self._bound = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, channel: str) -> CompiledTemplate:
+        key = (name, channel)
+        template = self._compiled.get(key)
+        if template is None:
+            template = CompiledTemplate.parse(name, channel, self.version, self._read(name, channel))
+            with self._lock:
+                template = self._compiled.setdefault(key, template)
+        return template
+
+    def bound(self, name: str, channel: str, cache_key, **shared) -> CompiledTemplate:
+        """get(name, channel).bind(**shared), cached by cache_key (e.g. the class id) and the shared values"""
+        key = (name, channel, cache_key, tuple(sorted((k, str(v)) for k, v in shared.items())))
+        with self._lock:
+            template = self._bound.get(key)
+            if template is not None:
+                self._bound.move_to_end(key)
+                return template
+
+        template = self.get(name, channel).bind(**shared)
+        with self._lock:
+            self._bound[key] = template
+            if len(self._bound) > self.cache_size:
+                self._bound.popitem(last=False)
+        return template
+
+    def _read(self, name: str, channel: str) -> str:
+        directory = os.path.join(self.template_dir, self.version)
+        for filename in (f"{name}.{channel}.txt", f"{name}.txt"):
+            path = os.path.join(directory, filename)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as template_file:
+                    return template_file.read()
+        raise FileNotFoundError(f"No notification template {name!r} for {channel!r} in {directory}")
+
+
+class _Placeholder(str):
+    pass
+
+
+def _compile(text: str) -> tuple:
+    segments = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+        segments.append(_Placeholder(match.group(1)))
+        position = match.end()
+    if position < len(text):
+        segments.append(text[position:])
+    return tuple(segments)
+
+
+def _fill(segments: tuple, values: dict) -> tuple:
+    filled = []
+    for segment in segments:
+        if isinstance(segment, _Placeholder) and segment in values:
+            segment = values[segment]
+        # Merge adjacent literals so rendering has as little left to join as possible
+        if filled and not isinstance(segment, _Placeholder) and not isinstance(filled[-1], _Placeholder):
+            filled[-1] = filled[-1] + segment
+        else:
+            filled.append(segment)
+    return tuple(filled)
+
+
+def _join(segments: tuple) -> str:
+    # A placeholder nobody filled is left empty rather than shown as {{name}}
+    return "".join("" if isinstance(segment, _Placeholder) else segment for segment in segments)
+
+
+def _handlebars(segments: tuple) -> str:
+    # Triple braces insert values as is instead of HTML-escaping them
+    return "".join("{{{%s}}}" % segment if isinstance(segment, _Placeholder) else segment for segment in segments)
@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from app.services.metrics import Metrics
+
+
+class HashPoolSaturatedError(Exception):
+    """Raised when the password hash pool has no free slot, or no worker picked the hash up in time."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing is temporarily overloaded")
+        self.retry_after = retry_after
+
+
+class PasswordHashPool:
+    """
+    Bounded executor for CPU-bound password hashing.
+
+    At most max_workers hashes run at once and at most queue_limit more may wait.
+    Anything beyond that is rejected immediately with HashPoolSaturatedError. bcrypt
+    and argon2 release the GIL while hashing, so a thread pool gives real parallelism.
+
+    The WSGI server is synchronous, so run() still holds the request thread until its
+    hash is done; the pool does not free that thread, it bounds how long it is held.
+    A hash that no worker has started within queue_timeout seconds is cancelled and
+    rejected, so a request waits at most queue_timeout plus one hash before it either
+    has its result or answers 503.
+    """
+
+    def __init__(self, max_workers: int, queue_limit: int, retry_after: int = 1, metrics: Metrics = None,
+                 queue_timeout: float = None):
+        self.retry_after = retry_after
+        self.metrics = metrics or Metrics()
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + queue_limit)
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for its result, giving up if it waits queue_timeout to start."""
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.queue_timeout)
+        except TimeoutError:
+            # cancel() only succeeds while the hash is still queued; once running, it is waited for
+            if not future.cancel():
+                return future.result()
+            self.metrics.increment("password_hash.timed_out")
+            raise HashPoolSaturatedError(self.retry_after)
+
+    def submit(self, fn, *args):
+        """Schedule fn(*args) on the pool and return its future."""
+        if not self._slots.acquire(blocking=False):
+            self.metrics.increment("password_hash.rejected")
+            raise HashPoolSaturatedError(self.retry_after)
+
+        try:
+            future = self._executor.submit(self._timed, fn, time.perf_counter(), *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _timed(self, fn, queued_at: float, *args):
+        started_at = time.perf_counter()
+        self.metrics.observe("password_hash.queue_wait", started_at - queued_at)
+        try:
+            return fn(*args)
+        finally:
+            self.metrics.observe("password_hash.latency", time.perf_counter() - started_at)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: up to `capacity` calls at once, refilled at `rate` per second.
+
+    acquire() blocks until a token is free. pause() empties the bucket for a while,
+    e.g. when the remote side asks us to back off.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            wait = self._try_acquire()
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+            self._tokens = 0.0
+            # Refill from the end of the pause, not from the last acquire before it
+            self._updated = self._paused_until
+
+    def _try_acquire(self) -> float:
+        """Take a token and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            now = self.clock()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+class KeyedRateLimiter:
+    """One TokenBucket per key (e.g. per chat), keeping only the most recently used max_keys buckets."""
+
+    def __init__(self, rate: float, capacity: float = None, max_keys: int = 10000, **bucket_options):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self.bucket_options = bucket_options
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bucket(self, key) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity, **self.bucket_options)
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def acquire(self, key):
+        self.bucket(key).acquire()
@@ -1,17 +1,59 @@
+import logging
+import time
 from http import HTTPStatus
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
 from app.db.classes import ClassResource, TRAINER_ID, TITLE, START_DATE, END_DATE, LOCATION, TRAINER_NAME
-from app.db.bookings import BookingResource, USER_NAME
+from app.db.bookings import (
+    BookingResource,
+    CHANNEL_EMAIL,
+    CHANNELS,
+    DEFAULT_NOTIFICATION_PREFERENCES,
+    NOTIFICATION_PREFERENCES,
+    TELEGRAM_CHAT_ID,
+    USER_EMAIL,
+    USER_NAME,
+)
+from app.db.constants import ID
+from app.db.notification_dead_letters import CLASS_IDS
+from app.db.reminder_jobs import (
+    ReminderJobResource,
+    ATTEMPTS,
+    CLASS_ID,
+    RESULTS,
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    TRAINER_ID as JOB_TRAINER_ID,
+)
 from app.services.class_models import ClassSchedule
+from app.services.leased_job import Heartbeat
+from app.services.notification_templates import NotificationTemplates
 
 class ReminderService:
 
-    def __init__(self, notification_dispatcher):
+    def __init__(self, notification_dispatcher, class_resource: ClassResource = None,
+                 booking_resource: BookingResource = None, executor: ThreadPoolExecutor = None,
+                 job_resource: ReminderJobResource = None, lease_seconds: int = 60, batch_size: int = 100,
+                 max_attempts: int = 3, deadline_seconds: float = None, digest: bool = False,
+                 templates: NotificationTemplates = None):
         self.notification_dispatcher = notification_dispatcher
-        self.class_resource = ClassResource()
-        self.booking_resource = BookingResource()
+        self.class_resource = class_resource or ClassResource()
+        self.booking_resource = booking_resource or BookingResource()
+        # Shared pool that fans reminders out concurrently; without one, sends run in order
+        self.executor = executor
+        self.job_resource = job_resource or ReminderJobResource()
+        self.lease_seconds = lease_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        # Longest a job or scan may keep sending; later recipients are dead-lettered instead
+        self.deadline_seconds = deadline_seconds
+        # Scheduled scans send each member one message per channel covering all their classes
+        self.digest = digest
+        self.templates = templates or NotificationTemplates()
 
-    def send_reminder(self, class_id: str, trainer_id: str):
+    def queue_reminder(self, class_id: str, trainer_id: str):
+        """Validate the request and queue a reminder job for the worker to deliver."""
         fitness_class, error = self._get_reminder_class(class_id, trainer_id)
         if error:
             return error
@@ -20,12 +62,178 @@ class ReminderService:
         if error:
             return error
 
-        bookings, error = self._get_reminder_recipients(class_id)
-        if error:
-            return error
+        if not self.booking_resource.has_bookings(class_id):
+            return {"message": "No registered members for this class"}, HTTPStatus.BAD_REQUEST
+
+        job_id = self.job_resource.enqueue(class_id, trainer_id)
+        return {"message": "Reminder job queued", "job_id": str(job_id)}, HTTPStatus.ACCEPTED
+
+    def get_reminder_job(self, class_id: str, job_id: str, trainer_id: str):
+        """Return the status and per-recipient results of a reminder job."""
+        job = self.job_resource.get_job(job_id)
+        if not job or job.get(CLASS_ID) != class_id:
+            return {"message": "Reminder job not found"}, HTTPStatus.NOT_FOUND
+
+        if job.get(JOB_TRAINER_ID) != trainer_id:
+            return {"message": "Forbidden: Not the trainer of this class"}, HTTPStatus.FORBIDDEN
+
+        return job, HTTPStatus.OK
+
+    def run_job(self, job: dict, worker_id: str):
+        """
+        Deliver a claimed job. Bookings are streamed from the cursor in batches and the
+        results recorded after each one, while a heartbeat renews the lease in the
+        background so a batch slower than the lease is not taken over and sent again.
+        A job picked up again after a crash skips recipients that already have a
+        recorded result. Once the deadline passes, the remaining recipients are
+        dead-lettered without sending.
+        """
+        job_id = job[ID]
+        deadline = self._deadline()
+        if job.get(ATTEMPTS, 1) > self.max_attempts:
+            self.job_resource.finish(job_id, worker_id, STATUS_FAILED, error="Too many attempts")
+            return
+
+        fitness_class = self.class_resource.get_class_by_id(job[CLASS_ID])
+        if not fitness_class:
+            self.job_resource.finish(job_id, worker_id, STATUS_FAILED, error="Class not found")
+            return
+
+        done = {result["booking_id"] for result in job.get(RESULTS, [])}
+        bookings = (
+            booking for booking in self.booking_resource.iter_bookings_by_class(job[CLASS_ID])
+            if booking[ID] not in done
+        )
+
+        heartbeat = Heartbeat(
+            lambda: self.job_resource.renew_lease(job_id, worker_id, self.lease_seconds),
+            # Three renewals per lease tolerate one slow or failed round trip
+            self.lease_seconds / 3,
+            name=f"reminder-job-{job_id}",
+        )
+        with heartbeat:
+            while True:
+                batch = list(islice(bookings, self.batch_size))
+                if not batch:
+                    break
+
+                results = [result.to_dict() for result in self._send_reminders(fitness_class, batch, deadline)]
+                if not self.job_resource.record_results(job_id, worker_id, results):
+                    logging.warning(f"Lost lease on reminder job {job_id}; leaving it to the new owner")
+                    return
+
+        error = None
+        if deadline is not None and time.monotonic() >= deadline:
+            error = "Deadline exceeded; unsent reminders were moved to the dead letters"
+        self.job_resource.finish(job_id, worker_id, STATUS_COMPLETED, error=error)
+
+    def send_upcoming_reminders(self, window: timedelta, now: datetime = None, still_held=None):
+        """
+        Remind every booking in classes starting within window from now, once.
+        Each booking is claimed with an atomic sent-marker before sending, so overlapping
+        ticks, restarts, or several schedulers never send the same reminder twice. Failed
+        sends are not retried by later scans; they are replayed from the dead letters.
+
+        still_held checks the caller's lease fencing token. It is asked once the bookings are
+        claimed; a caller that was taken over meanwhile gives its claims back unsent.
+        """
+        now = now or datetime.now()
+        if self.digest:
+            return self._send_upcoming_digests(now, now + window, still_held)
+
+        classes = self.class_resource.get_classes_starting_between(now, now + window)
+        if not classes:
+            return {"classes": 0, "sent": 0, "failed": 0}
 
-        self._send_reminders(fitness_class, bookings)
-        return {"message": "Reminders sent successfully"}, HTTPStatus.OK
+        classes_by_id = {fitness_class[ID]: fitness_class for fitness_class in classes}
+        claimed = [
+            booking for booking in self.booking_resource.get_unreminded_bookings(list(classes_by_id))
+            if self.booking_resource.claim_reminder(booking[ID])
+        ]
+        if self._fenced_off(still_held, claimed):
+            return {"classes": len(classes), "sent": 0, "failed": 0, "fenced_off": len(claimed)}
+
+        pairs = [(classes_by_id[booking[CLASS_ID]], booking) for booking in claimed]
+        results = self._fan_out(pairs, self._deadline())
+        # Sends that still failed after retries are in the dead-letter collection for replay
+        sent = sum(1 for result in results if result.ok)
+        failed = len(results) - sent
+
+        return {"classes": len(classes), "sent": sent, "failed": failed}
+
+    def _send_upcoming_digests(self, start: datetime, end: datetime, still_held=None):
+        """Digest mode of send_upcoming_reminders: one message per member and channel."""
+        members = self.booking_resource.get_unreminded_bookings_by_member(start, end)
+
+        messages = []
+        class_ids = set()
+        reminded_members = 0
+        all_claimed = []
+        for member in members:
+            claimed = [booking for booking in member["bookings"] if self.booking_resource.claim_reminder(booking[ID])]
+            all_claimed += claimed
+            reminded_members += bool(claimed)
+            class_ids.update(booking[CLASS_ID] for booking in claimed)
+            for channel, bookings in self._group_by_channel(claimed).items():
+                subject, body = self._build_digest_message(member, channel, bookings)
+                messages.append((self._digest_recipient(member, channel, bookings), subject, body))
+        if self._fenced_off(still_held, all_claimed):
+            return {"classes": len(class_ids), "members": 0, "sent": 0, "failed": 0, "fenced_off": len(all_claimed)}
+
+        results = self.notification_dispatcher.send_batch(messages, executor=self.executor, deadline=self._deadline())
+        sent = sum(1 for result in results if result.ok)
+        return {
+            "classes": len(class_ids),
+            "members": reminded_members,
+            "sent": sent,
+            "failed": len(results) - sent,
+        }
+
+    def _fenced_off(self, still_held, claimed: list) -> bool:
+        """True when the caller's lease was taken over; its claims are released for the new holder's scans."""
+        if still_held is None or still_held():
+            return False
+        logging.warning(f"Lease lost during the reminder scan; releasing {len(claimed)} claimed reminders unsent")
+        self.booking_resource.release_reminders([booking[ID] for booking in claimed])
+        return True
+
+    def _group_by_channel(self, bookings: list):
+        by_channel = {}
+        for booking in bookings:
+            preferences = booking.get(NOTIFICATION_PREFERENCES) or DEFAULT_NOTIFICATION_PREFERENCES
+            for channel in preferences.get(CHANNELS) or [CHANNEL_EMAIL]:
+                by_channel.setdefault(channel, []).append(booking)
+        return by_channel
+
+    def _digest_recipient(self, member: dict, channel: str, bookings: list):
+        # The dispatcher addresses bookings, so the digest goes out as one booking-shaped message per channel
+        chat_ids = [
+            (booking.get(NOTIFICATION_PREFERENCES) or {}).get(TELEGRAM_CHAT_ID) for booking in bookings
+        ]
+        return {
+            ID: ",".join(booking[ID] for booking in bookings),
+            CLASS_IDS: list(dict.fromkeys(booking[CLASS_ID] for booking in bookings)),
+            USER_EMAIL: member.get(USER_EMAIL),
+            NOTIFICATION_PREFERENCES: {
+                CHANNELS: [channel],
+                TELEGRAM_CHAT_ID: next((chat_id for chat_id in reversed(chat_ids) if chat_id), None),
+            },
+        }
+
+    def _build_digest_message(self, member: dict, channel: str, bookings: list):
+        if len(bookings) == 1:
+            return self._reminder_renderer(bookings[0]["class"], bookings[0])(channel)
+
+        items = [
+            self.templates.bound("digest_item", channel, booking["class"].get(ID),
+                                 **self._class_variables(booking["class"])).render()[1]
+            for booking in bookings
+        ]
+        return self.templates.get("digest", channel).render(
+            user_name=member.get(USER_NAME),
+            class_count=len(bookings),
+            classes="\n".join(items),
+        )
 
     def _get_reminder_class(self, class_id: str, trainer_id: str):
         fitness_class = self.class_resource.get_class_by_id(class_id)
@@ -47,29 +255,40 @@ class ReminderService:
 
         return None
 
-    def _get_reminder_recipients(self, class_id: str):
-        bookings = self.booking_resource.get_bookings_by_class(class_id)
-        if not bookings:
-            return None, ({"message": "No registered members for this class"}, HTTPStatus.BAD_REQUEST)
+    def _send_reminders(self, fitness_class: dict, bookings: list, deadline: float = None):
+        """Notify every booking and return one RecipientResult per booking, in booking order."""
+        return self._fan_out([(fitness_class, booking) for booking in bookings], deadline)
 
-        return bookings, None
+    def _deadline(self):
+        if self.deadline_seconds is None:
+            return None
+        return time.monotonic() + self.deadline_seconds
 
-    def _send_reminders(self, fitness_class: dict, bookings: list):
-        for booking in bookings:
-            subject, body = self._build_reminder_message(fitness_class, booking)
-            self.notification_dispatcher.send_notification(booking, subject, body)
-
-    def _build_reminder_message(self, fitness_class: dict, booking: dict):
-        subject = f"NYUAD GYM Reminder: {fitness_class.get(TITLE)}"
-        body = (
-            f"Hi {booking.get(USER_NAME)},\n\n"
-            f"This is a reminder for your upcoming class at NYUAD GYM:\n\n"
-            f"Class: {fitness_class.get(TITLE)}\n"
-            f"Date & Time: {fitness_class.get(START_DATE)} to {fitness_class.get(END_DATE)}\n"
-            f"Location: {fitness_class.get(LOCATION, 'TBD')}\n"
-            f"Instructor: {fitness_class.get(TRAINER_NAME, 'TBD')}\n\n"
-            "We look forward to seeing you there!\n\n"
-            "Best regards,\n"
-            "NYUAD GYM Team"
-        )
-        return subject, body
+    def _fan_out(self, pairs: list, deadline: float = None):
+        bound = {}
+        messages = [
+            (booking, self._reminder_renderer(fitness_class, booking, bound)) for fitness_class, booking in pairs
+        ]
+        return self.notification_dispatcher.send_batch(messages, executor=self.executor, deadline=deadline)
+
+    def _reminder_renderer(self, fitness_class: dict, booking: dict, bound: dict = None):
+        bound = {} if bound is None else bound
+
+        def render(channel: str):
+            # Class fields are filled in once per class and channel; only the name varies per booking
+            key = (fitness_class.get(ID), channel)
+            template = bound.get(key)
+            if template is None:
+                template = bound[key] = self.templates.bound("reminder", channel, fitness_class.get(ID),
+                                                             **self._class_variables(fitness_class))
+            return template.render(user_name=booking.get(USER_NAME))
+        return render
+
+    def _class_variables(self, fitness_class: dict):
+        return {
+            "title": fitness_class.get(TITLE),
+            "start_date": fitness_class.get(START_DATE),
+            "end_date": fitness_class.get(END_DATE),
+            "location": fitness_class.get(LOCATION, "TBD"),
+            "trainer_name": fitness_class.get(TRAINER_NAME, "TBD"),
+        }
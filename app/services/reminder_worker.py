@@ -0,0 +1,42 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from app.db.constants import ID
+from app.db.reminder_jobs import ReminderJobResource
+from app.services.reminder_service import ReminderService
+
+
+class ReminderWorker:
+    """Claims reminder jobs from the queue collection and delivers them, one at a time."""
+
+    def __init__(self, job_resource: ReminderJobResource, reminder_service: ReminderService,
+                 poll_seconds: float = 2.0, worker_id: str = None):
+        self.job_resource = job_resource
+        self.reminder_service = reminder_service
+        self.poll_seconds = poll_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stop_event = threading.Event()
+
+    def run_once(self) -> bool:
+        """Claim and run one job. Returns False when the queue is empty."""
+        job = self.job_resource.claim_next(self.worker_id, self.reminder_service.lease_seconds)
+        if not job:
+            return False
+
+        logging.info(f"Worker {self.worker_id} running reminder job {job[ID]}")
+        try:
+            self.reminder_service.run_job(job, self.worker_id)
+        except Exception:
+            # Leave the lease to expire so the job is retried, up to max_attempts
+            logging.exception(f"Reminder job {job[ID]} crashed")
+        return True
+
+    def run_forever(self):
+        while not self.stop_event.is_set():
+            if not self.run_once():
+                self.stop_event.wait(self.poll_seconds)
+
+    def stop(self):
+        self.stop_event.set()
@@ -0,0 +1,27 @@
+import random
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits a random time up to base * 2**n, capped."""
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    sleep: callable = field(default=time.sleep, compare=False, repr=False)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the given (1-based) failed attempt"""
+        # Full jitter spreads out retries from many threads that failed at the same moment
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def backoff(self, attempt: int, max_wait: float = None):
+        delay = self.delay(attempt)
+        if max_wait is not None:
+            delay = min(delay, max_wait)
+        if delay > 0:
+            self.sleep(delay)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -1,13 +1,47 @@
-import boto3
-from botocore.exceptions import ClientError
+import json
+import threading
+from botocore.exceptions import BotoCoreError, ClientError
+from app.services.aws_clients import get_ses_client
 from app.services.email_service import EmailService
+from app.services.notification_errors import (
+    NotificationError,
+    PermanentNotificationError,
+    TransientNotificationError,
+)
+
+# SES template that renders subject and body given per destination, so one bulk call can carry any messages.
+# Triple braces insert the text as is instead of HTML-escaping it.
+BULK_TEMPLATE_NAME = "notification-passthrough"
+# SendBulkTemplatedEmail accepts at most 50 destinations per call
+MAX_BULK_DESTINATIONS = 50
+# SES error codes and bulk destination statuses worth retrying; everything else is a rejection.
+# The generic bulk status "Failed" also covers rejected addresses and missing templates, so it is final.
+TRANSIENT_SES_ERRORS = {
+    "Throttling", "ThrottlingException", "TooManyRequestsException", "ServiceUnavailable",
+    "InternalFailure", "RequestTimeout", "AccountThrottled", "TransientFailure",
+}
+
+
+def _ses_error(code: str, message: str):
+    if code in TRANSIENT_SES_ERRORS:
+        return TransientNotificationError(message)
+    return PermanentNotificationError(message)
+
+
+def _client_error(error: ClientError):
+    return _ses_error(error.response["Error"].get("Code"), error.response["Error"]["Message"])
+
 
 # SES (Simple Email Service) implementation of a generic EmailService. Can be reused for other services later on.
 class SESEmailService(EmailService):
+    batch_size = MAX_BULK_DESTINATIONS
 
-    def __init__(self, sender_email, region="us-east-1"):
+    def __init__(self, sender_email, region="us-east-1", client=None):
         self.sender_email = sender_email
-        self.client = boto3.client("ses", region_name=region)
+        # The shared client keeps its connection pool warm across services and requests
+        self.client = client or get_ses_client(region=region)
+        self._templates_ready = set()
+        self._template_lock = threading.Lock()
 
     # Send an Email using AWS SES
     def send_email(self, recipient, subject, body):
@@ -21,4 +55,98 @@ class SESEmailService(EmailService):
                 },
             )
         except ClientError as e:
-            raise Exception(e.response["Error"]["Message"])
\ No newline at end of file
+            raise _client_error(e)
+        except BotoCoreError as e:
+            # Connection failures and timeouts never reached SES
+            raise TransientNotificationError(str(e))
+
+    # Send many emails with one SendBulkTemplatedEmail call per 50 recipients
+    def send_batch(self, messages):
+        """
+        Messages rendered from the same notification template with the same shared
+        variables go out on a stored SES template: the shared content is sent once per
+        call as default data and each destination only carries its own variables.
+        Anything else uses the passthrough template with the full subject and body.
+        """
+        groups = {}
+        for index, message in enumerate(messages):
+            groups.setdefault(self._template_group(message), []).append(index)
+
+        errors = [None] * len(messages)
+        for group, indexes in groups.items():
+            for start in range(0, len(indexes), MAX_BULK_DESTINATIONS):
+                chunk = indexes[start:start + MAX_BULK_DESTINATIONS]
+                chunk_errors = self._send_bulk(group, [messages[index] for index in chunk])
+                for index, error in zip(chunk, chunk_errors):
+                    errors[index] = error
+        return errors
+
+    def _template_group(self, message):
+        _, subject, body = message
+        template = getattr(body, "template", None)
+        if template is None or getattr(subject, "template", None) is not template:
+            return None
+        # Bound templates are cached per class, so the same object means the same shared content
+        return template
+
+    def _send_bulk(self, group, messages):
+        if group is None:
+            template_name = BULK_TEMPLATE_NAME
+            subject_part, text_part = "{{{subject}}}", "{{{body}}}"
+            default_data = json.dumps({"subject": "", "body": ""})
+            destination_data = [json.dumps({"subject": subject, "body": body}) for _, subject, body in messages]
+        else:
+            template = group
+            default_data = json.dumps(template.shared)
+            template_name = f"notification-{template.key}"
+            subject_part, text_part = template.handlebars()
+            destination_data = [json.dumps(body.personal) for _, _, body in messages]
+
+        try:
+            self._ensure_template(template_name, subject_part, text_part)
+        except NotificationError as error:
+            return [error] * len(messages)
+
+        try:
+            response = self.client.send_bulk_templated_email(
+                Source=self.sender_email,
+                Template=template_name,
+                DefaultTemplateData=default_data,
+                Destinations=[
+                    {
+                        "Destination": {"ToAddresses": [recipient]},
+                        "ReplacementTemplateData": data,
+                    }
+                    for (recipient, _, _), data in zip(messages, destination_data)
+                ],
+            )
+        except ClientError as e:
+            return [_client_error(e)] * len(messages)
+        except BotoCoreError as e:
+            return [TransientNotificationError(str(e))] * len(messages)
+
+        # SES reports a status per destination, in request order
+        return [
+            None if status["Status"] == "Success" else _ses_error(status["Status"], status.get("Error") or status["Status"])
+            for status in response["Status"]
+        ]
+
+    def _ensure_template(self, name, subject_part, text_part):
+        if name in self._templates_ready:
+            return
+        with self._template_lock:
+            if name in self._templates_ready:
+                return
+            try:
+                # Template files are versioned, so an existing SES template with this name has the same content
+                self.client.create_template(Template={
+                    "TemplateName": name,
+                    "SubjectPart": subject_part,
+                    "TextPart": text_part,
+                })
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "AlreadyExists":
+                    raise _client_error(e)
+            except BotoCoreError as e:
+                raise TransientNotificationError(str(e))
+            self._templates_ready.add(name)
@@ -0,0 +1,163 @@
+import queue
+import smtplib
+import ssl
+import threading
+from email.message import EmailMessage
+
+from app.services.email_service import EmailService
+from app.services.notification_errors import (
+    NotificationError,
+    PermanentNotificationError,
+    TransientNotificationError,
+)
+
+# Reply code a server sends before dropping the session
+SERVICE_CLOSING = 421
+
+
+class SMTPEmailService(EmailService):
+    """
+    EmailService that relays through an SMTP server.
+
+    Keeps up to pool_size authenticated connections open and hands each caller (or
+    each batch) one connection for all its messages. A connection that drops is
+    replaced and the message retried once; connections are also recycled after
+    max_messages_per_connection messages, since many relays cap that per session.
+    """
+
+    # Messages sent on one checked-out connection per send_batch call
+    batch_size = 100
+
+    def __init__(self, sender_email: str, host: str, port: int = 587, username: str = "", password: str = "",
+                 starttls: bool = True, use_ssl: bool = False, pool_size: int = 8, timeout: float = 10,
+                 max_messages_per_connection: int = 100):
+        self.sender_email = sender_email
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._idle = queue.LifoQueue()
+        # One slot per connection that may exist, idle or in use
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._sent = {}
+
+    def send_email(self, recipient, subject, body):
+        error = self.send_batch([(recipient, subject, body)])[0]
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages):
+        errors = []
+        with self._slots:
+            connection = self._checkout()
+            try:
+                for recipient, subject, body in messages:
+                    connection, error = self._send_one(connection, recipient, subject, body)
+                    errors.append(error)
+            finally:
+                self._checkin(connection)
+        return errors
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection)
+
+    def _send_one(self, connection, recipient, subject, body):
+        message = self._build_message(recipient, subject, body)
+        for attempt in range(2):
+            try:
+                if connection is None:
+                    connection = self._connect()
+                connection.send_message(message)
+            except NotificationError as error:
+                return None, error
+            except smtplib.SMTPRecipientsRefused as error:
+                code, reason = next(iter(error.recipients.values()))
+                return connection, _response_error(code, reason)
+            except smtplib.SMTPResponseException as error:
+                if error.smtp_code != SERVICE_CLOSING:
+                    return connection, _response_error(error.smtp_code, error.smtp_error)
+                # 421 means the server is closing this session; treat it like a dropped connection
+                failure = error
+            except smtplib.SMTPServerDisconnected as error:
+                failure = error
+            except smtplib.SMTPException as error:
+                return connection, PermanentNotificationError(f"SMTP send failed: {error}")
+            except OSError as error:
+                failure = error
+            else:
+                self._sent[id(connection)] = self._sent.get(id(connection), 0) + 1
+                if self._sent[id(connection)] >= self.max_messages_per_connection:
+                    self._discard(connection)
+                    connection = None
+                return connection, None
+
+            self._discard(connection)
+            connection = None
+        return None, TransientNotificationError(f"SMTP connection failed: {failure}")
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            # Connect lazily inside _send_one so a failed connect is retried like a dropped one
+            return None
+
+    def _checkin(self, connection):
+        if connection is not None:
+            self._idle.put(connection)
+
+    def _connect(self):
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                          context=ssl.create_default_context())
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        # The socket is open from here on; close it if the session cannot be set up
+        try:
+            if self.starttls and not self.use_ssl:
+                connection.starttls(context=ssl.create_default_context())
+            if self.username:
+                connection.login(self.username, self.password)
+        except smtplib.SMTPAuthenticationError as error:
+            self._discard(connection)
+            raise PermanentNotificationError(f"SMTP authentication failed: {error.smtp_error!r}") from error
+        except Exception:
+            self._discard(connection)
+            raise
+        return connection
+
+    def _discard(self, connection):
+        if connection is None:
+            return
+        self._sent.pop(id(connection), None)
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _build_message(self, recipient, subject, body):
+        message = EmailMessage()
+        message["From"] = self.sender_email
+        message["To"] = recipient
+        message["Subject"] = str(subject)
+        message.set_content(str(body))
+        return message
+
+
+def _response_error(code: int, reason) -> Exception:
+    if isinstance(reason, bytes):
+        reason = reason.decode(errors="replace")
+    # 4xx replies are temporary by definition (greylisting, mailbox busy); 5xx are final
+    if 400 <= code < 500:
+        return TransientNotificationError(f"SMTP {code}: {reason}")
+    return PermanentNotificationError(f"SMTP {code}: {reason}")
@@ -1,13 +1,42 @@
 import json
-from urllib import request
-from urllib.error import HTTPError, URLError
+import time
 
+import urllib3
+
+from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
 from app.services.notification_service import NotificationService
+from app.services.rate_limiter import KeyedRateLimiter, TokenBucket
+
+TELEGRAM_API_BASE_URL = "https://api.telegram.org"
+HTTP_TOO_MANY_REQUESTS = 429
 
 
 class TelegramNotificationService(NotificationService):
-    def __init__(self, bot_token: str):
+    """
+    Telegram Bot API channel.
+
+    Messages go over a keep-alive connection pool and are paced by token buckets: one
+    for the whole bot (Telegram allows about 30 messages/s) and one per chat (about
+    1 message/s). A 429 response pauses the bot for the retry_after Telegram asks for,
+    then the message is retried.
+    """
+
+    def __init__(self, bot_token: str, base_url: str = TELEGRAM_API_BASE_URL, pool_size: int = 16,
+                 global_rate: float = 30, chat_rate: float = 1, max_retries: int = 3, timeout: float = 10,
+                 sleep=time.sleep):
         self.bot_token = bot_token
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            # Threads wait for a free connection instead of opening throwaway ones
+            block=True,
+            retries=False,
+            timeout=urllib3.Timeout(total=timeout),
+        )
+        self.global_limiter = TokenBucket(global_rate, sleep=sleep)
+        self.chat_limiter = KeyedRateLimiter(chat_rate, capacity=1, sleep=sleep)
 
     def send_notification(self, recipient: str, subject: str, body: str):
         if not self.bot_token:
@@ -15,21 +44,50 @@ class TelegramNotificationService(NotificationService):
         if not recipient:
             raise ValueError("Telegram chat id is required")
 
-        message = f"{subject}\n\n{body}"
         payload = json.dumps({
             "chat_id": recipient,
-            "text": message,
+            "text": f"{subject}\n\n{body}",
         }).encode("utf-8")
-        telegram_request = request.Request(
-            f"https://api.telegram.org/bot{self.bot_token}/sendMessage",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
 
+        for _ in range(self.max_retries + 1):
+            self.chat_limiter.acquire(recipient)
+            self.global_limiter.acquire()
+            response = self._post("sendMessage", payload)
+            if response.status != HTTP_TOO_MANY_REQUESTS:
+                break
+            retry_after = self._retry_after(response)
+            # The limit is per bot, so every sender backs off, not just this thread
+            self.global_limiter.pause(retry_after)
+        else:
+            raise TransientNotificationError("Telegram notification failed: rate limited")
+
+        if response.status >= 500:
+            raise TransientNotificationError(
+                f"Telegram notification failed: HTTP {response.status} {self._description(response)}")
+        if response.status >= 400:
+            # Unknown chat, bot blocked by the user, malformed message: resending will not help
+            raise PermanentNotificationError(
+                f"Telegram notification failed: HTTP {response.status} {self._description(response)}")
+
+    def _post(self, method: str, payload: bytes):
+        try:
+            return self.http.request(
+                "POST",
+                f"{self.base_url}/bot{self.bot_token}/{method}",
+                body=payload,
+                headers={"Content-Type": "application/json"},
+            )
+        except urllib3.exceptions.HTTPError as error:
+            raise TransientNotificationError(f"Telegram notification failed: {error}") from error
+
+    def _retry_after(self, response) -> float:
+        try:
+            return float(json.loads(response.data)["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.headers.get("Retry-After") or 1)
+
+    def _description(self, response) -> str:
         try:
-            with request.urlopen(telegram_request, timeout=10) as response:
-                if response.status >= 400:
-                    raise ValueError("Telegram notification failed")
-        except (HTTPError, URLError) as error:
-            raise Exception(f"Telegram notification failed: {error}") from error
+            return json.loads(response.data).get("description", "")
+        except (ValueError, AttributeError):
+            return ""
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+from app.db.constants import ID
+from app.db.users import UserResource, EMAIL, PASSWORD, NAME, BIRTHDAY, ROLE, ROLE_MEMBER, ROLE_TRAINER
+
+CONTENT_TYPE_CSV = "text/csv"
+CONTENT_TYPES_NDJSON = {"application/x-ndjson", "application/ndjson"}
+
+STATUS_CREATED = "created"
+STATUS_FAILED = "failed"
+
+
+class UserImportService:
+    """
+    Bulk member import from CSV or NDJSON.
+
+    Passwords are hashed across a process pool (hash_executor) and all valid rows
+    are written with one unordered insert_many. Every input row gets a result.
+
+    With a hash_pool (see PasswordHashPool), each import holds one of its slots while
+    its batch hashes, so imports are admitted, counted and rejected with 503 under
+    the same limits as logins and registrations.
+    """
+
+    def __init__(self, user_resource: UserResource, hash_executor, hash_workers: int = 1, max_rows: int = 5000,
+                 hash_pool=None):
+        self.user_resource = user_resource
+        self.hash_executor = hash_executor
+        self.hash_workers = hash_workers
+        self.max_rows = max_rows
+        self.hash_pool = hash_pool
+
+    def import_users(self, role: str, content_type: str, body: str):
+        """Validate and create every user in the upload, reporting a result per row."""
+        if role != ROLE_TRAINER:
+            return {"message": "Only trainers can import users"}, HTTPStatus.FORBIDDEN
+
+        rows, error = self._parse_rows(content_type, body)
+        if error:
+            return error
+
+        if len(rows) > self.max_rows:
+            return {"message": f"Too many rows. At most {self.max_rows} users can be imported at once"}, \
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+        results = [None] * len(rows)
+        valid_indexes = []
+        for index, row in enumerate(rows):
+            message = self._validate_row(row)
+            if message:
+                results[index] = self._row_result(index, row, STATUS_FAILED, message=message)
+            else:
+                valid_indexes.append(index)
+
+        valid_rows = [rows[index] for index in valid_indexes]
+        hashed_passwords = self._hash_passwords([row[PASSWORD] for row in valid_rows])
+        created = self.user_resource.create_users(valid_rows, hashed_passwords)
+
+        for index, (user_id, message) in zip(valid_indexes, created):
+            if message:
+                results[index] = self._row_result(index, rows[index], STATUS_FAILED, message=message)
+            else:
+                results[index] = self._row_result(index, rows[index], STATUS_CREATED, user_id=user_id)
+
+        created_count = sum(1 for result in results if result["status"] == STATUS_CREATED)
+        return {
+            "created": created_count,
+            "failed": len(results) - created_count,
+            "results": results,
+        }, HTTPStatus.OK
+
+    def _parse_rows(self, content_type: str, body: str):
+        if not body or not body.strip():
+            return None, ({"message": "Request body is required"}, HTTPStatus.BAD_REQUEST)
+
+        if content_type == CONTENT_TYPE_CSV:
+            return list(csv.DictReader(io.StringIO(body))), None
+
+        if content_type in CONTENT_TYPES_NDJSON:
+            rows = []
+            for line in body.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    row = None
+                # Keep a placeholder so row numbers still match the upload
+                rows.append(row if isinstance(row, dict) else {})
+            return rows, None
+
+        return None, ({"message": "Content-Type must be text/csv or application/x-ndjson"},
+                      HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+
+    def _validate_row(self, row: dict):
+        if not all(row.get(key) for key in (EMAIL, PASSWORD, NAME, BIRTHDAY)):
+            return "Email, password, name, and birthday are required"
+        # NDJSON can carry any JSON type, and hashing anything but a string fails the whole batch
+        if not all(isinstance(row[key], str) for key in (EMAIL, PASSWORD, NAME, BIRTHDAY)):
+            return "Email, password, name, and birthday must be strings"
+
+        role = row.get(ROLE) or ROLE_MEMBER
+        if role not in [ROLE_MEMBER, ROLE_TRAINER]:
+            return "Invalid role. Must be 'member' or 'trainer'"
+        row[ROLE] = role
+        return None
+
+    def _hash_passwords(self, passwords: list):
+        if not passwords:
+            return []
+        if self.hash_pool is None:
+            return self._hash_in_processes(passwords)
+        return self.hash_pool.run(self._hash_in_processes, passwords)
+
+    def _hash_in_processes(self, passwords: list):
+        # Large chunks keep inter-process overhead small compared to the hashing itself
+        chunksize = max(1, len(passwords) // (self.hash_workers * 4))
+        return list(self.hash_executor.map(self.user_resource.hash_policy.hash, passwords, chunksize=chunksize))
+
+    def _row_result(self, index: int, row: dict, status: str, user_id=None, message: str = None):
+        result = {"row": index + 1, EMAIL: row.get(EMAIL), "status": status}
+        if user_id is not None:
+            result[ID] = str(user_id)
+        if message:
+            result["message"] = message
+        return result
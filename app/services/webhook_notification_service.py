@@ -0,0 +1,81 @@
+import hashlib
+import hmac
+import json
+import time
+
+import urllib3
+
+from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
+from app.services.notification_service import NotificationService
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Webhook-Timestamp"
+HTTP_TOO_MANY_REQUESTS = 429
+
+
+def sign_payload(secret: str, timestamp: str, payload: bytes) -> str:
+    """
+    HMAC-SHA256 signature a partner checks to trust a webhook call.
+
+    The timestamp is signed with the body so a captured request cannot be replayed
+    later with a fresh timestamp.
+    """
+    digest = hmac.new(secret.encode("utf-8"), timestamp.encode("utf-8") + b"." + payload, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+
+class WebhookNotificationService(NotificationService):
+    """
+    Webhook channel for partner systems.
+
+    A batch of notifications is POSTed as one signed JSON document over a keep-alive
+    connection pool. The call succeeds or fails as a whole: 429, 5xx and network
+    errors are transient, so the dispatcher retries the batch; other 4xx are permanent.
+    """
+
+    def __init__(self, url: str, secret: str = "", batch_size: int = 100, pool_size: int = 4,
+                 timeout: float = 10, clock=time.time):
+        self.url = url
+        self.secret = secret
+        self.batch_size = batch_size
+        self.clock = clock
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            # Threads wait for a free connection instead of opening throwaway ones
+            block=True,
+            retries=False,
+            timeout=urllib3.Timeout(total=timeout),
+        )
+
+    def send_notification(self, recipient: str, subject: str, body: str):
+        error = self.send_batch([(recipient, subject, body)])[0]
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages):
+        if not self.url:
+            return [ValueError("Webhook URL is not configured")] * len(messages)
+
+        payload = json.dumps({
+            "notifications": [
+                {"recipient": recipient, "subject": str(subject), "body": str(body)}
+                for recipient, subject, body in messages
+            ],
+        }).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            timestamp = str(int(self.clock()))
+            headers[TIMESTAMP_HEADER] = timestamp
+            headers[SIGNATURE_HEADER] = sign_payload(self.secret, timestamp, payload)
+
+        try:
+            response = self.http.request("POST", self.url, body=payload, headers=headers)
+        except urllib3.exceptions.HTTPError as error:
+            return [TransientNotificationError(f"Webhook notification failed: {error}")] * len(messages)
+
+        if response.status < 300:
+            return [None] * len(messages)
+        message = f"Webhook notification failed: HTTP {response.status}"
+        if response.status == HTTP_TOO_MANY_REQUESTS or response.status >= 500:
+            return [TransientNotificationError(message)] * len(messages)
+        return [PermanentNotificationError(message)] * len(messages)
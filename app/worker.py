@@ -0,0 +1,29 @@
+"""
+Background worker that delivers queued reminder jobs.
+
+Run it next to the web server, as many copies as needed:
+
+    python -m app.worker
+"""
+
+import logging
+import signal
+
+from app import create_app
+from app.services.container import get_services
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+
+    with app.app_context():
+        worker = get_services().reminder_worker
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        signal.signal(signal.SIGINT, lambda *_: worker.stop())
+        logging.info(f"Reminder worker {worker.worker_id} started")
+        worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Performance tooling: local stand-ins for external services and benchmarks that drive
+the real application against them. Nothing here is imported by the app itself.
+"""
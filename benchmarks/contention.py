@@ -0,0 +1,229 @@
+"""
+Booking contention driver.
+
+Fills a few small classes with far more booking attempts than they have spots,
+including members retrying a booking they already sent, from several processes
+with several threads each. Every worker waits at a start line so the attempts
+land together, then the database is checked for the invariants bookings must
+keep however they interleave:
+
+- no class holds more member bookings than its capacity
+- no member holds two bookings for one class
+- each class's remaining_spots counter equals capacity minus its bookings
+- GET /classes reports the same open spots as the bookings collection
+
+Needs a real mongod: spawned processes cannot share mongomock's in-memory data,
+and mongomock's updates are not atomic across threads anyway:
+
+    MOCK_DB=false MONGO_URI=mongodb://localhost:27017 python -m benchmarks.contention
+    MOCK_DB=false python -m benchmarks.contention --processes 8 --threads 16 --classes 5 --capacity 3
+
+Exits non-zero if any invariant is broken.
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.environment import ensure_benchmark_database, prepare_environment
+
+prepare_environment(MOCK_DB="false")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.db.bookings import CLASS_ID, IS_TRAINER, USER_ID  # noqa: E402
+from app.db.classes import CAPACITY, REMAINING_SPOTS  # noqa: E402
+from app.db.users import BIRTHDAY, EMAIL, NAME, ROLE, ROLE_MEMBER, ROLE_TRAINER  # noqa: E402
+from app.services.auth_context import ROLE_CLAIM, USER_ID_CLAIM  # noqa: E402
+from app.services.class_models import ClassRecord  # noqa: E402
+from app.services.container import get_services  # noqa: E402
+from benchmarks.datagen import clear_collections  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+
+
+def setup(app, classes: int, capacity: int, members: int) -> dict:
+    """Replace the benchmark database's contents with one trainer, small classes and many members."""
+    with app.app_context():
+        ensure_benchmark_database(app.config)
+        clear_collections()
+        services = get_services()
+        users = services.user_resource
+        # One hash for everyone; nobody logs in with a password here
+        hashed = users.hash_policy.hash("contention-password")
+        people = [{EMAIL: "contention-trainer@example.com", NAME: "Contention Trainer", BIRTHDAY: "1985-01-01",
+                   ROLE: ROLE_TRAINER}]
+        people += [{EMAIL: f"contender{number}@example.com", NAME: f"Contender {number}", BIRTHDAY: "1995-01-01",
+                    ROLE: ROLE_MEMBER} for number in range(members)]
+        created = users.create_users(people, [hashed] * len(people))
+        trainer_id = str(created[0][0])
+        members_by_id = {str(user_id): person[EMAIL] for (user_id, _), person in zip(created[1:], people[1:])}
+
+        start = datetime.now().replace(second=0, microsecond=0) + timedelta(days=1)
+        class_ids = []
+        for number in range(classes):
+            starts = start + timedelta(hours=number)
+            record = ClassRecord(
+                title=f"Contended Class {number}", trainer_id=trainer_id, trainer_name="Contention Trainer",
+                start_date=starts, end_date=starts + timedelta(hours=1), capacity=capacity,
+                location="Studio A", description="More members than spots",
+            )
+            class_ids.append(str(services.class_resource.create_class(record)))
+    return {"class_ids": class_ids, "members": members_by_id}
+
+
+def plan_attempts(fixture: dict, attempts: int, duplicates: float, seed: int) -> list:
+    """((member_id, email), class_id) pairs, with a share of them sent twice as a retrying client would."""
+    rng = random.Random(seed)
+    members = sorted(fixture["members"].items())
+    pairs = [(rng.choice(members), rng.choice(fixture["class_ids"])) for _ in range(attempts)]
+    pairs += rng.sample(pairs, int(len(pairs) * duplicates))
+    rng.shuffle(pairs)
+    return pairs
+
+
+def book_concurrently(app, pairs: list, threads: int) -> tuple:
+    """Book every pair from `threads` threads released together; returns (latencies, status counts)."""
+    with app.app_context():
+        tokens = {(member_id, email): create_access_token(
+            identity=email, additional_claims={ROLE_CLAIM: ROLE_MEMBER, USER_ID_CLAIM: member_id},
+        ) for member_id, email in {member for member, _ in pairs}}
+
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    start_line = threading.Barrier(threads)
+
+    def book(share):
+        client = app.test_client()
+        start_line.wait()
+        for member, class_id in share:
+            sent = time.perf_counter()
+            response = client.post("/bookings", json={CLASS_ID: class_id},
+                                   headers={"Authorization": f"Bearer {tokens[member]}"})
+            with lock:
+                latencies.append(time.perf_counter() - sent)
+                statuses[response.status_code] += 1
+
+    workers = [threading.Thread(target=book, args=(pairs[index::threads],)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return latencies, dict(statuses)
+
+
+def _worker(pairs: list, threads: int, start_line, results, config_overrides: dict):
+    """One process: its own app and MongoClient, booking its share once every process is ready."""
+    app = create_app(config_overrides)
+    start_line.wait()
+    results.put(book_concurrently(app, pairs, threads))
+
+
+def contend(pairs: list, processes: int, threads: int, config_overrides: dict = None) -> dict:
+    """
+    Send the pairs from processes x threads clients at once; report statuses, throughput and latency.
+    Each process builds its app with config_overrides, so they all book against the same database.
+    """
+    # Spawned, so no process shares a MongoClient forked from another
+    context = multiprocessing.get_context("spawn")
+    start_line = context.Barrier(processes + 1)
+    results = context.Queue()
+    workers = [
+        context.Process(target=_worker,
+                        args=(pairs[index::processes], threads, start_line, results, config_overrides))
+        for index in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    start_line.wait()
+    started = time.perf_counter()
+    latencies, statuses = [], Counter()
+    for _ in workers:
+        worker_latencies, worker_statuses = results.get()
+        latencies += worker_latencies
+        statuses.update(worker_statuses)
+    wall = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    return {
+        "attempts": len(pairs),
+        "clients": processes * threads,
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(pairs) / wall, 2) if wall else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+def check_invariants(app, class_ids: list) -> list:
+    """Return a description of every broken booking invariant; empty when all hold."""
+    problems = []
+    with app.app_context():
+        services = get_services()
+        bookings = services.booking_resource.collection
+        booked = Counter({group["_id"]: group["count"] for group in bookings.aggregate([
+            {"$match": {IS_TRAINER: {"$ne": True}}},
+            {"$group": {"_id": f"${CLASS_ID}", "count": {"$sum": 1}}},
+        ])})
+        duplicates = list(bookings.aggregate([
+            {"$group": {"_id": {"class_id": f"${CLASS_ID}", "user_id": f"${USER_ID}"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+        ]))
+        problems += [f"{group['_id']['user_id']} booked {group['_id']['class_id']} {group['count']} times"
+                     for group in duplicates]
+
+        capacities = {}
+        for class_id in class_ids:
+            fitness_class = services.class_resource.get_class_by_id(class_id)
+            capacity = capacities[class_id] = fitness_class[CAPACITY]
+            if booked[class_id] > capacity:
+                problems.append(f"{class_id} holds {booked[class_id]} bookings for {capacity} spots")
+            if fitness_class.get(REMAINING_SPOTS) != capacity - booked[class_id]:
+                problems.append(f"{class_id} counts {fitness_class.get(REMAINING_SPOTS)} open spots "
+                                f"but has {capacity - booked[class_id]}")
+
+    listed = {fitness_class["_id"]: fitness_class[REMAINING_SPOTS]
+              for fitness_class in app.test_client().get("/classes").get_json()}
+    for class_id, capacity in capacities.items():
+        if listed.get(class_id) != max(capacity - booked[class_id], 0):
+            problems.append(f"GET /classes shows {listed.get(class_id)} open spots for {class_id}")
+    return problems
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Check that concurrent bookings never oversell or duplicate")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="client threads per process")
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=5)
+    parser.add_argument("--members", type=int, default=100)
+    parser.add_argument("--attempts", type=int, default=400, help="booking attempts before duplicates")
+    parser.add_argument("--duplicates", type=float, default=0.25, help="share of attempts sent twice")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main():
+    options = build_parser().parse_args()
+    app = create_app()
+    if app.config["MOCK_DB"]:
+        sys.exit("The contention driver needs a real mongod; set MOCK_DB=false and MONGO_URI")
+    fixture = setup(app, options.classes, options.capacity, options.members)
+    pairs = plan_attempts(fixture, options.attempts, options.duplicates, options.seed)
+    report = contend(pairs, options.processes, options.threads)
+    report["mock_db"] = app.config["MOCK_DB"]
+    report["problems"] = check_invariants(app, fixture["class_ids"])
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["problems"] else 0)
+
+
+if __name__ == "__main__":
+    main()
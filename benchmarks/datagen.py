@@ -0,0 +1,446 @@
+"""
+Synthetic gym workload generator.
+
+Produces users, classes and bookings shaped like production rather than uniform
+filler: a few class series are far more popular than the rest, classes come in
+daily, weekly and monthly series, a minority of members book most classes (long
+booking histories), and notification preferences mix email, Telegram and webhooks.
+The same seed and --anchor always produce the same documents, ids included.
+
+Classes are built through CreateClassRequest and ClassRecord, so they have the
+shape the API writes. Write straight to Mongo, or to NDJSON files that mongoimport
+can load later:
+
+    python -m benchmarks.datagen --users 100000 --series 2000            # into DB_NAME
+    python -m benchmarks.datagen --users 10000 --ndjson data/ --anchor 2026-01-05
+    python -m benchmarks.datagen --classes 10000 --bookings 1000000      # volumes instead of series
+    mongoimport --db fitness_class_benchmark --collection bookings --file data/bookings.ndjson
+
+The seeded data also drives benchmarks.endpoints --skip-seed: every user's password
+is BENCHMARK_PASSWORD.
+"""
+
+import argparse
+import base64
+import bisect
+import itertools
+import json
+import math
+import os
+import random
+import struct
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt
+from bson import ObjectId
+
+from benchmarks.environment import ensure_benchmark_database, prepare_environment
+
+prepare_environment(MOCK_DB="false")
+
+from app import create_app  # noqa: E402
+from app.db import DB  # noqa: E402
+from app.db.bookings import (  # noqa: E402
+    BOOKING_COLLECTION,
+    BOOKING_TIME,
+    CHANNEL_EMAIL,
+    CHANNEL_TELEGRAM,
+    CHANNEL_WEBHOOK,
+    CHANNELS,
+    CLASS_ID,
+    IS_TRAINER,
+    NOTIFICATION_PREFERENCES,
+    REMINDER_SENT_AT,
+    TELEGRAM_CHAT_ID,
+    USER_EMAIL,
+    USER_ID,
+    USER_NAME,
+)
+from app.db.classes import CAPACITY, CLASS_COLLECTION, CREATED_AT, REMAINING_SPOTS, START_DATE  # noqa: E402
+from app.db.users import (  # noqa: E402
+    ALGORITHM_BCRYPT,
+    BIRTHDAY,
+    EMAIL,
+    NAME,
+    PASSWORD,
+    PASSWORD_ALGORITHM,
+    PASSWORD_COST,
+    ROLE,
+    ROLE_MEMBER,
+    ROLE_TRAINER,
+    USER_COLLECTION,
+)
+from app.services.class_models import ClassSchedule, CreateClassRequest, RecurrenceRule  # noqa: E402
+
+BENCHMARK_PASSWORD = "benchmark-password"
+DEFAULT_USERS = 100_000
+DEFAULT_SERIES = 2000
+DEFAULT_CLASSES = 10_000
+DEFAULT_BOOKINGS = 1_000_000
+DEFAULT_HISTORY_WEEKS = 26
+DEFAULT_FUTURE_WEEKS = 4
+DEFAULT_BCRYPT_ROUNDS = 10
+INSERT_BATCH = 10_000
+SEEDED_COLLECTIONS = (USER_COLLECTION, CLASS_COLLECTION, BOOKING_COLLECTION, "reminder_jobs", "revoked_tokens")
+
+TRAINER_SHARE = 0.01
+# Share of series that repeat daily or monthly; the rest are weekly
+DAILY_SHARE = 0.05
+MONTHLY_SHARE = 0.05
+# Weekly series get their own weekday and hour per trainer, so a trainer's classes never overlap.
+# Daily series run at DAILY_HOUR and monthly ones at MONTHLY_HOUR, at most one of each per trainer.
+WEEKLY_HOURS = range(8, 21)
+DAILY_HOUR = 6
+MONTHLY_HOUR = 21
+DURATIONS = (45, 50, 60)
+CAPACITIES = (8, 10, 12, 15, 20, 25, 30)
+# Series popularity is Pareto distributed: most classes are a quarter full, about one series in six sells out
+POPULARITY_ALPHA = 1.2
+POPULARITY_FILL = 0.25
+# Member activity is Pareto distributed too, so a small share of members hold most bookings
+ACTIVITY_ALPHA = 1.5
+# Bookings come in up to two weeks before a class; upcoming classes fill as their date approaches
+BOOKING_LEAD_DAYS = 14
+# Notification preferences: (weight, channels)
+PREFERENCE_MIX = (
+    (70, [CHANNEL_EMAIL]),
+    (18, [CHANNEL_EMAIL, CHANNEL_TELEGRAM]),
+    (7, [CHANNEL_TELEGRAM]),
+    (5, [CHANNEL_EMAIL, CHANNEL_WEBHOOK]),
+)
+
+TITLES = ["Yoga", "Spin", "HIIT", "Pilates", "Boxing", "Zumba", "Strength", "Mobility"]
+LEVELS = ["Basics", "Flow", "Express", "Intermediate", "Advanced", "Power"]
+LOCATIONS = ["Studio A", "Studio B", "Studio C", "Pool", "Outdoor Track"]
+FIRST_NAMES = ["Amal", "Ben", "Chen", "Dana", "Elif", "Farah", "Gus", "Hana", "Ivan", "Jo", "Kai", "Lena",
+               "Mo", "Nia", "Omar", "Pia", "Raj", "Sara", "Tom", "Yara"]
+LAST_NAMES = ["Ali", "Brown", "Costa", "Diaz", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Khan", "Lopez",
+              "Meyer", "Novak", "Okafor", "Park", "Rossi", "Silva", "Tanaka", "Weber", "Zayed"]
+
+BCRYPT_ALPHABET = b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+# The last salt character only carries two bits, so bcrypt accepts just these
+BCRYPT_FINAL_SALT_CHARACTERS = b".Oeu"
+
+
+class WorkloadGenerator:
+    """
+    Deterministic users, classes and bookings for one seed.
+
+    Members, trainers and the class calendar are planned up front; users(),
+    classes() and bookings() then stream documents, each from its own random
+    stream, so they can be consumed in any order or more than once. Classes start
+    history_weeks before anchor (midnight today by default) and run future_weeks past it.
+    The calendar stops once it holds `classes` classes, if given, and every capacity
+    is multiplied by capacity_scale.
+    """
+
+    def __init__(self, users: int = DEFAULT_USERS, series: int = DEFAULT_SERIES,
+                 history_weeks: int = DEFAULT_HISTORY_WEEKS, future_weeks: int = DEFAULT_FUTURE_WEEKS,
+                 seed: int = 0, anchor: datetime = None, bcrypt_rounds: int = DEFAULT_BCRYPT_ROUNDS,
+                 classes: int = None, capacity_scale: float = 1.0):
+        self.seed = seed
+        self.anchor = anchor or datetime.combine(date.today(), datetime.min.time())
+        self.first_day = self.anchor - timedelta(weeks=history_weeks)
+        self.weeks = history_weeks + future_weeks
+        self.bcrypt_rounds = bcrypt_rounds
+        self.capacity_scale = capacity_scale
+        self._ids = itertools.count()
+        self._seed_bytes = random.Random(f"{seed}:ids").randbytes(3)
+
+        rng = self._random("people")
+        slots_per_trainer = 7 * len(WEEKLY_HOURS)
+        trainer_count = max(1, int(users * TRAINER_SHARE), math.ceil(series / slots_per_trainer))
+        self.trainers = [self._person(rng, index, ROLE_TRAINER) for index in range(min(trainer_count, users))]
+        self.members = [self._person(rng, index, ROLE_MEMBER) for index in range(len(self.trainers), users)]
+        activity = [rng.paretovariate(ACTIVITY_ALPHA) for _ in self.members]
+        self._activity = list(itertools.accumulate(activity))
+
+        weights, mixes = zip(*PREFERENCE_MIX)
+        for member in self.members:
+            channels = rng.choices(mixes, weights=weights)[0]
+            member[NOTIFICATION_PREFERENCES] = {
+                CHANNELS: list(channels),
+                TELEGRAM_CHAT_ID: str(10 ** 9 + member["index"]) if CHANNEL_TELEGRAM in channels else None,
+            }
+
+        self._plan = self._plan_classes(series, classes) if self.trainers else []
+
+    @classmethod
+    def sized(cls, users: int = DEFAULT_USERS, classes: int = DEFAULT_CLASSES, bookings: int = DEFAULT_BOOKINGS,
+              **options) -> "WorkloadGenerator":
+        """
+        A generator with exactly `classes` classes and about `bookings` bookings.
+
+        Series are added until the calendar holds `classes` classes. Bookings follow from
+        capacity times popularity, so a first plan at the stock capacities sets the scale
+        that brings the booking total to the target.
+        """
+        # Every series has at least one class, so `classes` series are always enough
+        unscaled = cls(users=users, series=classes, classes=classes, **options)
+        booked = sum(count for _, count in unscaled._plan)
+        if not booked:
+            return unscaled
+        return cls(users=users, series=classes, classes=classes, capacity_scale=bookings / booked, **options)
+
+    def users(self):
+        """User documents, trainers first. Every user shares one bcrypt hash of BENCHMARK_PASSWORD."""
+        hashed = self._password_hash()
+        for person in self.trainers + self.members:
+            yield {
+                "_id": person["_id"],
+                EMAIL: person[EMAIL],
+                PASSWORD: hashed,
+                PASSWORD_ALGORITHM: ALGORITHM_BCRYPT,
+                PASSWORD_COST: {"rounds": self.bcrypt_rounds},
+                NAME: person[NAME],
+                BIRTHDAY: person[BIRTHDAY],
+                ROLE: person[ROLE],
+            }
+
+    def classes(self):
+        """Class documents, series by series, with remaining_spots matching their bookings."""
+        for document, booked in self._plan:
+            yield {**document, REMAINING_SPOTS: document[CAPACITY] - booked}
+
+    def bookings(self):
+        """Booking documents, class by class. Bookings in past classes are already reminded."""
+        if not self.members:
+            return
+        rng = self._random("bookings")
+        # Own id sequence, so bookings come out the same however often and in whatever order they are read
+        ids = itertools.count()
+        for document, booked in self._plan:
+            start = document[START_DATE]
+            for member in self._pick_members(rng, booked):
+                booked_at = min(self.anchor, start - timedelta(minutes=rng.randrange(60, 24 * 60 * BOOKING_LEAD_DAYS)))
+                booking = {
+                    "_id": self._object_id(booked_at, next(ids), stream=1),
+                    CLASS_ID: str(document["_id"]),
+                    USER_ID: str(member["_id"]),
+                    USER_EMAIL: member[EMAIL],
+                    USER_NAME: member[NAME],
+                    BOOKING_TIME: booked_at,
+                    IS_TRAINER: False,
+                    NOTIFICATION_PREFERENCES: dict(member[NOTIFICATION_PREFERENCES]),
+                }
+                if start <= self.anchor:
+                    booking[REMINDER_SENT_AT] = max(booked_at, start - timedelta(hours=2))
+                yield booking
+
+    def _plan_classes(self, series: int, classes: int = None):
+        rng = self._random("classes")
+        free_slots = {
+            trainer_index: [(weekday, hour) for weekday in range(7) for hour in WEEKLY_HOURS]
+            for trainer_index in range(len(self.trainers))
+        }
+        for slots in free_slots.values():
+            rng.shuffle(slots)
+        has_daily, has_monthly = set(), set()
+
+        fill_rng = self._random("fill")
+        plan = []
+        for index in range(series):
+            if classes is not None and len(plan) >= classes:
+                break
+            trainer_index = index % len(self.trainers)
+            trainer = self.trainers[trainer_index]
+            roll = rng.random()
+            if roll < DAILY_SHARE and trainer_index not in has_daily:
+                has_daily.add(trainer_index)
+                first = self.first_day.replace(hour=DAILY_HOUR)
+                recurrence = RecurrenceRule(frequency="daily", occurrences=7 * self.weeks)
+            elif roll < DAILY_SHARE + MONTHLY_SHARE and trainer_index not in has_monthly:
+                has_monthly.add(trainer_index)
+                first = self.first_day.replace(hour=MONTHLY_HOUR) + timedelta(days=rng.randrange(28))
+                recurrence = RecurrenceRule(frequency="monthly", occurrences=max(2, self.weeks * 7 // 30))
+            elif free_slots[trainer_index]:
+                weekday, hour = free_slots[trainer_index].pop()
+                first = self.first_day.replace(hour=hour) + timedelta(days=(weekday - self.first_day.weekday()) % 7)
+                recurrence = RecurrenceRule(frequency="weekly", occurrences=max(2, self.weeks))
+            else:
+                continue
+
+            request = CreateClassRequest(
+                title=f"{rng.choice(TITLES)} {rng.choice(LEVELS)}",
+                schedule=ClassSchedule(start_date=first, end_date=first + timedelta(minutes=rng.choice(DURATIONS))),
+                capacity=max(1, round(rng.choice(CAPACITIES) * self.capacity_scale)),
+                location=rng.choice(LOCATIONS),
+                description=f"Series {index} with {trainer[NAME]}",
+                recurrence=recurrence,
+            )
+            # Pareto weights start at 1, so every series gets at least POPULARITY_FILL
+            popularity = POPULARITY_FILL * rng.paretovariate(POPULARITY_ALPHA)
+            created_at = first - timedelta(days=BOOKING_LEAD_DAYS)
+            records = request.to_records(str(trainer["_id"]), trainer[NAME])
+            for record in records[:None if classes is None else classes - len(plan)]:
+                document = record.to_document()
+                document["_id"] = self._object_id(created_at)
+                document[CREATED_AT] = created_at
+                plan.append((document, self._booked(fill_rng, record, popularity)))
+        return plan
+
+    def _booked(self, rng: random.Random, record, popularity: float) -> int:
+        fill = popularity * rng.uniform(0.8, 1.1)
+        if record.start_date > self.anchor:
+            # Upcoming classes are still filling: half full a week out, a third full two weeks out
+            fill /= 1 + (record.start_date - self.anchor) / timedelta(weeks=1)
+        return min(len(self.members), round(record.capacity * min(1.0, fill)))
+
+    def _pick_members(self, rng: random.Random, count: int):
+        """count distinct members, favouring active ones."""
+        if count * 2 > len(self.members):
+            return rng.sample(self.members, count)
+        picked = {}
+        total = self._activity[-1]
+        while len(picked) < count:
+            index = bisect.bisect_left(self._activity, rng.random() * total)
+            picked.setdefault(index, self.members[index])
+        return list(picked.values())
+
+    def _person(self, rng: random.Random, index: int, role: str) -> dict:
+        born = date(1960, 1, 1) + timedelta(days=rng.randrange(45 * 365))
+        return {
+            "_id": self._object_id(self.first_day - timedelta(days=rng.randrange(3 * 365))),
+            "index": index,
+            EMAIL: f"user{index}@benchmark.test",
+            NAME: f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            BIRTHDAY: born.isoformat(),
+            ROLE: role,
+        }
+
+    def _password_hash(self) -> bytes:
+        # bcrypt.gensalt cannot be seeded, so build the salt from the seed instead
+        rng = self._random("password")
+        salt = bytes(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + bytes([rng.choice(BCRYPT_FINAL_SALT_CHARACTERS)])
+        return bcrypt.hashpw(BENCHMARK_PASSWORD.encode("utf-8"), b"$2b$%02d$%s" % (self.bcrypt_rounds, salt))
+
+    def _object_id(self, generated_at: datetime, number: int = None, stream: int = 0) -> ObjectId:
+        # Creation time first, as in a real ObjectId, then the id stream, a per-seed value and a counter
+        number = next(self._ids) if number is None else number
+        return ObjectId(struct.pack(">IB", int(generated_at.timestamp()) % (1 << 32), stream)
+                        + self._seed_bytes + number.to_bytes(4, "big"))
+
+    def _random(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+
+class MongoSink:
+    """
+    Writes documents with unordered insert_many batches. Needs an app context (or a get_collection).
+
+    Secondary indexes are dropped for the load and rebuilt afterwards: one index build is far
+    cheaper than maintaining the index on every insert, and mongomock checks unique indexes
+    by scanning the collection, which makes loading into an indexed collection quadratic.
+    """
+
+    def __init__(self, get_collection=DB.get_collection, batch_size: int = INSERT_BATCH):
+        self.get_collection = get_collection
+        self.batch_size = batch_size
+
+    def write(self, collection: str, documents) -> int:
+        target = self.get_collection(collection)
+        indexes = {name: spec for name, spec in target.index_information().items() if name != "_id_"}
+        target.drop_indexes()
+        written = 0
+        try:
+            for batch in _batches(documents, self.batch_size):
+                target.insert_many(batch, ordered=False)
+                written += len(batch)
+        finally:
+            for name, spec in indexes.items():
+                options = {option: value for option, value in spec.items() if option not in ("key", "v", "ns")}
+                target.create_index(spec["key"], name=name, **options)
+        return written
+
+
+class NDJSONSink:
+    """Writes one <collection>.ndjson file per collection, in MongoDB extended JSON."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        # bson.json_util walks every value in Python; the stdlib encoder only calls back for these three types
+        self._encoder = json.JSONEncoder(default=_extended_json)
+
+    def write(self, collection: str, documents) -> int:
+        written = 0
+        with open(os.path.join(self.directory, f"{collection}.ndjson"), "w") as output:
+            for document in documents:
+                output.write(self._encoder.encode(document))
+                output.write("\n")
+                written += 1
+        return written
+
+
+def _extended_json(value):
+    """Relaxed MongoDB extended JSON for the non-JSON types the generator emits."""
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        # Naive datetimes are stored as UTC, as pymongo does
+        return {"$date": value.isoformat(timespec="milliseconds") + "Z"}
+    if isinstance(value, bytes):
+        return {"$binary": {"base64": base64.b64encode(value).decode("ascii"), "subType": "00"}}
+    raise TypeError(f"Cannot encode {type(value).__name__} as extended JSON")
+
+
+def write_dataset(generator: WorkloadGenerator, sink) -> dict:
+    """Write users, classes and bookings to sink; returns the number written per collection."""
+    return {
+        USER_COLLECTION: sink.write(USER_COLLECTION, generator.users()),
+        CLASS_COLLECTION: sink.write(CLASS_COLLECTION, generator.classes()),
+        BOOKING_COLLECTION: sink.write(BOOKING_COLLECTION, generator.bookings()),
+    }
+
+
+def clear_collections():
+    """Empty every collection a seeded dataset touches. Needs an app context."""
+    for collection in SEEDED_COLLECTIONS:
+        DB.get_collection(collection).delete_many({})
+
+
+def _batches(documents, size: int):
+    iterator = iter(documents)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a realistic gym dataset into Mongo or NDJSON files")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--series", type=int, default=DEFAULT_SERIES, help="recurring class series")
+    parser.add_argument("--history-weeks", type=int, default=DEFAULT_HISTORY_WEEKS)
+    parser.add_argument("--classes", type=int, help="generate this many classes, ignoring --series")
+    parser.add_argument("--bookings", type=int, default=DEFAULT_BOOKINGS,
+                        help="with --classes: scale capacities to about this many bookings")
+    parser.add_argument("--future-weeks", type=int, default=DEFAULT_FUTURE_WEEKS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--anchor", type=date.fromisoformat, help="the day that counts as today (default: today)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=DEFAULT_BCRYPT_ROUNDS,
+                        help="cost of the shared password hash; logins rehash it if the app's policy differs")
+    parser.add_argument("--ndjson", metavar="DIRECTORY", help="write NDJSON files here instead of to Mongo")
+    args = parser.parse_args()
+
+    options = dict(
+        users=args.users, history_weeks=args.history_weeks, future_weeks=args.future_weeks, seed=args.seed,
+        anchor=args.anchor and datetime.combine(args.anchor, datetime.min.time()), bcrypt_rounds=args.bcrypt_rounds,
+    )
+    if args.classes:
+        generator = WorkloadGenerator.sized(classes=args.classes, bookings=args.bookings, **options)
+    else:
+        generator = WorkloadGenerator(series=args.series, **options)
+    started = time.perf_counter()
+    if args.ndjson:
+        counts = write_dataset(generator, NDJSONSink(args.ndjson))
+    else:
+        app = create_app()
+        with app.app_context():
+            ensure_benchmark_database(app.config)
+            clear_collections()
+            counts = write_dataset(generator, MongoSink())
+    print(json.dumps({"written": counts, "seconds": round(time.perf_counter() - started, 1)}))
+
+
+if __name__ == "__main__":
+    main()
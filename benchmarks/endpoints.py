@@ -0,0 +1,359 @@
+"""
+Endpoint benchmark suite.
+
+Seeds the benchmarks.datagen workload (100k users, 10k classes and about 1M bookings
+by default) into the configured Mongo, then drives every
+auth, class, booking, class member and reminder route through the real WSGI app and
+writes a JSON report with throughput and latency percentiles per route, so scaling
+can be compared release to release:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.endpoints --output endpoints.json
+    MOCK_DB=true python -m benchmarks.endpoints --scale 0.01 --requests 50   # quick run on mongomock
+
+Seeding drops the benchmark database first, so DB_NAME must contain "benchmark".
+Use --skip-seed to reuse the data from a previous run, or a dataset written by
+benchmarks.datagen.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.environment import ensure_benchmark_database, prepare_environment
+
+# Unlike the other benchmarks this one needs real volumes, so it defaults to a local mongod
+prepare_environment(MOCK_DB="false")
+
+from flask import current_app  # noqa: E402
+from flask_jwt_extended import create_access_token, create_refresh_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.db.bookings import CHANNEL_EMAIL, CHANNELS, CLASS_ID, USER_EMAIL, USER_ID  # noqa: E402
+from app.db.classes import (  # noqa: E402
+    CAPACITY,
+    DESCRIPTION,
+    END_DATE,
+    LOCATION,
+    REMAINING_SPOTS,
+    START_DATE,
+    TITLE,
+    TRAINER_ID,
+)
+from app.db.users import BIRTHDAY, EMAIL, NAME, PASSWORD, ROLE, ROLE_MEMBER, ROLE_TRAINER  # noqa: E402
+from app.services.auth_context import ROLE_CLAIM, USER_ID_CLAIM  # noqa: E402
+from app.services.container import get_services  # noqa: E402
+from benchmarks.datagen import (  # noqa: E402
+    BENCHMARK_PASSWORD,
+    DEFAULT_BOOKINGS,
+    DEFAULT_CLASSES,
+    DEFAULT_USERS,
+    LOCATIONS,
+    MongoSink,
+    WorkloadGenerator,
+    clear_collections,
+    write_dataset,
+)
+from benchmarks.stats import summarize  # noqa: E402
+
+BOOKING_SAMPLE = 1000
+# Rows in each CSV sent to /auth/import
+IMPORT_ROWS = 20
+
+
+@dataclass
+class Dataset:
+    """Ids the request factories need to build valid requests against the seeded data."""
+    trainers: list = field(default_factory=list)        # (user_id, email)
+    members: list = field(default_factory=list)         # (user_id, email)
+    free_members: list = field(default_factory=list)    # (user_id, email), no upcoming bookings
+    upcoming_classes: list = field(default_factory=list)  # (class_id, trainer_id, trainer_email), not full
+    bookings: list = field(default_factory=list)        # (booking_id, user_id, email), a sample
+
+
+def seed_dataset(users: int = DEFAULT_USERS, classes: int = DEFAULT_CLASSES, bookings: int = DEFAULT_BOOKINGS,
+                 seed: int = 0) -> Dataset:
+    """Replace the benchmark collections with a benchmarks.datagen workload. Needs an app context."""
+    ensure_benchmark_database(current_app.config)
+    # Hash at the app's bcrypt cost, so logins measure verification and not a rehash
+    generator = WorkloadGenerator.sized(users=users, classes=classes, bookings=bookings, seed=seed,
+                                        bcrypt_rounds=get_services().hash_policy.bcrypt_rounds)
+    clear_collections()
+    write_dataset(generator, MongoSink())
+    return load_dataset()
+
+
+def load_dataset(sample: int = BOOKING_SAMPLE) -> Dataset:
+    """Build the Dataset from the seeded data, or from an earlier run's or benchmarks.datagen's (--skip-seed)."""
+    services = get_services()
+    dataset = Dataset()
+    for user in services.user_resource.collection.find({}, {EMAIL: 1, ROLE: 1}):
+        target = dataset.trainers if user[ROLE] == ROLE_TRAINER else dataset.members
+        target.append((str(user["_id"]), user[EMAIL]))
+    emails = dict(dataset.trainers)
+    upcoming = services.class_resource.collection.find(
+        {START_DATE: {"$gte": datetime.now()}, REMAINING_SPOTS: {"$gt": 0}}, {TRAINER_ID: 1})
+    for fitness_class in upcoming:
+        dataset.upcoming_classes.append((str(fitness_class["_id"]), fitness_class[TRAINER_ID],
+                                         emails.get(fitness_class[TRAINER_ID])))
+    # Most members have booked some past class; any without an upcoming booking can book one
+    class_ids = [fitness_class[0] for fitness_class in dataset.upcoming_classes]
+    booked = set(services.booking_resource.collection.distinct(USER_ID, {CLASS_ID: {"$in": class_ids}}))
+    dataset.free_members = [member for member in dataset.members if member[0] not in booked]
+    for booking in services.booking_resource.collection.find({}, {USER_ID: 1, USER_EMAIL: 1}).limit(sample):
+        dataset.bookings.append((str(booking["_id"]), booking[USER_ID], booking[USER_EMAIL]))
+    return dataset
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _access(user_id: str, email: str, role: str) -> dict:
+    return _bearer(create_access_token(identity=email, additional_claims={ROLE_CLAIM: role, USER_ID_CLAIM: user_id}))
+
+
+def _refresh(user_id: str, email: str, role: str) -> dict:
+    claims = {ROLE_CLAIM: role, USER_ID_CLAIM: user_id}
+    return _bearer(create_refresh_token(identity=email, additional_claims=claims))
+
+
+# Request factories: each returns `count` (method, path, options) tuples for one route. They run in an
+# app context before timing starts, so building tokens and fixtures is not part of the measurement.
+
+def _register(dataset: Dataset, count: int, rng: random.Random):
+    run = rng.randrange(1 << 30)
+    return [("POST", "/auth/register", {"json": {
+        EMAIL: f"new{run}-{index}@benchmark.test", PASSWORD: BENCHMARK_PASSWORD, NAME: f"New {index}",
+        BIRTHDAY: "1995-05-05", ROLE: ROLE_MEMBER,
+    }}) for index in range(count)]
+
+
+def _login(dataset: Dataset, count: int, rng: random.Random):
+    return [("POST", "/auth/login", {"json": {EMAIL: rng.choice(dataset.members)[1], PASSWORD: BENCHMARK_PASSWORD}})
+            for _ in range(count)]
+
+
+def _refresh_tokens(dataset: Dataset, count: int, rng: random.Random):
+    # Refresh tokens are single use, so every request gets its own
+    return [("POST", "/auth/refresh", {"headers": _refresh(*rng.choice(dataset.members), ROLE_MEMBER)})
+            for _ in range(count)]
+
+
+def _import(dataset: Dataset, count: int, rng: random.Random):
+    run = rng.randrange(1 << 30)
+    trainer = _access(*dataset.trainers[0], ROLE_TRAINER)
+    requests = []
+    for index in range(count):
+        lines = [f"{EMAIL},{PASSWORD},{NAME},{BIRTHDAY}"] + [
+            f"import{run}-{index}-{row}@benchmark.test,{BENCHMARK_PASSWORD},Imported {row},1990-01-01"
+            for row in range(IMPORT_ROWS)
+        ]
+        requests.append(("POST", "/auth/import", {
+            "data": "\n".join(lines), "headers": {**trainer, "Content-Type": "text/csv"},
+        }))
+    return requests
+
+
+def _create_class(dataset: Dataset, count: int, rng: random.Random):
+    trainer_id, trainer_email = rng.choice(dataset.trainers)
+    headers = _access(trainer_id, trainer_email, ROLE_TRAINER)
+    # Far in the future and a day apart, so new classes never overlap the seeded ones or each other
+    first = datetime.now().replace(microsecond=0) + timedelta(days=3650 + rng.randrange(3650))
+    requests = []
+    for index in range(count):
+        start = first + timedelta(days=index)
+        requests.append(("POST", "/classes", {"headers": headers, "json": {
+            TITLE: f"Benchmark class {index}",
+            START_DATE: start.strftime("%Y-%m-%d %H:%M:%S"),
+            END_DATE: (start + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+            CAPACITY: 20,
+            LOCATION: rng.choice(LOCATIONS),
+            DESCRIPTION: "Created by the endpoint benchmark",
+        }}))
+    return requests
+
+
+def _list_classes(dataset: Dataset, count: int, rng: random.Random):
+    return [("GET", "/classes", {})] * count
+
+
+def _class_members(dataset: Dataset, count: int, rng: random.Random):
+    requests = []
+    for _ in range(count):
+        class_id, trainer_id, trainer_email = rng.choice(dataset.upcoming_classes)
+        headers = _access(trainer_id, trainer_email, ROLE_TRAINER)
+        requests.append(("GET", f"/classes/{class_id}/members", {"headers": headers}))
+    return requests
+
+
+def _queue_reminder(dataset: Dataset, count: int, rng: random.Random):
+    requests = []
+    for _ in range(count):
+        class_id, trainer_id, trainer_email = rng.choice(dataset.upcoming_classes)
+        headers = _access(trainer_id, trainer_email, ROLE_TRAINER)
+        requests.append(("POST", f"/classes/{class_id}/reminder", {"headers": headers}))
+    return requests
+
+
+def _reminder_job(dataset: Dataset, count: int, rng: random.Random):
+    requests = []
+    reminder_service = get_services().reminder_service
+    for _ in range(count):
+        class_id, trainer_id, trainer_email = rng.choice(dataset.upcoming_classes)
+        job_id = str(reminder_service.job_resource.enqueue(class_id, trainer_id))
+        requests.append(("GET", f"/classes/{class_id}/reminder/jobs/{job_id}", {
+            "headers": _access(trainer_id, trainer_email, ROLE_TRAINER),
+        }))
+    return requests
+
+
+def _book(dataset: Dataset, count: int, rng: random.Random):
+    requests = []
+    first = rng.randrange(len(dataset.upcoming_classes))
+    classes = len(dataset.upcoming_classes)
+    for index in range(count):
+        # Spread over the classes so none fills up, and use every (member, class) pair once,
+        # so no request is a duplicate booking
+        user_id, email = dataset.free_members[index // classes % len(dataset.free_members)]
+        class_id = dataset.upcoming_classes[(first + index) % classes][0]
+        requests.append(("POST", "/bookings", {"headers": _access(user_id, email, ROLE_MEMBER),
+                                               "json": {CLASS_ID: class_id}}))
+    return requests
+
+
+def _my_classes(dataset: Dataset, count: int, rng: random.Random):
+    # Members with no bookings get a 404, so ask as the holder of a sampled booking
+    return [("GET", "/bookings/my-classes", {"headers": _access(*rng.choice(dataset.bookings)[1:], ROLE_MEMBER)})
+            for _ in range(count)]
+
+
+def _update_preferences(dataset: Dataset, count: int, rng: random.Random):
+    requests = []
+    for _ in range(count):
+        booking_id, user_id, email = rng.choice(dataset.bookings)
+        requests.append(("PATCH", f"/bookings/{booking_id}/notifications", {
+            "headers": _access(user_id, email, ROLE_MEMBER), "json": {CHANNELS: [CHANNEL_EMAIL]},
+        }))
+    return requests
+
+
+ROUTES = {
+    "POST /auth/register": _register,
+    "POST /auth/login": _login,
+    "POST /auth/refresh": _refresh_tokens,
+    "POST /auth/import": _import,
+    "POST /classes": _create_class,
+    "GET /classes": _list_classes,
+    "GET /classes/<class_id>/members": _class_members,
+    "POST /classes/<class_id>/reminder": _queue_reminder,
+    "GET /classes/<class_id>/reminder/jobs/<job_id>": _reminder_job,
+    "POST /bookings": _book,
+    "GET /bookings/my-classes": _my_classes,
+    "PATCH /bookings/<booking_id>/notifications": _update_preferences,
+}
+
+
+def measure(app, requests: list, concurrency: int = 1) -> dict:
+    """Send the requests from `concurrency` threads and report status codes, throughput and latency."""
+    local = threading.local()
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+
+    def send(request):
+        method, path, options = request
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        started = time.perf_counter()
+        response = client.open(path, method=method, **options)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, requests))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": len(requests),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(requests) / wall, 2) if wall else 0.0,
+        "latency": summarize(latencies),
+    }
+
+
+def run_benchmarks(app, dataset: Dataset, requests: int = 200, concurrency: int = 8, routes: list = None,
+                   seed: int = 0) -> dict:
+    """Measure each route in turn; returns {route: measurement}."""
+    rng = random.Random(seed)
+    results = {}
+    for route in routes or ROUTES:
+        with app.app_context():
+            route_requests = ROUTES[route](dataset, requests, rng)
+        results[route] = measure(app, route_requests, concurrency)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route against a seeded dataset")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--classes", type=int, default=DEFAULT_CLASSES)
+    parser.add_argument("--bookings", type=int, default=DEFAULT_BOOKINGS, help="approximate")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the three volumes above")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTES), help="only these routes")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    app = create_app()
+    volumes = {name: max(1, int(getattr(args, name) * args.scale)) for name in ("users", "classes", "bookings")}
+    with app.app_context():
+        started = time.perf_counter()
+        dataset = load_dataset() if args.skip_seed else seed_dataset(seed=args.seed, **volumes)
+        seed_seconds = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "mock_db": app.config["MOCK_DB"],
+            "dataset": volumes if not args.skip_seed else "existing",
+            "seed_seconds": round(seed_seconds, 1),
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "routes": run_benchmarks(app, dataset, args.requests, args.concurrency, args.routes, args.seed),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+
+# Settings Config requires, filled in when the shell does not set them. MOCK_DB defaults to
+# mongomock; export MOCK_DB=false and MONGO_URI to benchmark against a real mongod.
+DEFAULT_ENVIRONMENT = {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "DB_NAME": "fitness_class_benchmark",
+    "MOCK_DB": "true",
+    "DEBUG": "false",
+    "JWT_SECRET_KEY": "benchmark-secret-key",
+    "SES_SENDER_EMAIL": "benchmark@example.com",
+    # The stand-ins ignore signatures, but botocore refuses to send unsigned requests
+    "AWS_ACCESS_KEY_ID": "benchmark",
+    "AWS_SECRET_ACCESS_KEY": "benchmark",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    # Calibrating the password hash cost would add seconds to every start
+    "PASSWORD_HASH_TARGET_MS": "0",
+}
+
+
+def prepare_environment(**defaults):
+    """
+    Fill in missing settings, with keyword arguments taking precedence over the defaults
+    above. Call before importing app, since Config reads them at import time.
+    """
+    for name, value in {**DEFAULT_ENVIRONMENT, **defaults}.items():
+        os.environ.setdefault(name, value)
+
+
+def ensure_benchmark_database(config):
+    """Seeding clears collections first; refuse unless on mongomock or a database named for benchmarks."""
+    if "benchmark" not in config["DB_NAME"] and not config["MOCK_DB"]:
+        raise RuntimeError(f"Refusing to drop {config['DB_NAME']!r}; seed a database whose name contains 'benchmark'")
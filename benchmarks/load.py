@@ -0,0 +1,346 @@
+"""
+Scenario-driven load harness.
+
+Seeds a realistic dataset with benchmarks.datagen, then replays scripted traffic
+against the real WSGI app from many client threads:
+
+- booking-storm: a popular class opens and --storm-members members POST /bookings at the same instant
+- login-wave: members log in at --login-rate per second, as at the start of the morning
+- trainer-roster: trainers open the member list of each of their upcoming classes
+- catalog-polling: --pollers clients refresh GET /classes every --poll-interval seconds
+
+Each scenario reports throughput, latency percentiles, status codes and the Mongo
+commands it caused. Paced scenarios measure latency from each request's scheduled
+send time, so a backed-up server shows up as latency instead of a lower send rate:
+
+    python -m benchmarks.load --users 5000 --output load.json
+    python -m benchmarks.load --scenarios booking-storm --storm-members 500 --storm-capacity 40
+    MOCK_DB=false MONGO_URI=mongodb://localhost:27017 python -m benchmarks.load
+
+Mongo commands are counted with a pymongo CommandListener; on mongomock, where
+there is no command monitoring, collection method calls are counted under the
+command name pymongo would send.
+"""
+
+import argparse
+import functools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+import mongomock
+from pymongo import monitoring
+
+from benchmarks.environment import ensure_benchmark_database, prepare_environment
+
+prepare_environment()
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.db.bookings import CLASS_ID  # noqa: E402
+from app.db.classes import START_DATE, TRAINER_ID  # noqa: E402
+from app.db.users import EMAIL, PASSWORD, ROLE_MEMBER, ROLE_TRAINER  # noqa: E402
+from app.services.auth_context import ROLE_CLAIM, USER_ID_CLAIM  # noqa: E402
+from app.services.container import get_services  # noqa: E402
+from benchmarks.datagen import (  # noqa: E402
+    BENCHMARK_PASSWORD,
+    MongoSink,
+    WorkloadGenerator,
+    clear_collections,
+    write_dataset,
+)
+from benchmarks.stats import summarize  # noqa: E402
+
+# mongomock collection methods and the command pymongo sends for each
+MONGOMOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+    "count_documents": "aggregate",
+    "aggregate": "aggregate",
+    "distinct": "distinct",
+    "create_index": "createIndexes",
+}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts Mongo commands by name, from pymongo command events or instrumented mongomock calls."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, command_name: str):
+        with self._lock:
+            self.counts[command_name] += 1
+
+    def started(self, event):
+        self.record(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self) -> dict:
+        """Return the counts so far and start again from zero."""
+        with self._lock:
+            counts, self.counts = dict(self.counts), Counter()
+        return counts
+
+
+COMMANDS = CommandCounter()
+_installed = False
+
+
+def install_command_counter():
+    """
+    Start counting commands into COMMANDS. Call before create_app: pymongo only
+    reports to clients created after their listener is registered.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    monitoring.register(COMMANDS)
+    for method, command in MONGOMOCK_COMMANDS.items():
+        setattr(mongomock.Collection, method, _counted(getattr(mongomock.Collection, method), command))
+
+
+_mongomock_calls = threading.local()
+
+
+def _counted(method, command: str):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        # mongomock methods call each other (find_one calls find); count only the outermost call
+        if getattr(_mongomock_calls, "active", False):
+            return method(*args, **kwargs)
+        COMMANDS.record(command)
+        _mongomock_calls.active = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _mongomock_calls.active = False
+    return wrapper
+
+
+@dataclass
+class Plan:
+    """The requests one scenario sends, and how."""
+    requests: list
+    concurrency: int
+    # Requests per second, or None to send as fast as the threads allow
+    rate: float = None
+    # Hold every thread at a barrier and release them together
+    burst: bool = False
+    # Called after the run, in an app context; returns extra numbers for the report
+    verify: callable = None
+    details: dict = field(default_factory=dict)
+
+
+def drive(app, plan: Plan) -> dict:
+    """Send the plan's requests and report throughput, latency, status codes and Mongo commands."""
+    local = threading.local()
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(plan.concurrency) if plan.burst else None
+
+    def send(indexed):
+        index, (method, path, options) = indexed
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        if barrier is not None:
+            barrier.wait()
+        scheduled = time.perf_counter()
+        if plan.rate:
+            scheduled = started + index / plan.rate
+            time.sleep(max(0.0, scheduled - time.perf_counter()))
+        response = client.open(path, method=method, **options)
+        elapsed = time.perf_counter() - scheduled
+        with lock:
+            latencies.append(elapsed)
+            statuses[response.status_code] += 1
+
+    COMMANDS.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=plan.concurrency) as executor:
+        list(executor.map(send, enumerate(plan.requests)))
+    wall = time.perf_counter() - started
+    commands = COMMANDS.reset()
+
+    report = {
+        **plan.details,
+        "requests": len(plan.requests),
+        "server_errors": sum(count for status, count in statuses.items() if status >= 500),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": round(wall, 3),
+        "throughput_rps": round(len(plan.requests) / wall, 2) if wall else 0.0,
+        "latency": summarize(latencies),
+        "mongo_commands": {
+            "total": sum(commands.values()),
+            "per_request": round(sum(commands.values()) / max(1, len(plan.requests)), 2),
+            "by_command": dict(sorted(commands.items())),
+        },
+    }
+    if plan.verify:
+        with app.app_context():
+            report.update(plan.verify())
+    return report
+
+
+def _headers(person: dict, role: str) -> dict:
+    claims = {ROLE_CLAIM: role, USER_ID_CLAIM: str(person["_id"])}
+    return {"Authorization": f"Bearer {create_access_token(identity=person[EMAIL], additional_claims=claims)}"}
+
+
+# Scenario builders run in an app context and return a Plan. Tokens and fixtures are made
+# here, before the clock starts.
+
+def booking_storm(generator: WorkloadGenerator, options, rng: random.Random) -> Plan:
+    services = get_services()
+    trainer = rng.choice(generator.trainers)
+    # Far enough out not to clash with the generated calendar
+    start = generator.anchor + timedelta(days=365, hours=rng.randrange(24))
+    class_id = str(services.class_resource.create_class(
+        title="Storm Spin", trainer_id=str(trainer["_id"]), trainer_name=trainer["name"], start_date=start,
+        end_date=start + timedelta(hours=1), capacity=options.storm_capacity, location="Studio A",
+        description="Opens to everyone at once",
+    ))
+    members = rng.sample(generator.members, min(options.storm_members, len(generator.members)))
+
+    def verify():
+        booked = services.booking_resource.count_member_bookings(class_id)
+        return {"booked": booked, "oversold": max(0, booked - options.storm_capacity)}
+
+    return Plan(
+        requests=[("POST", "/bookings", {"headers": _headers(member, ROLE_MEMBER), "json": {CLASS_ID: class_id}})
+                  for member in members],
+        concurrency=len(members),
+        burst=True,
+        verify=verify,
+        details={"capacity": options.storm_capacity},
+    )
+
+
+def login_wave(generator: WorkloadGenerator, options, rng: random.Random) -> Plan:
+    members = rng.choices(generator.members, k=options.logins)
+    return Plan(
+        requests=[("POST", "/auth/login", {"json": {EMAIL: member[EMAIL], PASSWORD: BENCHMARK_PASSWORD}})
+                  for member in members],
+        concurrency=options.concurrency,
+        rate=options.login_rate,
+    )
+
+
+def trainer_roster(generator: WorkloadGenerator, options, rng: random.Random) -> Plan:
+    classes = get_services().class_resource.collection
+    requests = []
+    for trainer in rng.sample(generator.trainers, min(options.roster_trainers, len(generator.trainers))):
+        headers = _headers(trainer, ROLE_TRAINER)
+        upcoming = classes.find({TRAINER_ID: str(trainer["_id"]), START_DATE: {"$gte": generator.anchor}}, {"_id": 1})
+        for fitness_class in upcoming.sort(START_DATE, 1).limit(options.roster_classes):
+            requests.append(("GET", f"/classes/{fitness_class['_id']}/members", {"headers": headers}))
+    rng.shuffle(requests)
+    return Plan(requests=requests, concurrency=options.concurrency)
+
+
+def catalog_polling(generator: WorkloadGenerator, options, rng: random.Random) -> Plan:
+    rate = options.pollers / options.poll_interval
+    return Plan(
+        requests=[("GET", "/classes", {})] * max(1, int(rate * options.poll_duration)),
+        concurrency=options.concurrency,
+        rate=rate,
+        details={"pollers": options.pollers},
+    )
+
+
+SCENARIOS = {
+    "booking-storm": booking_storm,
+    "login-wave": login_wave,
+    "trainer-roster": trainer_roster,
+    "catalog-polling": catalog_polling,
+}
+
+
+def seed_database(app, users: int, series: int, seed: int = 0) -> WorkloadGenerator:
+    """Replace the benchmark database's contents with a generated dataset."""
+    with app.app_context():
+        ensure_benchmark_database(app.config)
+        # Hash at the app's bcrypt cost, so logins measure verification and not a rehash
+        generator = WorkloadGenerator(users=users, series=series, history_weeks=4, seed=seed,
+                                      bcrypt_rounds=get_services().hash_policy.bcrypt_rounds)
+        clear_collections()
+        write_dataset(generator, MongoSink())
+    return generator
+
+
+def run_scenarios(app, generator: WorkloadGenerator, options, scenarios: list = None) -> dict:
+    """Run each scenario in turn; returns {scenario: report}."""
+    rng = random.Random(options.seed)
+    results = {}
+    for name in scenarios or SCENARIOS:
+        with app.app_context():
+            plan = SCENARIOS[name](generator, options, rng)
+        results[name] = drive(app, plan)
+    return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay scripted load scenarios against the app")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="only these scenarios")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--series", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads for paced scenarios")
+    parser.add_argument("--storm-members", type=int, default=300)
+    parser.add_argument("--storm-capacity", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-rate", type=float, default=50, help="logins per second")
+    parser.add_argument("--roster-trainers", type=int, default=20)
+    parser.add_argument("--roster-classes", type=int, default=5, help="upcoming classes each trainer opens")
+    parser.add_argument("--pollers", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=5, help="seconds between one client's polls")
+    parser.add_argument("--poll-duration", type=float, default=10, help="seconds of polling")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser
+
+
+def main():
+    options = build_parser().parse_args()
+    install_command_counter()
+    app = create_app()
+    generator = seed_database(app, options.users, options.series, options.seed)
+    report = {
+        "meta": {"mock_db": app.config["MOCK_DB"], "users": options.users, "series": options.series,
+                 "classes": sum(1 for _ in generator.classes())},
+        "scenarios": run_scenarios(app, generator, options, options.scenarios),
+    }
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as output:
+            output.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
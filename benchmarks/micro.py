@@ -0,0 +1,311 @@
+"""
+Microbenchmarks for hot pure-Python paths, with a committed baseline.
+
+Each benchmark times one call of a function the request path runs many times
+(serializing Mongo documents, expanding recurrences, parsing class payloads,
+building API dicts, validating notification preferences). Times are also
+divided by a fixed calibration loop run in the same process, which keeps the
+committed baseline roughly comparable across machines; compare on absolute
+nanoseconds with --absolute when both runs come from the same machine:
+
+    python -m benchmarks.micro run
+    python -m benchmarks.micro compare --threshold 0.25
+    python -m benchmarks.micro compare --against origin/main
+    python -m benchmarks.micro record
+
+compare exits non-zero when any benchmark is slower than its baseline by more
+than --threshold. With --against, the baseline is timed right there from a
+checkout of that git revision, so both sides ran on the same machine; CI gates
+on that, since shared runners differ too much from whatever recorded the
+committed file. Re-record the baseline in the same commit as a change that is
+expected to move the numbers.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+
+from bson import ObjectId
+
+from benchmarks.environment import prepare_environment
+
+prepare_environment()
+
+from app.db.bookings import CHANNEL_EMAIL, CHANNEL_TELEGRAM, CHANNELS, TELEGRAM_CHAT_ID  # noqa: E402
+from app.db.classes import (  # noqa: E402
+    CAPACITY,
+    CREATED_AT,
+    DESCRIPTION,
+    END_DATE,
+    LOCATION,
+    REMAINING_SPOTS,
+    START_DATE,
+    TITLE,
+    TRAINER_ID,
+    TRAINER_NAME,
+    ClassResource,
+)
+from app.db.utils import serialize_item, serialize_items  # noqa: E402
+from app.services.booking_service import BookingService  # noqa: E402
+from app.services.class_models import (  # noqa: E402
+    CLASS_DATE_FORMAT,
+    ClassSchedule,
+    CreateClassRequest,
+    RecurrenceRule,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "micro.json")
+DEFAULT_THRESHOLD = 0.25
+
+START = datetime(2099, 1, 5, 18, 0)
+END = datetime(2099, 1, 5, 19, 0)
+
+
+def _class_document() -> dict:
+    return {
+        "_id": ObjectId("65a1f0c2e4b0a1b2c3d4e5f6"),
+        TITLE: "Evening Spin",
+        TRAINER_ID: "65a1f0c2e4b0a1b2c3d4e5f0",
+        TRAINER_NAME: "Jordan Trainer",
+        START_DATE: START,
+        END_DATE: END,
+        CAPACITY: 20,
+        LOCATION: "Studio A",
+        DESCRIPTION: "High-intensity intervals on the bike",
+        CREATED_AT: datetime(2098, 12, 1, 9, 30),
+        REMAINING_SPOTS: 7,
+    }
+
+
+# Each entry builds its inputs once and returns the call to time. serialize_item rewrites its
+# argument in place, so those calls copy a fresh document first, as a cursor would hand one over.
+
+def bench_serialize_item():
+    document = _class_document()
+    return lambda: serialize_item(dict(document))
+
+
+def bench_serialize_items():
+    documents = [_class_document() for _ in range(100)]
+    return lambda: serialize_items([dict(document) for document in documents])
+
+
+def bench_generate_weekly_schedules():
+    rule = RecurrenceRule(frequency="weekly", occurrences=52)
+    schedule = ClassSchedule(start_date=START, end_date=END)
+    return lambda: rule.generate_schedules(schedule)
+
+
+def bench_generate_monthly_schedules():
+    rule = RecurrenceRule(frequency="monthly", occurrences=24)
+    schedule = ClassSchedule(start_date=START, end_date=END)
+    return lambda: rule.generate_schedules(schedule)
+
+
+def bench_create_class_from_payload():
+    payload = {
+        TITLE: "Evening Spin",
+        START_DATE: START.strftime(CLASS_DATE_FORMAT),
+        END_DATE: END.strftime(CLASS_DATE_FORMAT),
+        CAPACITY: 20,
+        LOCATION: "Studio A",
+        DESCRIPTION: "High-intensity intervals on the bike",
+        "recurrence": {"frequency": "weekly", "occurrences": 12},
+    }
+    return lambda: CreateClassRequest.from_payload(payload)
+
+
+def bench_class_to_dict():
+    # to_dict only reads its argument; skip __init__, which needs a database
+    resource = ClassResource.__new__(ClassResource)
+    document = serialize_item(_class_document())
+    return lambda: resource.to_dict(document, remaining_spots=7)
+
+
+def bench_build_notification_preferences():
+    service = BookingService.__new__(BookingService)
+    service.notification_channels = lambda: [CHANNEL_EMAIL, CHANNEL_TELEGRAM]
+    data = {CHANNELS: [CHANNEL_EMAIL, CHANNEL_TELEGRAM, CHANNEL_EMAIL], TELEGRAM_CHAT_ID: "123456789"}
+    return lambda: service._build_notification_preferences(data)
+
+
+BENCHMARKS = {
+    "serialize_item": bench_serialize_item,
+    "serialize_items[100]": bench_serialize_items,
+    "RecurrenceRule.generate_schedules[weekly x52]": bench_generate_weekly_schedules,
+    "RecurrenceRule.generate_schedules[monthly x24]": bench_generate_monthly_schedules,
+    "CreateClassRequest.from_payload[weekly x12]": bench_create_class_from_payload,
+    "ClassResource.to_dict": bench_class_to_dict,
+    "BookingService._build_notification_preferences": bench_build_notification_preferences,
+}
+
+
+def _calibration_loop():
+    total = 0
+    for number in range(1000):
+        total += number * number % 7
+    return total
+
+
+def _calls_for(timer: timeit.Timer, min_time: float) -> int:
+    calls, elapsed = timer.autorange()
+    return max(1, int(calls * min_time / elapsed)) if elapsed else calls
+
+
+def time_call(function, min_time: float = 0.1, repeat: int = 7) -> tuple:
+    """
+    Time `function` in `repeat` rounds of about `min_time` seconds, each right after a round of
+    the calibration loop. Returns (best ns per call, median ratio to the calibration loop): a
+    burst of load from elsewhere on the machine slows both halves of a round alike, so the
+    ratio stays put when the raw times do not.
+    """
+    timer, calibration = timeit.Timer(function), timeit.Timer(_calibration_loop)
+    calls, calibration_calls = _calls_for(timer, min_time), _calls_for(calibration, min_time)
+    best, ratios = float("inf"), []
+    for _ in range(repeat):
+        calibration_ns = calibration.timeit(calibration_calls) / calibration_calls
+        ns = timer.timeit(calls) / calls
+        best = min(best, ns)
+        ratios.append(ns / calibration_ns)
+    return best * 1e9, statistics.median(ratios)
+
+
+def run(names: list = None, min_time: float = 0.1, repeat: int = 7) -> dict:
+    """Time each benchmark; returns its best ns per call and its time relative to the calibration loop."""
+    results = {}
+    for name in names or BENCHMARKS:
+        ns, relative = time_call(BENCHMARKS[name](), min_time, repeat)
+        results[name] = {"ns_per_call": round(ns, 1), "relative": round(relative, 6)}
+    return {
+        "meta": {"python": platform.python_version(), "machine": platform.machine()},
+        "benchmarks": results,
+    }
+
+
+def run_at(revision: str, min_time: float = 0.1, repeat: int = 7):
+    """
+    Time the benchmarks as they are at a git revision, checked out into a temporary worktree and
+    run in a child process on this machine. None when the revision cannot be checked out or has
+    no benchmarks to run.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        worktree = os.path.join(directory, "worktree")
+        added = subprocess.run(["git", "worktree", "add", "--detach", worktree, revision],
+                               cwd=REPO_ROOT, capture_output=True)
+        if added.returncode != 0:
+            return None
+        try:
+            output = os.path.join(directory, "report.json")
+            timed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.micro", "run", "--output", output,
+                 "--min-time", str(min_time), "--repeat", str(repeat)],
+                cwd=worktree, capture_output=True,
+            )
+            return load_report(output) if timed.returncode == 0 else None
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=REPO_ROOT, capture_output=True)
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD, absolute: bool = False) -> list:
+    """
+    One row per benchmark in either report: (name, baseline, current, change, verdict), where
+    change is the fractional slowdown and verdict is ok, regressed, improved, new or missing.
+    """
+    metric = "ns_per_call" if absolute else "relative"
+    rows = []
+    for name in sorted(set(baseline["benchmarks"]) | set(current["benchmarks"])):
+        before = baseline["benchmarks"].get(name, {}).get(metric)
+        after = current["benchmarks"].get(name, {}).get(metric)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+        change = after / before - 1
+        verdict = "regressed" if change > threshold else "improved" if change < -threshold else "ok"
+        rows.append((name, before, after, change, verdict))
+    return rows
+
+
+def format_rows(rows: list) -> str:
+    width = max(len(row[0]) for row in rows)
+    lines = [f"{'benchmark':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}  verdict"]
+    for name, before, after, change, verdict in rows:
+        lines.append(f"{name:<{width}}  {before if before is not None else '-':>12}  "
+                     f"{after if after is not None else '-':>12}  "
+                     f"{f'{change:+.1%}' if change is not None else '-':>8}  {verdict}")
+    return "\n".join(lines)
+
+
+def load_report(path: str) -> dict:
+    with open(path) as report:
+        return json.load(report)
+
+
+def write_report(report: dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write("\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Time hot-path functions and compare them with a baseline")
+    parser.add_argument("command", choices=["run", "compare", "record"])
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), help="only these benchmarks")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline report to compare with or record to")
+    parser.add_argument("--against", metavar="REVISION",
+                        help="time the baseline from this git revision instead; "
+                             "falls back to --baseline when it has no benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="largest allowed slowdown, as a fraction (0.25 is 25%% slower)")
+    parser.add_argument("--absolute", action="store_true",
+                        help="compare ns per call instead of calibration-relative times")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=7, help="timing rounds per benchmark")
+    parser.add_argument("--output", help="also write this run's report here")
+    return parser
+
+
+def main(argv: list = None) -> int:
+    options = build_parser().parse_args(argv)
+    baseline = None
+    if options.command == "compare" and options.against:
+        baseline = run_at(options.against, options.min_time, options.repeat)
+        if baseline is None:
+            print(f"No benchmarks to run at {options.against}, comparing with {options.baseline}")
+    report = run(options.benchmarks, options.min_time, options.repeat)
+    if options.output:
+        write_report(report, options.output)
+
+    if options.command == "record":
+        write_report(report, options.baseline)
+        print(f"Recorded {len(report['benchmarks'])} benchmarks to {options.baseline}")
+        return 0
+    if options.command == "run":
+        print(json.dumps(report, indent=2))
+        return 0
+
+    if baseline is None:
+        baseline = load_report(options.baseline)
+    if options.benchmarks:
+        baseline["benchmarks"] = {name: baseline["benchmarks"][name]
+                                  for name in options.benchmarks if name in baseline["benchmarks"]}
+    rows = compare(baseline, report, options.threshold, options.absolute)
+    print(format_rows(rows))
+    regressed = [row[0] for row in rows if row[4] == "regressed"]
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) more than {options.threshold:.0%} slower than the baseline: "
+              f"{', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
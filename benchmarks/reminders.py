@@ -0,0 +1,167 @@
+"""
+Reminder throughput benchmark.
+
+Seeds one class with N bookings (a share of them also on Telegram), then runs the
+reminder job for it end to end - queue, worker, dispatcher, SESEmailService and
+TelegramNotificationService - against the local stand-ins from benchmarks.stubs.
+Reports messages per second and per-message delivery latency:
+
+    python -m benchmarks.reminders --bookings 5000 --ses-latency 0.05 --json reminders.json
+
+Any app setting can be overridden through the environment as usual, e.g.
+REMINDER_MAX_WORKERS=64 or TELEGRAM_GLOBAL_RATE=100.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.environment import prepare_environment
+
+prepare_environment()
+
+from app import create_app  # noqa: E402
+from app.db.bookings import CHANNEL_EMAIL, CHANNEL_TELEGRAM, CHANNELS, TELEGRAM_CHAT_ID  # noqa: E402
+from app.db.reminder_jobs import RESULTS  # noqa: E402
+from app.services.container import get_services  # noqa: E402
+from benchmarks.stats import summarize  # noqa: E402
+from benchmarks.stubs import ses_stub, telegram_stub  # noqa: E402
+
+TRAINER_ID = "benchmark-trainer"
+
+
+class TimedChannel:
+    """Wraps a notification strategy and records how long each message took to be accepted."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    def send_batch(self, messages):
+        started = time.perf_counter()
+        try:
+            return self.strategy.send_batch(messages)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.samples.extend([elapsed] * len(messages))
+
+
+def configure_app(app, ses_url: str, telegram_url: str):
+    """Point the app's notification channels at the stand-ins. Call before the dispatcher is first used."""
+    app.config.update(
+        SES_ENDPOINT_URL=ses_url,
+        TELEGRAM_API_BASE_URL=telegram_url,
+        TELEGRAM_BOT_TOKEN=app.config["TELEGRAM_BOT_TOKEN"] or "benchmark-token",
+    )
+
+
+def seed_class(bookings: int, telegram_share: float = 0.1, seed: int = 0) -> str:
+    """Create a class starting tomorrow with the given number of member bookings. Returns the class id."""
+    services = get_services()
+    start = datetime.now() + timedelta(days=1)
+    class_id = str(services.class_resource.create_class(
+        title="Benchmark Spin",
+        trainer_id=TRAINER_ID,
+        trainer_name="Benchmark Trainer",
+        start_date=start,
+        end_date=start + timedelta(hours=1),
+        capacity=bookings,
+        location="Studio B",
+        description="Reminder benchmark class",
+    ))
+
+    rng = random.Random(seed)
+    for index in range(bookings):
+        preferences = None
+        if rng.random() < telegram_share:
+            preferences = {CHANNELS: [CHANNEL_EMAIL, CHANNEL_TELEGRAM], TELEGRAM_CHAT_ID: str(100000 + index)}
+        services.booking_resource.create_booking(
+            class_id, f"member-{index}", f"member{index}@example.com", f"Member {index}",
+            notification_preferences=preferences,
+        )
+    return class_id
+
+
+def run_benchmark(class_id: str, runs: int = 1) -> dict:
+    """Send the class reminder `runs` times and report throughput and latency per channel."""
+    services = get_services()
+    dispatcher = services.notification_dispatcher
+    timed = {channel: TimedChannel(strategy) for channel, strategy in dispatcher.strategies.items()}
+    dispatcher.strategies.update(timed)
+
+    durations, messages, failed = [], 0, 0
+    try:
+        for _ in range(runs):
+            response, status = services.reminder_service.queue_reminder(class_id, TRAINER_ID)
+            if "job_id" not in response:
+                raise RuntimeError(f"Could not queue the reminder: {status} {response}")
+            started = time.perf_counter()
+            services.reminder_worker.run_once()
+            durations.append(time.perf_counter() - started)
+
+            job = services.reminder_job_resource.get_job(response["job_id"])
+            for result in job.get(RESULTS, []):
+                for outcome in result[CHANNELS].values():
+                    messages += 1
+                    failed += outcome["status"] != "sent"
+    finally:
+        dispatcher.strategies.update({channel: channel_timer.strategy for channel, channel_timer in timed.items()})
+
+    per_run = messages / runs
+    return {
+        "runs": runs,
+        "messages_per_run": per_run,
+        "failed": failed,
+        "seconds_per_run": [round(duration, 3) for duration in durations],
+        "messages_per_second": round(per_run / statistics.median(durations), 1),
+        "latency": {channel: summarize(channel_timer.samples) for channel, channel_timer in timed.items()
+                    if channel_timer.samples},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure reminder throughput against local SES/Telegram stand-ins")
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--telegram-share", type=float, default=0.1, help="share of bookings also on Telegram")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ses-latency", type=float, default=0.02, help="seconds per SES call")
+    parser.add_argument("--telegram-latency", type=float, default=0.02, help="seconds per Telegram call")
+    parser.add_argument("--jitter", type=float, default=0.01, help="extra random latency, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls failing with a 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of calls throttled")
+    parser.add_argument("--ses-rate-limit", type=float, default=0, help="SES messages per second (0 = none)")
+    parser.add_argument("--telegram-rate-limit", type=float, default=0, help="Telegram messages per second")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    failures = {"jitter": args.jitter, "error_rate": args.error_rate, "throttle_rate": args.throttle_rate,
+                "seed": args.seed}
+    ses = ses_stub(latency=args.ses_latency, rate_limit=args.ses_rate_limit, **failures)
+    telegram = telegram_stub(latency=args.telegram_latency, rate_limit=args.telegram_rate_limit, **failures)
+    with ses, telegram:
+        app = create_app()
+        configure_app(app, ses.url, telegram.url)
+        with app.app_context():
+            class_id = seed_class(args.bookings, args.telegram_share, args.seed)
+            report = run_benchmark(class_id, args.runs)
+        report["bookings"] = args.bookings
+        report["stubs"] = {"ses": dict(ses.counters), "telegram": dict(telegram.counters)}
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import math
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of values (pct between 0 and 100); 0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(seconds: list) -> dict:
+    """Count, mean and tail percentiles of durations given in seconds, reported in milliseconds."""
+    ordered = sorted(seconds)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(1000 * percentile(ordered, 50), 3),
+        "p95_ms": round(1000 * percentile(ordered, 95), 3),
+        "p99_ms": round(1000 * percentile(ordered, 99), 3),
+        "max_ms": round(1000 * ordered[-1], 3) if ordered else 0.0,
+    }
@@ -0,0 +1,255 @@
+"""
+Local stand-ins for Amazon SES and the Telegram Bot API.
+
+They speak enough of each protocol for SESEmailService and TelegramNotificationService
+to run unchanged against them (through SES_ENDPOINT_URL and TELEGRAM_API_BASE_URL),
+with configurable latency, error rate and throttling. Run one next to the app:
+
+    python -m benchmarks.stubs ses --port 9001 --latency 0.05 --throttle-rate 0.01
+    python -m benchmarks.stubs telegram --port 9002 --rate-limit 30
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+SES_XML_NAMESPACE = "http://ses.amazonaws.com/doc/2010-12-01/"
+SES_DESTINATION_FIELD = re.compile(r"^Destinations\.member\.\d+\.Destination\.ToAddresses\.member\.1$")
+TELEGRAM_PATH = re.compile(r"^/bot(?P<token>[^/]+)/(?P<method>\w+)$")
+
+OUTCOME_ERROR = "error"
+OUTCOME_THROTTLE = "throttle"
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP/1.1 server with the failure knobs both stand-ins share.
+
+    Every request waits latency seconds plus up to jitter more. error_rate and
+    throttle_rate are the chances a request fails with a server error or is throttled.
+    rate_limit caps messages per second (0 = unlimited); requests over it are throttled
+    too. counters records requests, messages, errors and throttled replies.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, handler_class, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0, rate_limit: float = 0,
+                 retry_after: int = 1, seed: int = None):
+        super().__init__((host, port), handler_class)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.counters = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_messages = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def outcome(self, messages: int):
+        """Decide how to answer a request carrying this many messages, and count it."""
+        with self._lock:
+            self.counters["requests"] += 1
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            if roll < self.error_rate:
+                result = OUTCOME_ERROR
+            elif roll < self.error_rate + self.throttle_rate or self._over_rate_limit(messages):
+                result = OUTCOME_THROTTLE
+            else:
+                result = None
+                self.counters["messages"] += messages
+            if result == OUTCOME_ERROR:
+                self.counters["errors"] += 1
+            elif result == OUTCOME_THROTTLE:
+                self.counters["throttled"] += 1
+        time.sleep(delay)
+        return result
+
+    def _over_rate_limit(self, messages: int) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start, self._window_messages = now, 0
+        if self._window_messages + messages > self.rate_limit:
+            return True
+        self._window_messages += messages
+        return False
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps client connections open, as the real APIs do
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def log_message(self, *args):
+        pass
+
+
+class _SESHandler(_StubHandler):
+    """SES query API: CreateTemplate, SendEmail and SendBulkTemplatedEmail."""
+
+    def do_POST(self):
+        form = {key: values[0] for key, values in parse_qs(self._read_body().decode("utf-8")).items()}
+        action = form.get("Action", "")
+        destinations = sum(1 for key in form if SES_DESTINATION_FIELD.match(key))
+        messages = destinations if action == "SendBulkTemplatedEmail" else int(action == "SendEmail")
+
+        outcome = self.server.outcome(messages)
+        if outcome == OUTCOME_ERROR:
+            return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, "Receiver", "InternalFailure", "Stub failure")
+        if outcome == OUTCOME_THROTTLE:
+            return self._error(HTTPStatus.BAD_REQUEST, "Sender", "Throttling", "Maximum sending rate exceeded.")
+
+        if action == "CreateTemplate":
+            result = ""
+        elif action == "SendEmail":
+            result = f"<MessageId>{uuid.uuid4()}</MessageId>"
+        elif action == "SendBulkTemplatedEmail":
+            statuses = "".join(
+                f"<member><Status>Success</Status><MessageId>{uuid.uuid4()}</MessageId></member>"
+                for _ in range(destinations)
+            )
+            result = f"<Status>{statuses}</Status>"
+        else:
+            return self._error(HTTPStatus.BAD_REQUEST, "Sender", "InvalidAction", f"Unsupported action {action}")
+        self._respond(action, result)
+
+    def _respond(self, action: str, result: str):
+        body = (
+            f'<{action}Response xmlns="{SES_XML_NAMESPACE}">'
+            f"<{action}Result>{result}</{action}Result>"
+            f"<ResponseMetadata><RequestId>{uuid.uuid4()}</RequestId></ResponseMetadata>"
+            f"</{action}Response>"
+        )
+        self._reply(HTTPStatus.OK, body.encode("utf-8"), "text/xml")
+
+    def _error(self, status: int, error_type: str, code: str, message: str):
+        body = (
+            f'<ErrorResponse xmlns="{SES_XML_NAMESPACE}">'
+            f"<Error><Type>{error_type}</Type><Code>{code}</Code><Message>{message}</Message></Error>"
+            f"<RequestId>{uuid.uuid4()}</RequestId>"
+            f"</ErrorResponse>"
+        )
+        self._reply(status, body.encode("utf-8"), "text/xml")
+
+
+class _TelegramHandler(_StubHandler):
+    """Telegram Bot API: sendMessage, with 429 replies that carry retry_after."""
+
+    def do_POST(self):
+        match = TELEGRAM_PATH.match(self.path)
+        payload = json.loads(self._read_body() or b"{}")
+        if not match or match["method"] != "sendMessage":
+            return self._json(HTTPStatus.NOT_FOUND, {"ok": False, "error_code": 404, "description": "Not Found"})
+        if not payload.get("chat_id"):
+            return self._json(HTTPStatus.BAD_REQUEST, {
+                "ok": False, "error_code": 400, "description": "Bad Request: chat not found",
+            })
+
+        outcome = self.server.outcome(1)
+        if outcome == OUTCOME_ERROR:
+            return self._json(HTTPStatus.BAD_GATEWAY, {"ok": False, "error_code": 502, "description": "Bad Gateway"})
+        if outcome == OUTCOME_THROTTLE:
+            retry_after = self.server.retry_after
+            return self._json(HTTPStatus.TOO_MANY_REQUESTS, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            })
+        self._json(HTTPStatus.OK, {
+            "ok": True,
+            "result": {"message_id": self.server.counters["messages"], "chat": {"id": payload["chat_id"]},
+                       "text": payload.get("text", "")},
+        })
+
+    def _json(self, status: int, document: dict):
+        self._reply(status, json.dumps(document).encode("utf-8"), "application/json")
+
+
+def ses_stub(**options) -> StubServer:
+    """An SES stand-in; point SES_ENDPOINT_URL (or get_ses_client's endpoint_url) at its url."""
+    return StubServer(_SESHandler, **options)
+
+
+def telegram_stub(**options) -> StubServer:
+    """A Telegram stand-in; point TELEGRAM_API_BASE_URL at its url."""
+    return StubServer(_TelegramHandler, **options)
+
+
+STUBS = {"ses": ses_stub, "telegram": telegram_stub}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local SES or Telegram stand-in")
+    parser.add_argument("service", choices=sorted(STUBS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with a 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests throttled at random")
+    parser.add_argument("--rate-limit", type=float, default=0, help="messages per second before throttling")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after sent with Telegram 429s")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = STUBS[args.service](
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, rate_limit=args.rate_limit, retry_after=args.retry_after, seed=args.seed,
+    )
+    print(f"{args.service} stand-in listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(dict(server.counters))
+
+
+if __name__ == "__main__":
+    main()
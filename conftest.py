@@ -10,6 +10,10 @@ from flask_jwt_extended import create_access_token
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
+# Keep the default bcrypt cost instead of calibrating on every app start.
+# Set before any app module is imported, since Config reads it at import time.
+os.environ.setdefault("PASSWORD_HASH_TARGET_MS", "0")
+
 
 @pytest.fixture
 def app():
@@ -35,6 +39,7 @@ def app():
     db = DB._get()
     for collection_name in db.list_collection_names():
         db.drop_collection(collection_name)
+    application.extensions["services"].shutdown()
 
 
 @pytest.fixture
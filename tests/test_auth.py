@@ -357,3 +357,64 @@ def test_register_and_login_flow(client):
     assert register_token is not None
     assert login_token is not None
     assert register_token != login_token  # They're different tokens
+
+
+# ──────────────────────────────────────────────
+# Tests for POST /auth/refresh
+# ──────────────────────────────────────────────
+
+def _register_for_refresh(client, email="refresh@test.com"):
+    registration_data = {
+        EMAIL: email,
+        PASSWORD: "refreshpass",
+        NAME: "Refresh User",
+        BIRTHDAY: "1994-02-02",
+        ROLE: ROLE_MEMBER
+    }
+    return client.post("/auth/register", json=registration_data).get_json()
+
+
+def test_login_returns_refresh_token(client):
+    """Login returns a refresh token next to the access token."""
+    _register_for_refresh(client)
+
+    resp = client.post("/auth/login", json={EMAIL: "refresh@test.com", PASSWORD: "refreshpass"})
+
+    assert resp.status_code == HTTPStatus.OK
+    assert "refresh_token" in resp.get_json()
+
+
+def test_refresh_issues_new_token_pair(client):
+    """A refresh token is exchanged for a new access and refresh token."""
+    refresh_token = _register_for_refresh(client)["refresh_token"]
+
+    resp = client.post("/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert data["refresh_token"] != refresh_token
+
+    # The new access token carries the same role and works on protected endpoints
+    bookings_resp = client.get("/bookings/my-classes", headers={"Authorization": f"Bearer {data['access_token']}"})
+    assert bookings_resp.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_refresh_token_cannot_be_reused(client):
+    """Refresh tokens are rotated: the old one is revoked after use."""
+    refresh_token = _register_for_refresh(client)["refresh_token"]
+
+    first = client.post("/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+    second = client.post("/auth/refresh", headers={"Authorization": f"Bearer {refresh_token}"})
+
+    assert first.status_code == HTTPStatus.OK
+    assert second.status_code == HTTPStatus.UNAUTHORIZED
+    assert "revoked" in second.get_json()["message"].lower()
+
+
+def test_refresh_rejects_access_token(client):
+    """Access tokens cannot be used to refresh."""
+    access_token = _register_for_refresh(client)["access_token"]
+
+    resp = client.post("/auth/refresh", headers={"Authorization": f"Bearer {access_token}"})
+
+    assert resp.status_code == HTTPStatus.UNAUTHORIZED
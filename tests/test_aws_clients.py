@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.services.aws_clients import get_ses_client
+from app.services.container import get_services
+from app.services.ses_email_service import SESEmailService
+
+
+# Every thread asking for the same settings gets the one shared client
+def test_ses_client_is_shared_across_threads():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get_ses_client(region="eu-west-1", max_pool_connections=7), range(32)))
+    assert all(client is clients[0] for client in clients)
+    assert SESEmailService("gym@test.com", region="eu-west-1").client is not clients[0]
+
+
+# Pool size, keep-alive, retries and a local endpoint come from the settings
+def test_ses_client_settings():
+    client = get_ses_client(endpoint_url="http://127.0.0.1:9001", max_pool_connections=48,
+                            retry_mode="adaptive", max_attempts=5)
+    assert client.meta.endpoint_url == "http://127.0.0.1:9001"
+    assert client.meta.config.max_pool_connections == 48
+    assert client.meta.config.tcp_keepalive is True
+    assert client.meta.config.retries == {"mode": "adaptive", "total_max_attempts": 5}
+
+
+# The app's email channel uses the configured process-wide client
+def test_container_uses_configured_ses_client(app):
+    app.config["SES_ENDPOINT_URL"] = "http://127.0.0.1:9002"
+    with app.app_context():
+        email = get_services().notification_dispatcher.strategies["email"]
+        assert email.client.meta.endpoint_url == "http://127.0.0.1:9002"
+        assert email.client is get_services()._ses_client()
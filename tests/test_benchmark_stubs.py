@@ -0,0 +1,74 @@
+"""
+Local SES and Telegram stand-ins, and the reminder benchmark that runs against them.
+
+Covers:
+- SESEmailService bulk and single sends through an endpoint override
+- Throttling and server errors surfacing as transient notification errors
+- Telegram 429 replies with retry_after, and the stand-in's rate limit
+- A small end-to-end run of the reminder benchmark
+"""
+
+import pytest
+from app.services.aws_clients import get_ses_client
+from app.services.notification_errors import TransientNotificationError
+from app.services.ses_email_service import SESEmailService
+from app.services.telegram_notification_service import TelegramNotificationService
+from benchmarks.reminders import configure_app, run_benchmark, seed_class
+from benchmarks.stubs import ses_stub, telegram_stub
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    # botocore signs every request, even to a stand-in
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+
+
+# SES calls reach the stand-in through endpoint_url, bulk sends report one status per destination
+def test_ses_stub_accepts_bulk_and_single_sends():
+    with ses_stub() as ses:
+        service = SESEmailService("gym@test.com", client=get_ses_client(endpoint_url=ses.url))
+        messages = [(f"member{i}@test.com", "Reminder", "Soon") for i in range(60)]
+
+        assert service.send_batch(messages) == [None] * 60
+        service.send_email("one@test.com", "Reminder", "Soon")
+
+    # One CreateTemplate, two bulk calls (50 + 10) and one SendEmail
+    assert dict(ses.counters) == {"requests": 4, "messages": 61}
+
+
+# Throttling and server errors come back as SES error codes the service treats as transient
+def test_ses_stub_failures_are_transient():
+    for knobs in ({"throttle_rate": 1}, {"error_rate": 1}):
+        with ses_stub(**knobs) as ses:
+            client = get_ses_client(endpoint_url=ses.url, max_attempts=1)
+            errors = SESEmailService("gym@test.com", client=client).send_batch([("a@test.com", "Reminder", "Soon")])
+        assert isinstance(errors[0], TransientNotificationError)
+
+
+# Past its rate limit the Telegram stand-in answers 429 with retry_after, which pauses the whole bot
+def test_telegram_stub_rate_limit():
+    with telegram_stub(rate_limit=2, retry_after=3) as telegram:
+        service = TelegramNotificationService("token", base_url=telegram.url, chat_rate=100, global_rate=100,
+                                              max_retries=0)
+        service.send_notification("1", "Reminder", "Soon")
+        service.send_notification("2", "Reminder", "Soon")
+        with pytest.raises(TransientNotificationError):
+            service.send_notification("3", "Reminder", "Soon")
+
+    assert dict(telegram.counters) == {"requests": 3, "messages": 2, "throttled": 1}
+    assert service.global_limiter._try_acquire() >= 2.5
+
+
+# The benchmark seeds a class, delivers its reminder through both stand-ins and reports the numbers
+def test_reminder_benchmark_smoke(app):
+    with ses_stub() as ses, telegram_stub() as telegram:
+        configure_app(app, ses.url, telegram.url)
+        with app.app_context():
+            report = run_benchmark(seed_class(40, telegram_share=0.25, seed=1))
+
+    assert report["failed"] == 0
+    assert report["messages_per_run"] == 40 + telegram.counters["messages"]
+    assert ses.counters["messages"] == 40
+    assert report["latency"]["email"]["count"] == 40
+    assert report["messages_per_second"] > 0
@@ -0,0 +1,210 @@
+"""
+Booking under concurrency.
+
+Covers:
+- The remaining_spots counter never handing out more spots than a class has
+- Classes created before the counter existed getting it from their bookings on first booking
+- A duplicate booking that slips past the lookup being rejected by the unique index, its spot returned
+- A booking that fails to store for any other reason returning its spot too
+- The class list showing each class's counter, without counting bookings per class
+- Classes created through the API starting with every spot open
+- Torture runs against a real mongod from many threads and from several processes: no oversold
+  class, no double booking, and counters that agree with the bookings (skipped without a mongod).
+  BOOKING_TORTURE_ATTEMPTS sets how many bookings each run attempts; CI runs them against a mongo service
+"""
+
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from flask_jwt_extended import create_access_token
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app import create_app
+from app.db import DB
+from app.db.bookings import BookingResource, CLASS_ID
+from app.db.classes import CAPACITY, DESCRIPTION, END_DATE, LOCATION, REMAINING_SPOTS, START_DATE, TITLE
+from app.services.container import get_services
+from benchmarks.contention import book_concurrently, check_invariants, contend, plan_attempts, setup
+
+MONGO_TEST_URI = os.environ.get("MONGO_TEST_URI", "mongodb://localhost:27017")
+TORTURE_ATTEMPTS = int(os.environ.get("BOOKING_TORTURE_ATTEMPTS", "2000"))
+
+
+def mongod_available():
+    try:
+        MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=500).server_info()
+    except PyMongoError:
+        return False
+    return True
+
+
+requires_mongod = pytest.mark.skipif(not mongod_available(), reason=f"no mongod at {MONGO_TEST_URI}")
+
+
+@pytest.fixture
+def mongod_config(monkeypatch):
+    """Settings for a throwaway database in a real mongod, also exported for spawned processes."""
+    config = {
+        "MONGO_URI": MONGO_TEST_URI,
+        # benchmarks.contention only clears a database named for benchmarks
+        "DB_NAME": f"booking_concurrency_benchmark_{uuid.uuid4().hex[:8]}",
+        "MOCK_DB": False,
+        "SCHEDULER_ENABLED": False,
+        "TESTING": True,
+    }
+    monkeypatch.setenv("MONGO_URI", config["MONGO_URI"])
+    monkeypatch.setenv("DB_NAME", config["DB_NAME"])
+    monkeypatch.setenv("MOCK_DB", "false")
+    return config
+
+
+@pytest.fixture
+def mongod_app(mongod_config):
+    """Like the app fixture, but on the mongod_config database, which is dropped afterwards."""
+    application = create_app(mongod_config)
+    assert DB._get().name == mongod_config["DB_NAME"] and isinstance(DB._get().client, MongoClient)
+    yield application
+
+    DB._get().client.drop_database(mongod_config["DB_NAME"])
+    application.extensions["services"].shutdown()
+
+
+def member_headers(app, member_id, email):
+    with app.app_context():
+        token = create_access_token(identity=email, additional_claims={"role": "member", "user_id": member_id})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def expected_bookings(fixture, pairs, capacity):
+    """Each class ends up with its capacity or every distinct member who tried, whichever is fewer."""
+    members = defaultdict(set)
+    for (member_id, _), class_id in pairs:
+        members[class_id].add(member_id)
+    return sum(min(capacity, len(members[class_id])) for class_id in fixture["class_ids"])
+
+
+def remaining_spots(app, class_id):
+    with app.app_context():
+        return get_services().class_resource.get_class_by_id(class_id)[REMAINING_SPOTS]
+
+
+# Reserving stops at zero, and a released spot can be taken again
+def test_reserve_and_release_spot(app):
+    fixture = setup(app, classes=1, capacity=2, members=0)
+    class_id = fixture["class_ids"][0]
+
+    with app.app_context():
+        classes = get_services().class_resource
+        assert [classes.reserve_spot(class_id) for _ in range(3)] == [True, True, False]
+        classes.release_spot(class_id)
+        assert classes.reserve_spot(class_id)
+        assert not classes.reserve_spot(class_id)
+
+
+# A class without the counter gets it from its existing bookings, then fills up as usual
+def test_legacy_class_gets_counter(app, client):
+    fixture = setup(app, classes=0, capacity=2, members=2)
+    (first_id, first_email), (second_id, second_email) = sorted(fixture["members"].items())
+    with app.app_context():
+        start = datetime.now() + timedelta(days=1)
+        class_id = str(get_services().class_resource.create_class(
+            title="Legacy Spin", trainer_id="trainer", trainer_name="Trainer", start_date=start,
+            end_date=start + timedelta(hours=1), capacity=2, location="Studio A", description="No counter",
+        ))
+        BookingResource().create_booking(class_id, "earlier_member", "earlier@test.com", "Earlier")
+
+    response = client.post("/bookings", json={CLASS_ID: class_id}, headers=member_headers(app, first_id, first_email))
+    assert response.status_code == HTTPStatus.CREATED
+    assert remaining_spots(app, class_id) == 0
+
+    response = client.post("/bookings", json={CLASS_ID: class_id}, headers=member_headers(app, second_id, second_email))
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.get_json()["message"] == "Class is full"
+
+
+# Two requests from one member both pass the lookup; the index rejects the second and its spot comes back
+def test_duplicate_past_lookup_returns_spot(app, client, monkeypatch):
+    fixture = setup(app, classes=1, capacity=3, members=1)
+    class_id = fixture["class_ids"][0]
+    headers = member_headers(app, *next(iter(fixture["members"].items())))
+    monkeypatch.setattr(BookingResource, "check_existing_booking", lambda self, class_id, user_id: False)
+
+    statuses = [client.post("/bookings", json={CLASS_ID: class_id}, headers=headers).status_code for _ in range(2)]
+
+    assert statuses == [HTTPStatus.CREATED, HTTPStatus.CONFLICT]
+    assert remaining_spots(app, class_id) == 2
+    assert check_invariants(app, fixture["class_ids"]) == []
+
+
+# Any other failure to store the booking gives its spot back before the error propagates
+def test_failed_insert_returns_spot(app, client, monkeypatch):
+    fixture = setup(app, classes=1, capacity=3, members=1)
+    class_id = fixture["class_ids"][0]
+    headers = member_headers(app, *next(iter(fixture["members"].items())))
+
+    def fail(self, *args, **kwargs):
+        raise PyMongoError("connection reset")
+
+    monkeypatch.setattr(BookingResource, "create_booking", fail)
+    response = client.post("/bookings", json={CLASS_ID: class_id}, headers=headers)
+
+    assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert remaining_spots(app, class_id) == 3
+
+
+# The list shows the stored counter and never counts a class's bookings
+def test_class_list_reads_counter(app, client, monkeypatch):
+    fixture = setup(app, classes=2, capacity=5, members=0)
+    with app.app_context():
+        get_services().class_resource.reserve_spot(fixture["class_ids"][0])
+    monkeypatch.setattr(BookingResource, "count_member_bookings", lambda self, class_id: pytest.fail("N+1 count"))
+
+    listed = {cls["_id"]: cls[REMAINING_SPOTS] for cls in client.get("/classes").get_json()}
+
+    assert [listed[class_id] for class_id in fixture["class_ids"]] == [4, 5]
+
+
+# Classes created through the API start with every spot open and count down as members book
+def test_created_class_has_counter(app, client, trainer_token, member_token):
+    start = datetime.now() + timedelta(days=2)
+    response = client.post("/classes", headers={"Authorization": f"Bearer {trainer_token}"}, json={
+        TITLE: "Counted Yoga", START_DATE: start.strftime("%Y-%m-%d %H:%M:%S"),
+        END_DATE: (start + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"), CAPACITY: 4,
+        LOCATION: "Studio A", DESCRIPTION: "Counts its spots",
+    })
+    class_id = response.get_json()["_id"]
+    assert remaining_spots(app, class_id) == 4
+
+    client.post("/bookings", json={CLASS_ID: class_id}, headers={"Authorization": f"Bearer {member_token}"})
+    assert remaining_spots(app, class_id) == 3
+
+
+# Many threads, repeated attempts, few spots: nothing oversold or double booked
+@requires_mongod
+def test_threaded_torture(mongod_app):
+    fixture = setup(mongod_app, classes=3, capacity=4, members=max(40, TORTURE_ATTEMPTS // 10))
+    pairs = plan_attempts(fixture, attempts=TORTURE_ATTEMPTS, duplicates=0.3, seed=1)
+
+    _, statuses = book_concurrently(mongod_app, pairs, threads=24)
+
+    assert set(statuses) <= {HTTPStatus.CREATED, HTTPStatus.CONFLICT}
+    assert statuses[HTTPStatus.CREATED] == expected_bookings(fixture, pairs, capacity=4)
+    assert check_invariants(mongod_app, fixture["class_ids"]) == []
+
+
+# Several processes, each with its own MongoClient, racing for the same spots
+@requires_mongod
+def test_multiprocess_torture(mongod_app, mongod_config):
+    fixture = setup(mongod_app, classes=2, capacity=3, members=max(30, TORTURE_ATTEMPTS // 10))
+    pairs = plan_attempts(fixture, attempts=TORTURE_ATTEMPTS, duplicates=0.3, seed=2)
+
+    report = contend(pairs, processes=3, threads=8, config_overrides=mongod_config)
+
+    assert set(report["status_codes"]) <= {"201", "409"}
+    assert report["status_codes"]["201"] == expected_bookings(fixture, pairs, capacity=3)
+    assert check_invariants(mongod_app, fixture["class_ids"]) == []
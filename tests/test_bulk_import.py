@@ -0,0 +1,130 @@
+"""
+Tests for bulk user import.
+Endpoint: POST /auth/import
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+import pytest
+from app.db.users import EMAIL, PASSWORD
+from app.services.container import get_services
+from app.services.password_hash_pool import HashPoolSaturatedError
+
+
+def _use_thread_pool(app):
+    # Threads keep most tests fast; test_import_csv_creates_users covers the real process pool
+    with app.app_context():
+        get_services().user_import_service.hash_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def test_import_csv_creates_users(client, trainer_token):
+    """CSV rows are created and can log in afterwards."""
+    body = (
+        "email,password,name,birthday,role\n"
+        "csv1@test.com,pass1,Csv One,1990-01-01,member\n"
+        "csv2@test.com,pass2,Csv Two,1991-02-02,\n"
+    )
+
+    resp = client.post("/auth/import", data=body, content_type="text/csv",
+                       headers={"Authorization": f"Bearer {trainer_token}"})
+
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert data["created"] == 2
+    assert [result["status"] for result in data["results"]] == ["created", "created"]
+
+    login = client.post("/auth/login", json={EMAIL: "csv2@test.com", PASSWORD: "pass2"})
+    assert login.status_code == HTTPStatus.OK
+    assert login.get_json()["user"]["role"] == "member"
+
+
+def test_import_ndjson_reports_each_row(client, app, trainer_token, member_token):
+    """Duplicates (in the DB or the file) and invalid rows fail without stopping the rest."""
+    _use_thread_pool(app)
+    lines = [
+        json.dumps({EMAIL: "nd1@test.com", PASSWORD: "p", "name": "Nd One", "birthday": "1990-01-01"}),
+        json.dumps({EMAIL: "member@test.com", PASSWORD: "p", "name": "Taken", "birthday": "1990-01-01"}),
+        "not json",
+        json.dumps({EMAIL: "nd1@test.com", PASSWORD: "p", "name": "Nd Again", "birthday": "1990-01-01"}),
+        json.dumps({EMAIL: "nd2@test.com", PASSWORD: "p", "name": "Nd Two", "birthday": "1990-01-01",
+                    "role": "admin"}),
+        json.dumps({EMAIL: "nd3@test.com", PASSWORD: "p", "name": "Nd Three", "birthday": "1990-01-01"}),
+    ]
+
+    resp = client.post("/auth/import", data="\n".join(lines), content_type="application/x-ndjson",
+                       headers={"Authorization": f"Bearer {trainer_token}"})
+
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert data["created"] == 2
+    assert data["failed"] == 4
+    statuses = [(result["row"], result["status"]) for result in data["results"]]
+    assert statuses == [(1, "created"), (2, "failed"), (3, "failed"), (4, "failed"), (5, "failed"), (6, "created")]
+    assert data["results"][1]["message"] == "User already exists"
+
+
+def test_import_rejects_non_string_fields(client, app, trainer_token):
+    """A number or list where text belongs fails that row instead of the whole import."""
+    _use_thread_pool(app)
+    lines = [
+        json.dumps({EMAIL: "typed1@test.com", PASSWORD: 12345, "name": "Typed One", "birthday": "1990-01-01"}),
+        json.dumps({EMAIL: ["typed2@test.com"], PASSWORD: "p", "name": "Typed Two", "birthday": "1990-01-01"}),
+        json.dumps({EMAIL: "typed3@test.com", PASSWORD: "p", "name": "Typed Three", "birthday": 19900101}),
+        json.dumps({EMAIL: "typed4@test.com", PASSWORD: "p", "name": "Typed Four", "birthday": "1990-01-01"}),
+    ]
+
+    resp = client.post("/auth/import", data="\n".join(lines), content_type="application/x-ndjson",
+                       headers={"Authorization": f"Bearer {trainer_token}"})
+
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert [result["status"] for result in data["results"]] == ["failed", "failed", "failed", "created"]
+    assert data["results"][0]["message"] == "Email, password, name, and birthday must be strings"
+
+
+def test_import_requires_trainer(client, member_token):
+    """Members cannot import users."""
+    resp = client.post("/auth/import", data="email\n", content_type="text/csv",
+                       headers={"Authorization": f"Bearer {member_token}"})
+    assert resp.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_import_rejects_unknown_content_type(client, trainer_token):
+    """Only CSV and NDJSON bodies are accepted."""
+    resp = client.post("/auth/import", json=[{EMAIL: "x@test.com"}],
+                       headers={"Authorization": f"Bearer {trainer_token}"})
+    assert resp.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+
+def test_import_goes_through_hash_pool(client, app, trainer_token):
+    """An import takes a hash pool slot, so it is refused with 503 when logins have filled the pool."""
+    _use_thread_pool(app)
+    body = "email,password,name,birthday\npooled@test.com,pass1,Pooled,1990-01-01\n"
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    with app.app_context():
+        pool = get_services().password_hash_pool
+
+    resp = client.post("/auth/import", data=body, content_type="text/csv", headers=headers)
+    assert resp.status_code == HTTPStatus.OK
+    assert pool.metrics.snapshot()["timers"]["password_hash.latency"]["count"] >= 1
+
+    def saturated(*args):
+        raise HashPoolSaturatedError(retry_after=2)
+
+    pool.run = saturated
+    resp = client.post("/auth/import", data=body.replace("pooled@", "refused@"), content_type="text/csv",
+                       headers=headers)
+    assert resp.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert resp.headers["Retry-After"] == "2"
+
+
+def test_container_shutdown_stops_import_processes(app):
+    """Shutting the container down stops the import's worker processes with it."""
+    with app.app_context():
+        services = get_services()
+        executor = services.user_import_service.hash_executor
+    services.shutdown()
+
+    with pytest.raises(RuntimeError):
+        executor.submit(sum, [1])
@@ -0,0 +1,118 @@
+import time
+from unittest.mock import MagicMock
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, DeadlineExceededError
+from app.services.container import get_services
+from app.services.metrics import Metrics
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
+from app.services.notification_service import NotificationService
+from app.services.retry_policy import RetryPolicy
+
+
+class DownChannel(NotificationService):
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def send_notification(self, recipient, subject, body):
+        self.calls += 1
+        if self.error:
+            raise self.error
+
+
+def _messages(count: int):
+    return [({"_id": str(i), "user_email": f"m{i}@test.com"}, "Subject", "Body") for i in range(count)]
+
+
+# Closed -> open after the threshold -> half-open after the timeout -> closed after a good probe
+def test_breaker_state_transitions():
+    now = [0.0]
+    metrics = Metrics()
+    breaker = CircuitBreaker("email", failure_threshold=2, reset_timeout=10, metrics=metrics, clock=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert metrics.snapshot()["gauges"]["circuit.email.state"] == 2
+
+    now[0] = 10
+    assert breaker.allow()
+    # Only one probe at a time while half-open
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["circuit.email.opened"] == 1
+    assert counters["circuit.email.rejected"] == 2
+
+
+# A failed probe opens the circuit again for another reset_timeout
+def test_failed_probe_reopens():
+    now = [0.0]
+    breaker = CircuitBreaker("telegram", failure_threshold=1, reset_timeout=5, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 5
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] = 9
+    assert not breaker.allow()
+
+
+# Once a channel's circuit opens, its sends fail fast and are dead-lettered without calling it
+def test_open_circuit_fails_fast():
+    channel = DownChannel(TransientNotificationError("timed out"))
+    dead_letters = MagicMock()
+    dispatcher = NotificationDispatcher(
+        {"email": channel},
+        retry_policy=RetryPolicy(max_attempts=2, base_delay=0),
+        dead_letter_resource=dead_letters,
+        breakers={"email": CircuitBreaker("email", failure_threshold=3, reset_timeout=60)},
+    )
+
+    results = dispatcher.send_batch(_messages(10))
+
+    assert not any(result.ok for result in results)
+    assert channel.calls == 3
+    assert "unavailable" in results[-1].channels["email"]["error"]
+    [letters] = dead_letters.add_dead_letters.call_args.args
+    assert len(letters) == 10 and all(letter["transient"] for letter in letters)
+
+
+# Rejected recipients do not trip the breaker; only outages do
+def test_permanent_errors_keep_circuit_closed():
+    channel = DownChannel(PermanentNotificationError("address rejected"))
+    breaker = CircuitBreaker("email", failure_threshold=1)
+    dispatcher = NotificationDispatcher({"email": channel}, breakers={"email": breaker})
+
+    dispatcher.send_batch(_messages(5))
+
+    assert channel.calls == 5
+    assert breaker.state == "closed"
+
+
+# Past the deadline nothing is sent and retries stop waiting
+def test_deadline_stops_sending():
+    channel = DownChannel(None)
+    dispatcher = NotificationDispatcher({"email": channel})
+
+    outcomes = dispatcher.deliver("email", [("a@test.com", "S", "B")], deadline=time.monotonic() - 1)
+
+    assert channel.calls == 0
+    assert isinstance(outcomes[0][0], DeadlineExceededError)
+    assert isinstance(outcomes[0][0], TransientNotificationError)
+    assert not isinstance(outcomes[0][0], CircuitOpenError)
+
+
+# The app's channels have breakers whose state shows up in /metrics
+def test_breaker_state_in_metrics(app, client, trainer_token):
+    app.config["WEBHOOK_URL"] = "http://127.0.0.1:9/reminders"
+    with app.app_context():
+        assert set(get_services().notification_dispatcher.breakers) == {"email", "telegram", "webhook"}
+
+    gauges = client.get("/metrics", headers={"Authorization": f"Bearer {trainer_token}"}).get_json()["gauges"]
+    assert gauges["circuit.email.state"] == 0
+    assert gauges["circuit.telegram.state"] == 0
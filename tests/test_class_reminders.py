@@ -1,22 +1,165 @@
 import pytest
-from unittest.mock import patch, ANY
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, ANY, MagicMock
 from http import HTTPStatus
+from app.services.container import get_services
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_service import NotificationService
+from app.services.reminder_service import ReminderService
+
+# Stands in for SES bulk sends: every message succeeds
+def ses_batch_ok(messages):
+    return [None] * len(messages)
+
+# Recipients of every email handed to the mocked SES bulk send
+def emailed(mock_batch):
+    return [recipient for call in mock_batch.call_args_list for recipient, _, _ in call.args[0]]
+
+# Runs the background worker once, as `python -m app.worker` would
+def run_reminder_worker(app):
+    with app.app_context():
+        return get_services().reminder_worker.run_once()
 
 # Mock external services so we don't send real emails/telegrams during tests
-@patch("app.services.ses_email_service.SESEmailService.send_notification")
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=ses_batch_ok)
 @patch("app.services.telegram_notification_service.TelegramNotificationService.send_notification")
-def test_reminder_integration_and_dispatch(mock_tele, mock_email, client, trainer_token, sample_bookings_with_prefs):
+def test_reminder_integration_and_dispatch(mock_tele, mock_email, app, client, trainer_token, sample_bookings_with_prefs):
     # Triggers the reminder workflow for a class with mixed preferences
     class_id = sample_bookings_with_prefs["class_id"]
-    resp = client.post(f"/classes/{class_id}/reminder", headers={"Authorization": f"Bearer {trainer_token}"})
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    resp = client.post(f"/classes/{class_id}/reminder", headers=headers)
+
+    # The request only queues the job; nothing is sent on the web thread
+    assert resp.status_code == HTTPStatus.ACCEPTED
+    assert not mock_email.called
+    job_id = resp.get_json()["job_id"]
+
+    assert run_reminder_worker(app)
+    assert not run_reminder_worker(app)
 
-    assert resp.status_code == HTTPStatus.OK
-    # Ensure Alice and Bob both get emails, but only Bob gets a Telegram
-    assert mock_email.call_count == 2
+    # Ensure Alice and Bob both get emails, in one bulk call, but only Bob gets a Telegram
+    assert mock_email.call_count == 1
+    assert sorted(emailed(mock_email)) == ["alice@test.com", "bob@test.com"]
     assert mock_tele.call_count == 1
     mock_tele.assert_called_with("12345", ANY, ANY)
 
+    job = client.get(f"/classes/{class_id}/reminder/jobs/{job_id}", headers=headers).get_json()
+    assert job["status"] == "completed"
+    assert job["sent"] == 2 and job["failed"] == 0
+    assert len(job["results"]) == 2
+
 # Verify that only the class owner (trainer) can send reminders
 def test_reminder_trainer_permissions(client, other_trainer_token, sample_class):
     resp = client.post(f"/classes/{sample_class}/reminder", headers={"Authorization": f"Bearer {other_trainer_token}"})
-    assert resp.status_code == HTTPStatus.FORBIDDEN
\ No newline at end of file
+    assert resp.status_code == HTTPStatus.FORBIDDEN
+
+# A failing channel is reported per recipient instead of aborting the other sends
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=ses_batch_ok)
+@patch("app.services.telegram_notification_service.TelegramNotificationService.send_notification")
+def test_reminder_reports_per_recipient_failures(mock_tele, mock_email, app, client, trainer_token, sample_bookings_with_prefs):
+    mock_tele.side_effect = Exception("Telegram notification failed: timed out")
+    class_id = sample_bookings_with_prefs["class_id"]
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    job_id = client.post(f"/classes/{class_id}/reminder", headers=headers).get_json()["job_id"]
+    run_reminder_worker(app)
+
+    data = client.get(f"/classes/{class_id}/reminder/jobs/{job_id}", headers=headers).get_json()
+    assert data["status"] == "completed"
+    assert data["sent"] == 1 and data["failed"] == 1
+    assert len(emailed(mock_email)) == 2
+    bob = next(result for result in data["results"] if result["user_email"] == "bob@test.com")
+    assert bob["channels"]["email"]["status"] == "sent"
+    assert "timed out" in bob["channels"]["telegram"]["error"]
+
+
+# Unit test: sends fan out concurrently but never exceed the per-channel limit
+def test_reminder_fan_out_respects_channel_limit():
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    class SlowEmail(NotificationService):
+        def send_notification(self, recipient, subject, body):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.05)
+            with lock:
+                in_flight["now"] -= 1
+
+    dispatcher = NotificationDispatcher({"email": SlowEmail()}, channel_limits={"email": 4})
+    service = ReminderService(dispatcher, class_resource=MagicMock(), booking_resource=MagicMock(),
+                              executor=ThreadPoolExecutor(max_workers=16))
+    bookings = [{"_id": str(i), "user_email": f"m{i}@test.com", "user_name": "M"} for i in range(16)]
+
+    started = time.perf_counter()
+    results = service._send_reminders({"title": "Yoga"}, bookings)
+    elapsed = time.perf_counter() - started
+
+    assert all(result.ok for result in results)
+    assert in_flight["max"] == 4
+    # 16 sends at 4 at a time take about 4 rounds, far less than sending one by one
+    assert elapsed < 16 * 0.05
+
+
+# Only the trainer who queued the job can see it, and unknown jobs are 404
+def test_reminder_job_status_permissions(client, trainer_token, other_trainer_token, sample_bookings_with_prefs):
+    class_id = sample_bookings_with_prefs["class_id"]
+    job_id = client.post(f"/classes/{class_id}/reminder",
+                         headers={"Authorization": f"Bearer {trainer_token}"}).get_json()["job_id"]
+
+    resp = client.get(f"/classes/{class_id}/reminder/jobs/{job_id}",
+                      headers={"Authorization": f"Bearer {other_trainer_token}"})
+    assert resp.status_code == HTTPStatus.FORBIDDEN
+
+    resp = client.get(f"/classes/{class_id}/reminder/jobs/not-a-job",
+                      headers={"Authorization": f"Bearer {trainer_token}"})
+    assert resp.status_code == HTTPStatus.NOT_FOUND
+
+
+# A job whose worker died is reclaimed after its lease expires and skips recipients already done
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=ses_batch_ok)
+def test_expired_job_lease_is_reclaimed(mock_email, app, client, trainer_token, sample_bookings_with_prefs):
+    class_id = sample_bookings_with_prefs["class_id"]
+    client.post(f"/classes/{class_id}/reminder", headers={"Authorization": f"Bearer {trainer_token}"})
+
+    with app.app_context():
+        jobs = get_services().reminder_job_resource
+        crashed = jobs.claim_next("crashed-worker", lease_seconds=-1)
+        first_booking = next(get_services().booking_resource.iter_bookings_by_class(class_id))
+        jobs.record_results(crashed["_id"], "crashed-worker", [
+            {"booking_id": first_booking["_id"], "user_email": first_booking["user_email"], "status": "sent"},
+        ])
+
+    assert run_reminder_worker(app)
+
+    with app.app_context():
+        job = get_services().reminder_job_resource.get_job(crashed["_id"])
+    assert job["status"] == "completed"
+    assert job["attempts"] == 2
+    assert len(job["results"]) == 2
+
+
+# A batch that outlasts the lease keeps it: the heartbeat renews it while the sends are running
+def test_job_lease_is_renewed_during_a_slow_batch(app, client, trainer_token, sample_bookings_with_prefs):
+    class_id = sample_bookings_with_prefs["class_id"]
+    client.post(f"/classes/{class_id}/reminder", headers={"Authorization": f"Bearer {trainer_token}"})
+    takeovers = []
+
+    def slow_batch(messages):
+        time.sleep(0.5)
+        with app.app_context():
+            takeovers.append(get_services().reminder_job_resource.claim_next("other-worker", lease_seconds=60))
+        return [None] * len(messages)
+
+    with app.app_context():
+        get_services().reminder_service.lease_seconds = 0.2
+    with patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=slow_batch), \
+            patch("app.services.telegram_notification_service.TelegramNotificationService.send_notification"):
+        assert run_reminder_worker(app)
+
+    assert takeovers and all(job is None for job in takeovers)
+    with app.app_context():
+        [job] = get_services().reminder_job_resource.collection.find({})
+    assert job["status"] == "completed" and job["attempts"] == 1
@@ -0,0 +1,126 @@
+"""
+Synthetic workload generator.
+
+Covers:
+- The same seed and anchor producing byte-identical NDJSON, and another seed not
+- Extended JSON output that bson.json_util reads back to the same documents
+- Workload shape: recurring series, skewed popularity and member activity, capacity, mixed preferences
+- Seeded classes that never overlap for one trainer
+- Sizing to class and booking targets, capacities scaled to fit
+- Writing to Mongo, indexes intact, and logging in as a generated user
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from bson import json_util
+
+from app.db.bookings import CHANNEL_TELEGRAM, CHANNELS, NOTIFICATION_PREFERENCES, REMINDER_SENT_AT
+from app.services.container import get_services
+from benchmarks.datagen import BENCHMARK_PASSWORD, MongoSink, NDJSONSink, WorkloadGenerator, write_dataset
+
+ANCHOR = datetime(2026, 1, 5)
+
+
+def small_generator(seed=7, anchor=ANCHOR):
+    return WorkloadGenerator(users=600, series=40, history_weeks=8, future_weeks=2, seed=seed, anchor=anchor,
+                             bcrypt_rounds=4)
+
+
+# The same seed and anchor give byte-identical files; a different seed does not
+def test_ndjson_is_deterministic(tmp_path):
+    for name, seed in (("first", 7), ("second", 7), ("other", 8)):
+        write_dataset(small_generator(seed), NDJSONSink(str(tmp_path / name)))
+
+    for collection in ("users", "classes", "bookings"):
+        first = (tmp_path / "first" / f"{collection}.ndjson").read_bytes()
+        assert first == (tmp_path / "second" / f"{collection}.ndjson").read_bytes()
+        assert first != (tmp_path / "other" / f"{collection}.ndjson").read_bytes()
+
+
+# NDJSON lines are extended JSON that mongoimport and json_util read back unchanged
+def test_ndjson_round_trips(tmp_path):
+    generator = small_generator()
+    counts = write_dataset(generator, NDJSONSink(str(tmp_path)))
+
+    with open(tmp_path / "bookings.ndjson") as lines:
+        loaded = [json_util.loads(line) for line in lines]
+    assert len(loaded) == counts["bookings"]
+    assert loaded == list(generator.bookings())
+
+
+# Classes come in series; popularity, member activity and preferences are skewed the way production is
+def test_workload_shape():
+    generator = small_generator()
+    classes = list(generator.classes())
+    bookings = list(generator.bookings())
+
+    occurrences = Counter(fitness_class["description"] for fitness_class in classes)
+    assert len(occurrences) == 40 and min(occurrences.values()) >= 2
+
+    capacity = {str(fitness_class["_id"]): fitness_class["capacity"] for fitness_class in classes}
+    per_class = Counter(booking["class_id"] for booking in bookings)
+    assert all(per_class[class_id] <= capacity[class_id] for class_id in per_class)
+    assert any(per_class[class_id] == capacity[class_id] for class_id in per_class)
+    assert len({(booking["class_id"], booking["user_id"]) for booking in bookings}) == len(bookings)
+    assert all(fitness_class["remaining_spots"] == fitness_class["capacity"] - per_class[str(fitness_class["_id"])]
+               for fitness_class in classes)
+
+    # The busiest tenth of members hold far more than a tenth of the bookings
+    per_member = sorted(Counter(booking["user_id"] for booking in bookings).values(), reverse=True)
+    assert sum(per_member[:len(per_member) // 10]) > 0.25 * len(bookings)
+
+    telegram = [booking for booking in bookings if CHANNEL_TELEGRAM in booking[NOTIFICATION_PREFERENCES][CHANNELS]]
+    assert 0 < len(telegram) < len(bookings)
+    assert all(booking[NOTIFICATION_PREFERENCES]["telegram_chat_id"] for booking in telegram)
+
+    starts = {str(fitness_class["_id"]): fitness_class["start_date"] for fitness_class in classes}
+    assert all((REMINDER_SENT_AT in booking) == (starts[booking["class_id"]] <= ANCHOR) for booking in bookings)
+
+
+# Sized generators stop at the class target and scale capacities so bookings land near their target
+def test_sized_to_class_and_booking_targets():
+    generator = WorkloadGenerator.sized(users=600, classes=150, bookings=3000, history_weeks=8, future_weeks=2,
+                                        seed=7, anchor=ANCHOR, bcrypt_rounds=4)
+    classes = list(generator.classes())
+    bookings = list(generator.bookings())
+
+    assert len(classes) == 150
+    assert 2700 <= len(bookings) <= 3300
+    assert max(fitness_class["capacity"] for fitness_class in classes) > 30
+    assert all(fitness_class["remaining_spots"] >= 0 for fitness_class in classes)
+
+
+# A trainer's classes never overlap, so the data passes the same check the API applies
+def test_trainer_classes_never_overlap():
+    by_trainer = defaultdict(list)
+    for fitness_class in small_generator().classes():
+        by_trainer[fitness_class["trainer_id"]].append((fitness_class["start_date"], fitness_class["end_date"]))
+
+    for schedule in by_trainer.values():
+        schedule.sort()
+        assert all(end <= next_start for (_, end), (next_start, _) in zip(schedule, schedule[1:]))
+
+
+# Written to Mongo, generated members can log in and see their booking history
+def test_mongo_sink_and_login(app, client):
+    # Anchored at today, so some classes are still upcoming
+    generator = small_generator(anchor=None)
+    with app.app_context():
+        services = get_services()
+        indexes = services.booking_resource.collection.index_information()
+        counts = write_dataset(generator, MongoSink(batch_size=100))
+
+        assert services.booking_resource.collection.count_documents({}) == counts["bookings"]
+        assert services.class_resource.get_upcoming_classes()
+        # Indexes are dropped for the load and rebuilt after it
+        assert services.booking_resource.collection.index_information() == indexes
+
+    member_id, _ = Counter(booking["user_id"] for booking in generator.bookings()).most_common(1)[0]
+    member = next(member for member in generator.members if str(member["_id"]) == member_id)
+    response = client.post("/auth/login", json={"email": member["email"], "password": BENCHMARK_PASSWORD})
+    assert response.status_code == 200
+
+    token = response.get_json()["access_token"]
+    response = client.get("/bookings/my-classes", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
@@ -0,0 +1,214 @@
+"""
+Tests for notification retries and the dead-letter collection.
+Endpoints: GET /notifications/dead-letters, POST /notifications/dead-letters/replay
+"""
+
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+from botocore.stub import Stubber
+from app.services.container import get_services
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
+from app.services.notification_service import NotificationService
+from app.services.retry_policy import RetryPolicy
+from app.services.ses_email_service import SESEmailService
+
+
+class FlakyChannel(NotificationService):
+    """Fails each recipient with the queued errors, then succeeds."""
+
+    def __init__(self, failures: dict):
+        self.failures = failures
+        self.calls = []
+
+    def send_notification(self, recipient, subject, body):
+        self.calls.append(recipient)
+        errors = self.failures.get(recipient)
+        if errors:
+            raise errors.pop(0)
+
+
+def _booking(index: int):
+    return {"_id": str(index), "user_email": f"m{index}@test.com"}
+
+
+# ============================================================================
+# RETRIES
+# ============================================================================
+
+def test_transient_errors_are_retried_with_backoff():
+    """Only transient failures are retried, each after a backoff, and only for the failing recipient."""
+    channel = FlakyChannel({
+        "m0@test.com": [TransientNotificationError("throttled"), TransientNotificationError("throttled")],
+        "m1@test.com": [PermanentNotificationError("address rejected")],
+    })
+    sleeps = []
+    dead_letters = MagicMock()
+    dispatcher = NotificationDispatcher(
+        {"email": channel},
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.01, sleep=sleeps.append),
+        dead_letter_resource=dead_letters,
+    )
+
+    results = dispatcher.send_batch([(_booking(i), "Subject", "Body") for i in range(3)])
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert channel.calls.count("m0@test.com") == 3
+    assert channel.calls.count("m1@test.com") == 1
+    assert len(sleeps) == 2 and all(0 <= delay <= 0.02 for delay in sleeps)
+
+    [letters] = dead_letters.add_dead_letters.call_args.args
+    assert letters == [{
+        "booking_id": "1", "class_ids": [], "channel": "email", "recipient": "m1@test.com", "subject": "Subject",
+        "body": "Body",
+        "error": "address rejected", "transient": False, "attempts": 1,
+    }]
+
+
+def test_retries_stop_after_max_attempts():
+    """A recipient that keeps failing transiently is dead-lettered after max_attempts sends."""
+    channel = FlakyChannel({"m0@test.com": [TransientNotificationError("timeout")] * 5})
+    dead_letters = MagicMock()
+    dispatcher = NotificationDispatcher({"email": channel}, retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+                                        dead_letter_resource=dead_letters)
+
+    [result] = dispatcher.send_batch([(_booking(0), "Subject", "Body")])
+
+    assert not result.ok
+    assert len(channel.calls) == 3
+    [letters] = dead_letters.add_dead_letters.call_args.args
+    assert letters[0]["transient"] is True and letters[0]["attempts"] == 3
+
+
+def test_ses_errors_are_classified():
+    """SES throttling is transient; a rejected message is permanent."""
+    service = SESEmailService("gym@test.com")
+    with Stubber(service.client) as stubber:
+        stubber.add_client_error("create_template", service_error_code="Throttling", service_message="Rate exceeded")
+        stubber.add_response("create_template", {})
+        stubber.add_response("send_bulk_templated_email", {"Status": [
+            {"Status": "Success", "MessageId": "1"},
+            {"Status": "MessageRejected", "Error": "Email address is not verified"},
+        ]})
+
+        [throttled] = service.send_batch([("a@test.com", "S", "B")])
+        sent, rejected = service.send_batch([("a@test.com", "S", "B"), ("b@test.com", "S", "B")])
+
+    assert isinstance(throttled, TransientNotificationError)
+    assert sent is None
+    assert isinstance(rejected, PermanentNotificationError)
+
+
+# ============================================================================
+# DEAD LETTER ENDPOINTS
+# ============================================================================
+
+def _dead_letter_reminder(app, client, trainer_token, class_id):
+    with patch("app.services.ses_email_service.SESEmailService.send_batch",
+               side_effect=lambda messages: [PermanentNotificationError("rejected")] * len(messages)), \
+            patch("app.services.telegram_notification_service.TelegramNotificationService.send_notification"):
+        client.post(f"/classes/{class_id}/reminder", headers={"Authorization": f"Bearer {trainer_token}"})
+        with app.app_context():
+            get_services().reminder_worker.run_once()
+
+
+def test_list_and_replay_dead_letters(app, client, trainer_token, sample_bookings_with_prefs):
+    """Failed reminders show up as dead letters and a replay resends and clears them."""
+    _dead_letter_reminder(app, client, trainer_token, sample_bookings_with_prefs["class_id"])
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+
+    listed = client.get("/notifications/dead-letters", headers=headers).get_json()
+    assert listed["count"] == 2
+    assert sorted(letter["recipient"] for letter in listed["dead_letters"]) == ["alice@test.com", "bob@test.com"]
+
+    with patch("app.services.ses_email_service.SESEmailService.send_batch",
+               side_effect=lambda messages: [None] * len(messages)) as mock_email:
+        resp = client.post("/notifications/dead-letters/replay", json={}, headers=headers)
+
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.get_json()["replayed"] == 2
+    assert mock_email.call_count == 1
+    assert client.get("/notifications/dead-letters", headers=headers).get_json()["count"] == 0
+
+
+def test_replay_failure_keeps_letter_pending(app, client, trainer_token, sample_bookings_with_prefs):
+    """A letter that fails again stays pending with the new error; others are untouched."""
+    _dead_letter_reminder(app, client, trainer_token, sample_bookings_with_prefs["class_id"])
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    letter = client.get("/notifications/dead-letters?limit=1", headers=headers).get_json()["dead_letters"][0]
+
+    with patch("app.services.ses_email_service.SESEmailService.send_batch",
+               side_effect=lambda messages: [PermanentNotificationError("still rejected")] * len(messages)):
+        data = client.post("/notifications/dead-letters/replay", json={"ids": [letter["_id"]]},
+                           headers=headers).get_json()
+
+    assert data["replayed"] == 0 and data["failed"] == 1
+    with app.app_context():
+        stored = get_services().dead_letter_resource.get_dead_letter(letter["_id"])
+    assert stored["status"] == "pending"
+    assert stored["error"] == "still rejected"
+    assert stored["attempts"] == 2
+
+
+def test_trainer_sees_only_own_class_letters(app, client, trainer_token, other_trainer_token,
+                                             sample_bookings_with_prefs):
+    """Another trainer can neither list nor replay letters about someone else's class."""
+    _dead_letter_reminder(app, client, trainer_token, sample_bookings_with_prefs["class_id"])
+    owner = {"Authorization": f"Bearer {trainer_token}"}
+    other = {"Authorization": f"Bearer {other_trainer_token}"}
+    listed = client.get("/notifications/dead-letters", headers=owner).get_json()["dead_letters"]
+    letter_ids = [letter["_id"] for letter in listed]
+
+    assert client.get("/notifications/dead-letters", headers=other).get_json()["count"] == 0
+    with patch("app.services.ses_email_service.SESEmailService.send_batch") as mock_email:
+        data = client.post("/notifications/dead-letters/replay", json={"ids": letter_ids}, headers=other).get_json()
+
+    assert data["replayed"] == 0 and data["results"] == []
+    mock_email.assert_not_called()
+    assert client.get("/notifications/dead-letters", headers=owner).get_json()["count"] == 2
+
+
+def test_replay_claims_each_letter_once(app, client, trainer_token, sample_bookings_with_prefs):
+    """A letter another replay has claimed is skipped, so it is never sent twice."""
+    _dead_letter_reminder(app, client, trainer_token, sample_bookings_with_prefs["class_id"])
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    first, second = client.get("/notifications/dead-letters", headers=headers).get_json()["dead_letters"]
+    with app.app_context():
+        dead_letters = get_services().dead_letter_resource
+        assert dead_letters.claim_for_replay(first["_id"])
+        assert not dead_letters.claim_for_replay(first["_id"])
+
+    with patch("app.services.ses_email_service.SESEmailService.send_batch",
+               side_effect=lambda messages: [None] * len(messages)) as mock_email:
+        data = client.post("/notifications/dead-letters/replay", json={}, headers=headers).get_json()
+
+    assert [result["_id"] for result in data["results"]] == [second["_id"]]
+    [messages] = mock_email.call_args.args
+    assert [message[0] for message in messages] == [second["recipient"]]
+    with app.app_context():
+        assert get_services().dead_letter_resource.get_dead_letter(first["_id"])["status"] == "replaying"
+
+
+def test_replay_defers_letters_past_deadline(app, client, trainer_token, sample_bookings_with_prefs):
+    """A replay out of time sends nothing more and hands its claimed letters back unchanged."""
+    _dead_letter_reminder(app, client, trainer_token, sample_bookings_with_prefs["class_id"])
+    headers = {"Authorization": f"Bearer {trainer_token}"}
+    with app.app_context():
+        get_services().dead_letter_service.replay_deadline_seconds = 0
+
+    with patch("app.services.ses_email_service.SESEmailService.send_batch") as mock_email:
+        data = client.post("/notifications/dead-letters/replay", json={}, headers=headers).get_json()
+
+    mock_email.assert_not_called()
+    assert (data["replayed"], data["failed"], data["deferred"]) == (0, 0, 2)
+    assert {result["status"] for result in data["results"]} == {"deferred"}
+    listed = client.get("/notifications/dead-letters", headers=headers).get_json()["dead_letters"]
+    assert [(letter["error"], letter["attempts"]) for letter in listed] == [("rejected", 1)] * 2
+
+
+def test_dead_letters_require_trainer(client, member_token):
+    """Members can neither list nor replay dead letters."""
+    headers = {"Authorization": f"Bearer {member_token}"}
+    assert client.get("/notifications/dead-letters", headers=headers).status_code == HTTPStatus.FORBIDDEN
+    assert client.post("/notifications/dead-letters/replay", json={}, headers=headers).status_code == \
+        HTTPStatus.FORBIDDEN
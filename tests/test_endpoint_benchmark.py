@@ -0,0 +1,63 @@
+"""
+Endpoint benchmark suite over a seeded dataset.
+
+Covers:
+- Seeding the datagen workload and finding its trainers, free members and upcoming classes with spots left
+- Refusing to wipe a real database whose name does not mark it as a benchmark one
+- Every benchmarked route answering successfully against the seeded data
+"""
+
+import pytest
+from benchmarks import endpoints
+from benchmarks.datagen import WorkloadGenerator
+from benchmarks.endpoints import ROUTES, run_benchmarks, seed_dataset
+from app.db.bookings import CLASS_ID, USER_ID
+from app.db.classes import REMAINING_SPOTS
+from app.services.container import get_services
+
+
+# Seeding writes the datagen workload for the seed and keeps the ids the request factories need
+def test_seed_dataset_matches_datagen(app):
+    with app.app_context():
+        dataset = seed_dataset(users=200, classes=40, bookings=600, seed=3)
+        services = get_services()
+        generator = WorkloadGenerator.sized(users=200, classes=40, bookings=600, seed=3)
+        bookings = services.booking_resource.collection.count_documents({})
+
+        assert services.user_resource.collection.count_documents({}) == 200
+        assert services.class_resource.collection.count_documents({}) == 40
+        assert bookings == len(list(generator.bookings()))
+        class_ids = [fitness_class[0] for fitness_class in dataset.upcoming_classes]
+        upcoming = [services.class_resource.get_class_by_id(class_id) for class_id in class_ids]
+        free = [member[0] for member in dataset.free_members]
+        booked_upcoming = services.booking_resource.collection.count_documents(
+            {CLASS_ID: {"$in": class_ids}, USER_ID: {"$in": free}})
+
+    # Capacities are scaled to the booking target, so the total lands close to it
+    assert 540 <= bookings <= 660
+    assert len(dataset.trainers) == 2 and len(dataset.members) == 198
+    assert dataset.free_members and dataset.upcoming_classes and dataset.bookings
+    assert all(fitness_class[REMAINING_SPOTS] > 0 for fitness_class in upcoming)
+    assert booked_upcoming == 0
+
+
+# Seeding clears collections first, so it only runs on mongomock or a database named for benchmarks
+def test_seed_dataset_refuses_real_database(app):
+    app.config.update(MOCK_DB=False, DB_NAME="fitness_class_db")
+    with app.app_context(), pytest.raises(RuntimeError):
+        seed_dataset(users=10, classes=1, bookings=1)
+
+
+# Every route is measured and succeeds against the seeded data
+def test_run_benchmarks_covers_every_route(app, monkeypatch):
+    # Every imported row is a password hash, so keep the CSVs short
+    monkeypatch.setattr(endpoints, "IMPORT_ROWS", 2)
+    with app.app_context():
+        dataset = seed_dataset(users=200, classes=40, bookings=600, seed=3)
+    report = run_benchmarks(app, dataset, requests=3, concurrency=2)
+
+    assert list(report) == list(ROUTES)
+    for route, measurement in report.items():
+        assert measurement["errors"] == 0, (route, measurement["status_codes"])
+        assert measurement["latency"]["count"] == 3
+        assert measurement["throughput_rps"] > 0
@@ -0,0 +1,89 @@
+import time
+import pytest
+from app.db.leases import LeaseResource
+from app.services.leased_job import leased
+
+
+@pytest.fixture
+def leases(app):
+    with app.app_context():
+        yield LeaseResource()
+
+
+# Only one owner holds a lease at a time; takeover after expiry gets a higher fencing token
+def test_lease_is_exclusive_until_it_expires(leases):
+    first = leases.acquire("job", "replica-a", ttl_seconds=30)
+    assert first.fencing_token == 1
+    assert leases.acquire("job", "replica-b", ttl_seconds=30) is None
+
+    expired = leases.acquire("other-job", "replica-a", ttl_seconds=0)
+    takeover = leases.acquire("other-job", "replica-b", ttl_seconds=30)
+    assert takeover.owner == "replica-b"
+    assert takeover.fencing_token == expired.fencing_token + 1
+
+
+# A holder that was taken over can neither renew nor release, and its token is stale
+def test_stale_holder_is_fenced_off(leases):
+    stale = leases.acquire("job", "replica-a", ttl_seconds=0)
+    current = leases.acquire("job", "replica-b", ttl_seconds=30)
+
+    assert leases.renew(stale, ttl_seconds=30) is None
+    assert leases.release(stale) is False
+    assert not leases.is_current("job", stale.fencing_token)
+    assert leases.is_current("job", current.fencing_token)
+    assert leases.renew(current, ttl_seconds=30).expires_at >= current.expires_at
+
+
+# A completed run blocks the lease for the rest of the interval; a released one does not
+def test_min_interval_after_completion(leases):
+    lease = leases.acquire("scan", "replica-a", ttl_seconds=30, min_interval_seconds=300)
+    assert leases.release(lease)
+    lease = leases.acquire("scan", "replica-b", ttl_seconds=30, min_interval_seconds=300)
+    assert lease is not None
+
+    assert leases.release(lease, completed=True)
+    assert leases.acquire("scan", "replica-a", ttl_seconds=30, min_interval_seconds=300) is None
+    assert leases.acquire("scan", "replica-a", ttl_seconds=30) is not None
+
+
+# The decorated task runs once per interval no matter how many times it is called
+def test_leased_task_runs_once_per_interval(app):
+    calls = []
+
+    @leased("stats", ttl_seconds=30, interval_seconds=300)
+    def refresh_stats(lease):
+        calls.append(lease.fencing_token)
+        return "done"
+
+    with app.app_context():
+        assert refresh_stats() == "done"
+        assert refresh_stats() is None
+    assert calls == [1]
+
+
+# A failing run gives the lease back without completing, so the next call retries it
+def test_leased_task_failure_is_retried(app):
+    attempts = []
+
+    @leased("cleanup", ttl_seconds=30, interval_seconds=300)
+    def cleanup(lease):
+        attempts.append(lease.fencing_token)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            cleanup()
+        cleanup()
+    assert attempts == [1, 2]
+
+
+# The heartbeat keeps a long run's lease alive past its TTL
+def test_leased_task_lease_is_renewed(app):
+    @leased("slow", ttl_seconds=1)
+    def slow(lease):
+        time.sleep(1.5)
+        return LeaseResource().acquire("slow", "replica-b", ttl_seconds=30)
+
+    with app.app_context():
+        assert slow() is None
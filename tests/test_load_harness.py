@@ -0,0 +1,83 @@
+"""
+Scenario-driven load harness.
+
+Covers:
+- Counting Mongo commands from pymongo events and from mongomock calls
+- A booking storm released at once, with its bookings checked against capacity
+- Paced scenarios holding their send rate
+- Every scenario reporting latency, status codes and Mongo commands
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from benchmarks.load import (
+    COMMANDS,
+    SCENARIOS,
+    Plan,
+    build_parser,
+    drive,
+    install_command_counter,
+    run_scenarios,
+    seed_database,
+)
+from app.services.container import get_services
+
+
+@pytest.fixture
+def seeded(app):
+    install_command_counter()
+    return seed_database(app, users=150, series=6)
+
+
+def options(*args):
+    return build_parser().parse_args(list(args))
+
+
+# pymongo command events and mongomock calls end up in the same counter, by command name
+def test_command_counter(app):
+    install_command_counter()
+    COMMANDS.reset()
+    COMMANDS.started(SimpleNamespace(command_name="find"))
+    with app.app_context():
+        get_services().class_resource.collection.find_one({})
+        get_services().booking_resource.collection.count_documents({})
+
+    assert COMMANDS.reset() == {"find": 2, "aggregate": 1}
+
+
+# Everyone books at once; the report matches what was stored and what each booking cost in commands
+def test_booking_storm(app, seeded):
+    report = run_scenarios(app, seeded, options("--storm-members", "30", "--storm-capacity", "5"),
+                           ["booking-storm"])["booking-storm"]
+
+    assert report["requests"] == 30 and report["capacity"] == 5
+    assert set(report["status_codes"]) <= {"201", "409"}
+    assert report["booked"] == report["status_codes"]["201"]
+    assert report["mongo_commands"]["by_command"]["insert"] == report["booked"]
+
+
+# Paced plans send at the requested rate and time requests from when they were due
+def test_paced_plan_holds_rate(app):
+    install_command_counter()
+    report = drive(app, Plan(requests=[("GET", "/classes", {})] * 6, concurrency=3, rate=20))
+
+    assert report["seconds"] >= 5 / 20
+    assert report["status_codes"] == {"200": 6}
+    assert report["latency"]["count"] == 6
+
+
+# Every scenario runs and reports throughput, latency, status codes and Mongo commands
+def test_all_scenarios(app, seeded):
+    report = run_scenarios(app, seeded, options(
+        "--storm-members", "10", "--storm-capacity", "5", "--logins", "3", "--login-rate", "10",
+        "--roster-trainers", "2", "--roster-classes", "2", "--pollers", "4", "--poll-interval", "1",
+        "--poll-duration", "1",
+    ))
+
+    assert list(report) == list(SCENARIOS)
+    for name, scenario in report.items():
+        assert scenario["requests"] > 0 and scenario["server_errors"] == 0, name
+        assert scenario["throughput_rps"] > 0 and scenario["latency"]["count"] == scenario["requests"]
+        assert scenario["mongo_commands"]["total"] > 0
+    assert report["login-wave"]["status_codes"] == {"200": 3}
@@ -0,0 +1,74 @@
+"""
+Microbenchmark regression gate.
+
+Covers:
+- Every benchmark running and returning what its function returns in the app
+- The committed baseline covering every benchmark
+- Comparison verdicts: within threshold, regressed, improved, new and missing
+- compare exiting non-zero on a regression, and record writing a baseline compare accepts
+- compare --against timing the baseline from a git revision, and falling back to the file without one
+"""
+
+import time
+
+from benchmarks import micro
+
+
+def report(**relative):
+    return {"benchmarks": {name: {"relative": value, "ns_per_call": value * 1000} for name, value in relative.items()}}
+
+
+# Each benchmark's call works on its prepared inputs, so timing it times real work
+def test_benchmarks_run():
+    for name, build in micro.BENCHMARKS.items():
+        assert build()() is not None, name
+
+    assert len(micro.BENCHMARKS["serialize_items[100]"]()()) == 100
+    assert len(micro.BENCHMARKS["RecurrenceRule.generate_schedules[weekly x52]"]()()) == 52
+
+
+# The committed baseline has an entry for every benchmark, so none of them goes ungated
+def test_baseline_covers_every_benchmark():
+    baseline = micro.load_report(micro.BASELINE_PATH)
+    assert set(baseline["benchmarks"]) == set(micro.BENCHMARKS)
+
+
+# Slowdowns past the threshold regress, speedups past it improve, and unmatched names are reported
+def test_compare_verdicts():
+    rows = micro.compare(report(same=1.0, slower=1.0, faster=1.0, gone=1.0),
+                         report(same=1.2, slower=1.3, faster=0.7, added=1.0), threshold=0.25)
+
+    verdicts = {row[0]: row[4] for row in rows}
+    assert verdicts == {"same": "ok", "slower": "regressed", "faster": "improved", "gone": "missing", "added": "new"}
+    assert "regressed" in micro.format_rows(rows)
+
+
+# A benchmark that got slower since the baseline was recorded fails the comparison
+def test_compare_command_fails_on_regression(tmp_path, monkeypatch):
+    baseline = str(tmp_path / "micro.json")
+    monkeypatch.setattr(micro, "BENCHMARKS", {"sleepy": lambda: lambda: time.sleep(0.0001)})
+    options = ["--baseline", baseline, "--min-time", "0.01", "--repeat", "3"]
+
+    assert micro.main(["record", *options]) == 0
+    assert micro.main(["compare", "--threshold", "10", *options]) == 0
+
+    monkeypatch.setattr(micro, "BENCHMARKS", {"sleepy": lambda: lambda: time.sleep(0.005)})
+    assert micro.main(["compare", *options]) == 1
+
+
+# --against times its baseline from the revision on this machine, or uses the file when it cannot
+def test_compare_against_revision(tmp_path, monkeypatch):
+    baseline = str(tmp_path / "micro.json")
+    monkeypatch.setattr(micro, "BENCHMARKS", {"sleepy": lambda: lambda: time.sleep(0.0001)})
+    options = ["--baseline", baseline, "--min-time", "0.01", "--repeat", "3"]
+    assert micro.main(["record", *options]) == 0
+    assert micro.run_at("no-such-revision") is None
+
+    timed = []
+    monkeypatch.setattr(micro, "run_at", lambda revision, *args: timed.append(revision) or micro.load_report(baseline))
+    assert micro.main(["compare", "--against", "HEAD~1", "--threshold", "10", *options]) == 0
+    assert timed == ["HEAD~1"]
+
+    monkeypatch.setattr(micro, "run_at", lambda revision, *args: None)
+    monkeypatch.setattr(micro, "BENCHMARKS", {"sleepy": lambda: lambda: time.sleep(0.005)})
+    assert micro.main(["compare", "--against", "no-such-revision", *options]) == 1
@@ -0,0 +1,74 @@
+import json
+from botocore.stub import ANY, Stubber
+from app.services.notification_templates import NotificationTemplates
+from app.services.ses_email_service import SESEmailService
+
+YOGA = {"title": "Yoga", "start_date": "2026-05-01 09:00:00", "end_date": "2026-05-01 10:00:00",
+        "location": "Studio A", "trainer_name": "Sam"}
+
+
+# Channel variants are picked over the default file, and only the name is filled per recipient
+def test_reminder_templates_per_channel():
+    templates = NotificationTemplates()
+
+    subject, body = templates.bound("reminder", "email", "class-1", **YOGA).render(user_name="Alice")
+    assert subject == "NYUAD GYM Reminder: Yoga"
+    assert body.startswith("Hi Alice,\n\nThis is a reminder for your upcoming class at NYUAD GYM:")
+    assert "Location: Studio A\nInstructor: Sam" in body
+
+    _, telegram = templates.bound("reminder", "telegram", "class-1", **YOGA).render(user_name="Bob")
+    assert telegram.startswith("Hi Bob, see you at Yoga!")
+    assert "{{" not in telegram
+
+
+# Bound templates are cached per class and channel until the class details change
+def test_bound_templates_are_cached():
+    templates = NotificationTemplates()
+    first = templates.bound("reminder", "email", "class-1", **YOGA)
+
+    assert templates.bound("reminder", "email", "class-1", **YOGA) is first
+    assert templates.bound("reminder", "telegram", "class-1", **YOGA) is not first
+    assert templates.bound("reminder", "email", "class-1", **{**YOGA, "location": "Pool"}) is not first
+    # After binding, rendering only has the user name left to fill in
+    assert [segment for segment in first.body if type(segment) is not str] == ["user_name"]
+
+
+# Templates are read from the configured version folder
+def test_templates_are_versioned(tmp_path):
+    (tmp_path / "v2").mkdir()
+    (tmp_path / "v2" / "reminder.txt").write_text("Subject: {{title}} soon\n\nHey {{user_name}}!\n")
+
+    subject, body = NotificationTemplates(str(tmp_path), version="v2").get("reminder", "email").bind(
+        **YOGA).render(user_name="Alice")
+
+    assert (subject, body) == ("Yoga soon", "Hey Alice!")
+    assert NotificationTemplates(str(tmp_path), version="v2").get("reminder", "email").key == "reminder-email-v2"
+
+
+# SES sends templated messages on a stored template with the class data once per call
+def test_ses_sends_shared_template_content_once():
+    template = NotificationTemplates().bound("reminder", "email", "class-1", **YOGA)
+    messages = [(f"m{i}@test.com", *template.render(user_name=f"Member {i}")) for i in range(3)]
+    messages.append(("plain@test.com", "Subject", "Body"))
+
+    service = SESEmailService("gym@test.com")
+    with Stubber(service.client) as stubber:
+        stubber.add_response("create_template", {}, {"Template": {
+            "TemplateName": "notification-reminder-email-v1", "SubjectPart": "NYUAD GYM Reminder: {{{title}}}",
+            "TextPart": ANY,
+        }})
+        stubber.add_response("send_bulk_templated_email", {"Status": [{"Status": "Success"}] * 3}, {
+            "Source": "gym@test.com",
+            "Template": "notification-reminder-email-v1",
+            "DefaultTemplateData": json.dumps(template.shared),
+            "Destinations": [
+                {"Destination": {"ToAddresses": [f"m{i}@test.com"]},
+                 "ReplacementTemplateData": json.dumps({"user_name": f"Member {i}"})}
+                for i in range(3)
+            ],
+        })
+        stubber.add_response("create_template", {})
+        stubber.add_response("send_bulk_templated_email", {"Status": [{"Status": "Success"}]})
+
+        assert service.send_batch(messages) == [None] * 4
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,118 @@
+import bcrypt
+from app.db.users import (
+    ALGORITHM_ARGON2ID,
+    ALGORITHM_BCRYPT,
+    EMAIL,
+    PASSWORD,
+    PASSWORD_ALGORITHM,
+    PASSWORD_COST,
+    PasswordHashPolicy,
+    UserResource,
+)
+from app.services.container import ServiceContainer
+
+
+class InlineExecutor:
+    """Runs hash work synchronously so background rehashes are deterministic."""
+
+    def run(self, fn, *args):
+        return fn(*args)
+
+    def submit(self, fn, *args):
+        return fn(*args)
+
+
+# Calibration never goes below the configured minimum cost
+def test_calibrate_bcrypt_respects_bounds():
+    policy = PasswordHashPolicy.calibrate(target_ms=0.001, min_bcrypt_rounds=5, max_bcrypt_rounds=8)
+    assert policy.bcrypt_rounds == 5
+    assert policy.calibrated_ms is not None
+
+
+# argon2id hashes verify and carry their tunable parameters as the stored cost
+def test_argon2id_hash_and_verify():
+    policy = PasswordHashPolicy(algorithm=ALGORITHM_ARGON2ID, argon2_time_cost=1, argon2_memory_kib=1024,
+                                argon2_parallelism=1)
+    hashed = policy.hash("secret")
+
+    assert PasswordHashPolicy.verify("secret", hashed, ALGORITHM_ARGON2ID)
+    assert not PasswordHashPolicy.verify("wrong", hashed, ALGORITHM_ARGON2ID)
+    assert policy.cost == {"time_cost": 1, "memory_kib": 1024, "parallelism": 1}
+
+
+# Users store algorithm and cost, and neither leaks out of the resource
+def test_create_user_stores_algorithm_and_cost(app):
+    with app.app_context():
+        users = UserResource(hash_policy=PasswordHashPolicy(bcrypt_rounds=4))
+        users.create_user("cost@test.com", "password123", "Cost", "1990-01-01")
+
+        stored = users.collection.find_one({EMAIL: "cost@test.com"})
+        assert stored[PASSWORD_ALGORITHM] == ALGORITHM_BCRYPT
+        assert stored[PASSWORD_COST] == {"rounds": 4}
+
+        user = users.verify_password("cost@test.com", "password123")
+        assert PASSWORD_COST not in user and PASSWORD not in user
+
+
+# A legacy bcrypt user is moved to the new policy after a successful login
+def test_login_rehashes_when_policy_changes(app):
+    with app.app_context():
+        users = UserResource(hash_executor=InlineExecutor(),
+                             hash_policy=PasswordHashPolicy(algorithm=ALGORITHM_ARGON2ID, argon2_time_cost=1,
+                                                            argon2_memory_kib=1024, argon2_parallelism=1))
+        users.collection.insert_one({
+            EMAIL: "legacy@test.com",
+            PASSWORD: bcrypt.hashpw(b"password123", bcrypt.gensalt(rounds=4)),
+        })
+
+        assert users.verify_password("legacy@test.com", "password123")
+
+        stored = users.collection.find_one({EMAIL: "legacy@test.com"})
+        assert stored[PASSWORD_ALGORITHM] == ALGORITHM_ARGON2ID
+        assert users.verify_password("legacy@test.com", "password123")
+        assert users.verify_password("legacy@test.com", "wrong") is None
+
+
+# Only a weaker hash or another algorithm is rehashed, so replicas that calibrated apart never undo each other
+def test_needs_rehash_only_for_weaker_hashes():
+    policy = PasswordHashPolicy(bcrypt_rounds=12)
+    bcrypt_user = {PASSWORD_ALGORITHM: ALGORITHM_BCRYPT}
+
+    assert policy.needs_rehash({**bcrypt_user, PASSWORD_COST: {"rounds": 11}})
+    assert not policy.needs_rehash({**bcrypt_user, PASSWORD_COST: {"rounds": 12}})
+    assert not policy.needs_rehash({**bcrypt_user, PASSWORD_COST: {"rounds": 13}})
+    assert policy.needs_rehash({PASSWORD_ALGORITHM: ALGORITHM_ARGON2ID, PASSWORD_COST: {"time_cost": 9}})
+
+    argon2 = PasswordHashPolicy(algorithm=ALGORITHM_ARGON2ID, argon2_time_cost=3, argon2_memory_kib=1024)
+    argon2_user = {PASSWORD_ALGORITHM: ALGORITHM_ARGON2ID}
+    assert not argon2.needs_rehash({**argon2_user, PASSWORD_COST: {"time_cost": 4, "memory_kib": 1024,
+                                                                   "parallelism": 4}})
+    assert argon2.needs_rehash({**argon2_user, PASSWORD_COST: {"time_cost": 4, "memory_kib": 512,
+                                                               "parallelism": 4}})
+
+
+# With calibration off, the configured bcrypt cost is the policy
+def test_fixed_policy_uses_configured_rounds(app):
+    app.config.update(PASSWORD_HASH_TARGET_MS=0, PASSWORD_HASH_BCRYPT_ROUNDS=11)
+    assert ServiceContainer._build_hash_policy(app.config).cost == {"rounds": 11}
+
+
+# Calibration waits for the first hash, so an app that never hashes never calibrates
+def test_calibration_is_lazy(app, monkeypatch):
+    calibrations = []
+
+    def calibrate(cls, **options):
+        calibrations.append(options["target_ms"])
+        return PasswordHashPolicy(bcrypt_rounds=4, calibrated_ms=1.0)
+
+    monkeypatch.setattr(PasswordHashPolicy, "calibrate", classmethod(calibrate))
+    with app.app_context():
+        services = ServiceContainer({**app.config, "PASSWORD_HASH_TARGET_MS": 50})
+        assert calibrations == []
+
+        services.user_resource.create_user("lazy@test.com", "password123", "Lazy", "1990-01-01")
+        services.user_resource.create_user("lazier@test.com", "password123", "Lazier", "1990-01-01")
+    services.shutdown()
+
+    assert calibrations == [50]
+    assert services.hash_policy.cost == {"rounds": 4}
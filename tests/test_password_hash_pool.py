@@ -0,0 +1,92 @@
+import threading
+import pytest
+from http import HTTPStatus
+from app.db.users import EMAIL, PASSWORD
+from app.services.container import get_services
+from app.services.password_hash_pool import HashPoolSaturatedError, PasswordHashPool
+
+
+# Unit test: work runs on the pool and latency is recorded
+def test_pool_runs_work_and_records_latency():
+    pool = PasswordHashPool(max_workers=1, queue_limit=0)
+    assert pool.run(sum, [1, 2, 3]) == 6
+
+    timers = pool.metrics.snapshot()["timers"]
+    assert timers["password_hash.latency"]["count"] == 1
+    pool.shutdown()
+
+
+# Unit test: once workers and queue slots are taken, new work is rejected immediately
+def test_pool_rejects_when_saturated():
+    pool = PasswordHashPool(max_workers=1, queue_limit=1, retry_after=7)
+    release = threading.Event()
+    running = [pool.submit(release.wait), pool.submit(release.wait)]
+
+    with pytest.raises(HashPoolSaturatedError) as error:
+        pool.submit(release.wait)
+    assert error.value.retry_after == 7
+    assert pool.metrics.snapshot()["counters"]["password_hash.rejected"] == 1
+
+    release.set()
+    for future in running:
+        future.result()
+    pool.shutdown()
+
+
+# Unit test: a hash still queued after queue_timeout is cancelled and rejected, and frees its slot
+def test_pool_rejects_hash_that_waits_too_long():
+    pool = PasswordHashPool(max_workers=1, queue_limit=1, queue_timeout=0.05)
+    release = threading.Event()
+    busy = pool.submit(release.wait)
+
+    with pytest.raises(HashPoolSaturatedError):
+        pool.run(sum, [1, 2, 3])
+    assert pool.metrics.snapshot()["counters"]["password_hash.timed_out"] == 1
+
+    release.set()
+    busy.result()
+    assert pool.run(sum, [1, 2, 3]) == 6
+    pool.shutdown()
+
+
+# Unit test: a hash that has started is waited for, however long it takes
+def test_pool_waits_for_running_hash():
+    pool = PasswordHashPool(max_workers=1, queue_limit=0, queue_timeout=0.01)
+    assert pool.run(lambda: threading.Event().wait(0.1) or "done") == "done"
+    pool.shutdown()
+
+
+# Integration test: shutting the container down stops the pool's threads
+def test_container_shutdown_stops_hash_pool(app):
+    with app.app_context():
+        services = get_services()
+    services.shutdown()
+
+    with pytest.raises(RuntimeError):
+        services.password_hash_pool.submit(sum, [1])
+
+
+# Integration test: a saturated pool turns login into 503 with Retry-After
+def test_login_returns_503_when_hash_pool_saturated(client, app, member_token):
+    def saturated(*args):
+        raise HashPoolSaturatedError(retry_after=3)
+
+    with app.app_context():
+        get_services().password_hash_pool.run = saturated
+
+    resp = client.post("/auth/login", json={EMAIL: "member@test.com", PASSWORD: "password123"})
+
+    assert resp.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert resp.headers["Retry-After"] == "3"
+
+
+# Metrics endpoint exposes hash latency to trainers only
+def test_metrics_endpoint_requires_trainer(client, trainer_token, member_token):
+    client.post("/auth/login", json={EMAIL: "trainer@test.com", PASSWORD: "password123"})
+
+    resp = client.get("/metrics", headers={"Authorization": f"Bearer {trainer_token}"})
+    assert resp.status_code == HTTPStatus.OK
+    assert "password_hash.latency" in resp.get_json()["timers"]
+
+    resp = client.get("/metrics", headers={"Authorization": f"Bearer {member_token}"})
+    assert resp.status_code == HTTPStatus.FORBIDDEN
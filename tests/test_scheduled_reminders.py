@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app.db.bookings import BookingResource, REMINDER_SENT_AT
+from app.db.classes import ClassResource
+from app.scheduler import SCHEDULED_REMINDERS_JOB, init_scheduler, send_scheduled_reminders
+from app.services.container import get_services
+
+
+def _ses_batch_ok(messages):
+    return [None] * len(messages)
+
+
+def _create_class(starts_in: timedelta, title: str):
+    start = datetime.now() + starts_in
+    class_id = ClassResource().create_class(
+        title=title,
+        trainer_id="trainer_1",
+        trainer_name="Test Trainer",
+        start_date=start,
+        end_date=start + timedelta(hours=1),
+        capacity=10,
+        location="Studio A",
+        description="Scheduled reminder test class",
+    )
+    return str(class_id)
+
+
+def _book(class_id: str, email: str):
+    return str(BookingResource().create_booking(class_id, email, email, "Member"))
+
+
+# Only classes inside the window are reminded, and each booking only once
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=_ses_batch_ok)
+def test_scheduled_reminders_send_once(mock_email, app):
+    with app.app_context():
+        soon = _create_class(timedelta(hours=2), "Soon")
+        later = _create_class(timedelta(days=3), "Later")
+        _book(soon, "a@test.com")
+        _book(soon, "b@test.com")
+        _book(later, "c@test.com")
+
+        first = send_scheduled_reminders(app)
+        second = send_scheduled_reminders(app)
+
+        assert first == {"classes": 1, "sent": 2, "failed": 0}
+        assert second == {"classes": 1, "sent": 0, "failed": 0}
+        emailed = [recipient for call in mock_email.call_args_list for recipient, _, _ in call.args[0]]
+        assert sorted(emailed) == ["a@test.com", "b@test.com"]
+
+
+# A failed reminder is not retried by later scans; it is kept as a dead letter instead
+@patch("app.services.ses_email_service.SESEmailService.send_batch")
+def test_scheduled_reminder_failure_is_dead_lettered(mock_email, app):
+    mock_email.side_effect = Exception("SES unavailable")
+    with app.app_context():
+        booking_id = _book(_create_class(timedelta(hours=1), "Soon"), "a@test.com")
+        window = timedelta(hours=24)
+
+        summary = get_services().reminder_service.send_upcoming_reminders(window)
+        assert summary["failed"] == 1
+        assert BookingResource().get_booking_by_id(booking_id).get(REMINDER_SENT_AT) is not None
+
+        mock_email.side_effect = _ses_batch_ok
+        assert get_services().reminder_service.send_upcoming_reminders(window)["sent"] == 0
+        letters = get_services().dead_letter_resource.get_pending()
+        assert [(letter["booking_id"], letter["recipient"]) for letter in letters] == [(booking_id, "a@test.com")]
+
+
+# The scheduler only starts when enabled, and then registers the reminder scan, which runs in its own app context
+def test_init_scheduler_registers_job(app):
+    assert init_scheduler(app) is None
+
+    app.config["SCHEDULER_ENABLED"] = True
+    with patch("flask_apscheduler.APScheduler.start"):
+        scheduler = init_scheduler(app)
+    job = scheduler.get_job(SCHEDULED_REMINDERS_JOB)
+    assert job is not None
+    assert job.func(*job.args) == {"classes": 0, "sent": 0, "failed": 0}
+
+
+# Digest mode sends each member one message per channel covering all their classes in the window
+@patch("app.services.telegram_notification_service.TelegramNotificationService.send_notification")
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=_ses_batch_ok)
+def test_scheduled_reminders_digest(mock_email, mock_tele, app):
+    app.config["REMINDER_DIGEST_ENABLED"] = True
+    with app.app_context():
+        classes = [_create_class(timedelta(hours=hours), f"Class {hours}") for hours in (1, 2, 3)]
+        bookings = [_book(class_id, "a@test.com") for class_id in classes]
+        _book(classes[0], "b@test.com")
+        _create_class(timedelta(days=3), "Later")
+        BookingResource().update_notification_preferences(bookings[1], {
+            "channels": ["email", "telegram"], "telegram_chat_id": "555",
+        })
+
+        summary = send_scheduled_reminders(app)
+
+        assert summary == {"classes": 3, "members": 2, "sent": 3, "failed": 0}
+        messages = [message for call in mock_email.call_args_list for message in call.args[0]]
+        assert sorted(recipient for recipient, _, _ in messages) == ["a@test.com", "b@test.com"]
+        digest = next(body for recipient, _, body in messages if recipient == "a@test.com")
+        assert all(f"Class {hours}" in digest for hours in (1, 2, 3))
+
+        mock_tele.assert_called_once()
+        assert mock_tele.call_args.args[0] == "555"
+        assert "Class 2" in mock_tele.call_args.args[2]
+
+        assert send_scheduled_reminders(app)["sent"] == 0
+
+
+# A scan whose lease was taken over while it claimed bookings sends nothing and gives the claims back
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=_ses_batch_ok)
+def test_stale_lease_holder_is_fenced_off(mock_email, app):
+    with app.app_context():
+        booking_id = _book(_create_class(timedelta(hours=1), "Soon"), "a@test.com")
+        leases = get_services().lease_resource
+        stale = leases.acquire(SCHEDULED_REMINDERS_JOB, "replica-a", ttl_seconds=0)
+        leases.acquire(SCHEDULED_REMINDERS_JOB, "replica-b", ttl_seconds=30)
+
+        fenced = send_scheduled_reminders(app, lease=stale)
+
+        assert fenced == {"classes": 1, "sent": 0, "failed": 0, "fenced_off": 1}
+        mock_email.assert_not_called()
+        assert BookingResource().get_booking_by_id(booking_id)[REMINDER_SENT_AT] is None
+        assert send_scheduled_reminders(app)["sent"] == 1
@@ -0,0 +1,138 @@
+"""
+Server-Timing breakdown headers.
+
+Covers:
+- Every span and the request total in the header, with JWT and password checks counted as auth
+- Nested spans counting exclusive time, so an inner db call is not also counted as auth
+- Mongo commands reported by the command listener landing in the request's db span
+- Outbound notification sends landing in the notify span
+- SERVER_TIMING=trainers showing the header to trainer tokens only, and SERVER_TIMING=off to nobody
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from flask import g
+
+from app import server_timing
+from app.server_timing import COMMAND_LISTENER, RequestTiming
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_service import NotificationService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowChannel(NotificationService):
+    """Takes clock.step seconds of the fake clock per message."""
+
+    def __init__(self, clock, step):
+        self.clock, self.step = clock, step
+
+    def send_notification(self, recipient, subject, body):
+        self.clock.now += self.step
+
+
+def parse(header):
+    """{metric: duration in ms} from a Server-Timing header."""
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = float(dict(param.split("=", 1) for param in params)["dur"])
+    return metrics
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(server_timing, "time", SimpleNamespace(perf_counter=clock))
+    return clock
+
+
+# Each response says how long went to auth, db, serialize and notify, and in total
+def test_header_has_every_span(app, client, member_token):
+    app.config["SERVER_TIMING"] = "all"
+    response = client.post("/auth/login", json={"email": "member@test.com", "password": "password123"})
+
+    metrics = parse(response.headers["Server-Timing"])
+    assert list(metrics) == ["auth", "db", "serialize", "notify", "total"]
+    # Checking the password against its bcrypt hash is most of a login
+    assert metrics["auth"] > 0.5 * metrics["total"] > 0
+
+    response = client.get("/classes", headers={"Authorization": f"Bearer {member_token}"})
+    assert parse(response.headers["Server-Timing"])["serialize"] > 0
+
+
+# An inner span pauses the outer one, and whatever is left open is closed by the header
+def test_spans_are_exclusive(clock):
+    timing = RequestTiming()
+    timing.start("auth")
+    clock.now += 0.002
+    timing.start("db")
+    clock.now += 0.005
+    timing.stop("db")
+    clock.now += 0.001
+    timing.start("serialize")
+    clock.now += 0.003
+
+    metrics = parse(timing.header())
+    assert metrics == {"auth": 3.0, "db": 5.0, "serialize": 3.0, "notify": 0.0, "total": 11.0}
+
+
+# Command events from pymongo are timed into the db span of the request that sent them
+def test_command_listener_times_db(app, clock):
+    event = SimpleNamespace(command_name="find", request_id=1)
+    with app.test_request_context():
+        g.server_timing = RequestTiming()
+        server_timing.start_span("auth")
+        COMMAND_LISTENER.started(event)
+        clock.now += 0.004
+        COMMAND_LISTENER.succeeded(event)
+        COMMAND_LISTENER.started(event)
+        clock.now += 0.001
+        COMMAND_LISTENER.failed(event)
+        server_timing.stop_span("auth")
+
+        assert g.server_timing.totals["db"] == pytest.approx(0.005)
+        assert g.server_timing.totals["auth"] == 0.0
+
+    # Outside a request there is nothing to report to
+    COMMAND_LISTENER.started(event)
+    COMMAND_LISTENER.succeeded(event)
+
+
+# Time spent in a channel's send counts as notify
+def test_notification_sends_time_notify(app, clock):
+    dispatcher = NotificationDispatcher({"email": SlowChannel(clock, 0.25)})
+    booking = {"_id": "1", "user_email": "member@test.com"}
+    with app.test_request_context():
+        g.server_timing = RequestTiming()
+        dispatcher.send_batch([(booking, "Reminder", "See you soon"), (booking, "Reminder", "See you soon")])
+
+        assert g.server_timing.totals["notify"] == pytest.approx(0.5)
+
+
+# With SERVER_TIMING=trainers, only requests with a trainer's token get the header, on any route
+def test_trainers_only(app, client, member_token, trainer_token):
+    app.config["SERVER_TIMING"] = "trainers"
+
+    def header(token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return client.get("/classes", headers=headers).headers.get("Server-Timing")
+
+    assert header() is None
+    assert header(member_token) is None
+    assert header("not.a.token") is None
+    assert "auth;dur=" in header(trainer_token)
+
+
+# SERVER_TIMING=off leaves responses untouched
+def test_timing_off(app, client, trainer_token):
+    app.config["SERVER_TIMING"] = "off"
+    response = client.get("/classes", headers={"Authorization": f"Bearer {trainer_token}"})
+    assert "Server-Timing" not in response.headers
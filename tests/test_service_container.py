@@ -0,0 +1,28 @@
+from app.services.container import SERVICES_EXTENSION, get_services
+
+
+# The container is built once in create_app and shared by every request
+def test_container_is_registered_once_per_app(app):
+    with app.app_context():
+        services = get_services()
+        assert services is app.extensions[SERVICES_EXTENSION]
+        assert get_services() is services
+
+
+# Services share the same resource objects instead of building their own
+def test_services_share_resources(app):
+    with app.app_context():
+        services = get_services()
+        assert services.booking_service.user_resource is services.user_resource
+        assert services.class_service.booking_resource is services.booking_resource
+        assert services.class_members_service.class_resource is services.class_resource
+
+
+# Notification clients are created lazily and then reused
+def test_notification_dispatcher_is_reused(app):
+    with app.app_context():
+        services = get_services()
+        assert services._notification_dispatcher is None
+        dispatcher = services.notification_dispatcher
+        assert services.notification_dispatcher is dispatcher
+        assert services.reminder_service.notification_dispatcher is dispatcher
@@ -1,8 +1,16 @@
+import json
+import time
 import pytest
-from unittest.mock import patch
-from urllib.error import HTTPError
+from unittest.mock import MagicMock
+from urllib3.response import HTTPResponse
+from app.services.rate_limiter import TokenBucket
 from app.services.telegram_notification_service import TelegramNotificationService
 
+
+def _telegram_response(status, payload):
+    return HTTPResponse(body=json.dumps(payload).encode(), status=status, preload_content=True)
+
+
 # Unit test: Service should fail if token is empty
 def test_telegram_service_input_validation():
     service = TelegramNotificationService(bot_token="")
@@ -10,10 +18,121 @@ def test_telegram_service_input_validation():
         service.send_notification("123", "Title", "Body")
 
 # Unit test: Ensure the service correctly handles Telegram API 500 errors
-@patch("urllib.request.urlopen")
-def test_telegram_network_failure(mock_urlopen):
-    mock_urlopen.side_effect = HTTPError(None, 500, "Internal Server Error", None, None)
+def test_telegram_network_failure():
     service = TelegramNotificationService(bot_token="fake_token")
-    
+    service.http.request = MagicMock(return_value=_telegram_response(500, {"description": "Internal Server Error"}))
+
     with pytest.raises(Exception, match="Telegram notification failed"):
-        service.send_notification("123", "Title", "Body")
\ No newline at end of file
+        service.send_notification("123", "Title", "Body")
+
+# Unit test: a 429 pauses the bot for Telegram's retry_after and then retries on the configured base URL
+def test_telegram_honours_retry_after():
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        time.sleep(seconds)
+
+    service = TelegramNotificationService(bot_token="fake_token", base_url="http://127.0.0.1:9003/",
+                                          chat_rate=100, sleep=sleep)
+    service.http.request = MagicMock(side_effect=[
+        _telegram_response(429, {"ok": False, "parameters": {"retry_after": 0.2}}),
+        _telegram_response(200, {"ok": True}),
+    ])
+
+    service.send_notification("123", "Title", "Body")
+
+    assert service.http.request.call_count == 2
+    assert service.http.request.call_args.args[1] == "http://127.0.0.1:9003/botfake_token/sendMessage"
+    assert sum(sleeps) >= 0.19
+
+# Unit test: the token bucket allows a burst of `capacity`, then paces calls at `rate`
+def test_token_bucket_paces_calls():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+    for _ in range(6):
+        bucket.acquire()
+
+    # Two calls from the burst, then four more at 0.5 s apart
+    assert now[0] == pytest.approx(2.0)
+
+# Unit test: after a pause the bucket starts empty, so calls resume at `rate` rather than as a burst
+def test_token_bucket_pause_does_not_refill():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2, capacity=4, clock=lambda: now[0], sleep=sleep)
+    bucket.pause(10)
+    for _ in range(4):
+        bucket.acquire()
+
+    # The first call waits out the pause and one token, the rest come 0.5 s apart
+    assert now[0] == pytest.approx(12.0)
+
+# Unit test: SES sends 120 emails as three bulk calls of at most 50 and creates the template once
+def test_ses_send_batch_uses_bulk_templated_email():
+    from botocore.stub import Stubber
+    from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
+    from app.services.ses_email_service import SESEmailService
+
+    service = SESEmailService("gym@test.com")
+    messages = [(f"m{i}@test.com", "Reminder", f"Hi {i} & welcome") for i in range(120)]
+    with Stubber(service.client) as stubber:
+        stubber.add_response("create_template", {})
+        for size in (50, 50, 20):
+            statuses = [{"Status": "Success", "MessageId": str(i)} for i in range(size)]
+            if size == 20:
+                statuses[-2] = {"Status": "TransientFailure", "Error": "Try again"}
+                statuses[-1] = {"Status": "Failed", "Error": "Address blacklisted"}
+            stubber.add_response("send_bulk_templated_email", {"Status": statuses})
+
+        errors = service.send_batch(messages)
+        stubber.assert_no_pending_responses()
+
+    assert errors[:-2] == [None] * 118
+    # SES's generic "Failed" covers permanent rejections, so only TransientFailure is retried
+    assert isinstance(errors[-2], TransientNotificationError)
+    assert isinstance(errors[-1], PermanentNotificationError) and "blacklisted" in str(errors[-1])
+
+
+# Unit test: the dispatcher groups recipients by channel and chunks them by each strategy's batch size
+def test_dispatcher_batches_by_channel():
+    from app.services.notification_dispatcher import NotificationDispatcher
+    from app.services.notification_service import NotificationService
+
+    class BulkEmail(NotificationService):
+        batch_size = 50
+
+        def __init__(self):
+            self.calls = []
+
+        def send_batch(self, messages):
+            self.calls.append(len(messages))
+            return [None] * len(messages)
+
+    class Chat(NotificationService):
+        def send_notification(self, recipient, subject, body):
+            if recipient == "bad":
+                raise ValueError("chat not found")
+
+    email = BulkEmail()
+    dispatcher = NotificationDispatcher({"email": email, "telegram": Chat()})
+    bookings = [{"_id": str(i), "user_email": f"m{i}@test.com"} for i in range(120)]
+    bookings[0]["notification_preferences"] = {"channels": ["email", "telegram"], "telegram_chat_id": "bad"}
+
+    results = dispatcher.send_batch([(booking, "Subject", "Body") for booking in bookings])
+
+    assert email.calls == [50, 50, 20]
+    assert [result.booking_id for result in results] == [str(i) for i in range(120)]
+    assert results[0].channels["telegram"] == {"status": "failed", "error": "chat not found"}
+    assert all(result.ok for result in results[1:])
@@ -0,0 +1,193 @@
+"""
+SMTP email service, tested against a local aiosmtpd server.
+
+Covers:
+- Delivery, authentication and connection reuse across messages
+- Reconnecting after the server drops a connection
+- Classifying refused recipients and bad credentials
+- Closing the socket when STARTTLS or login fails
+- Throughput with pooled connections versus a new connection per message
+"""
+
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services.container import get_services
+from app.services.notification_errors import PermanentNotificationError, TransientNotificationError
+from app.services.smtp_email_service import SMTPEmailService
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+
+USERNAME = "relay"
+PASSWORD = "secret"
+
+
+class RecordingHandler:
+    """Accepts every message except those to refused@..., and counts SMTP sessions."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.drop_next = False
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        if self.drop_next:
+            # Like a relay restarting: close the session in the middle of a send
+            self.drop_next = False
+            server.transport.close()
+            return "421 4.3.2 Service shutting down"
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused@"):
+            return "550 5.1.1 mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(session)
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode()))
+        return "250 Message accepted for delivery"
+
+
+def _authenticate(server, session, envelope, mechanism, auth_data):
+    valid = auth_data.login == USERNAME.encode() and auth_data.password == PASSWORD.encode()
+    return AuthResult(success=valid, handled=False)
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(
+        handler, hostname="127.0.0.1", port=_free_port(), authenticator=_authenticate, auth_require_tls=False,
+    )
+    controller.start()
+    yield controller
+    controller.stop()
+
+
+def _service(server, **options):
+    options.setdefault("username", USERNAME)
+    options.setdefault("password", PASSWORD)
+    options.setdefault("starttls", False)
+    return SMTPEmailService("gym@test.com", host="127.0.0.1", port=server.port, **options)
+
+
+# A batch goes out on one authenticated connection, and the next batch reuses it
+def test_smtp_batch_reuses_connection(smtp_server):
+    service = _service(smtp_server)
+    messages = [(f"member{i}@test.com", f"Reminder {i}", f"Class {i} starts soon") for i in range(5)]
+
+    assert service.send_batch(messages) == [None] * 5
+    service.send_email("late@test.com", "Reminder", "Class starts soon")
+
+    handler = smtp_server.handler
+    assert [recipient for recipient, _ in handler.messages] == [m[0] for m in messages] + ["late@test.com"]
+    assert "Subject: Reminder 0" in handler.messages[0][1]
+    assert len(handler.sessions) == 1
+    service.close()
+
+
+# A pooled connection the server drops is replaced and the message still goes out
+def test_smtp_reconnects_after_drop(smtp_server):
+    service = _service(smtp_server)
+    service.send_email("a@test.com", "Reminder", "First")
+    dropped = service._idle.queue[0]
+    smtp_server.handler.drop_next = True
+
+    service.send_email("b@test.com", "Reminder", "Second")
+
+    assert [recipient for recipient, _ in smtp_server.handler.messages] == ["a@test.com", "b@test.com"]
+    assert service._idle.queue[0] is not dropped
+    assert len(smtp_server.handler.sessions) == 2
+    service.close()
+
+
+# Connections are recycled after the per-connection message cap
+def test_smtp_recycles_connection_after_cap(smtp_server):
+    service = _service(smtp_server, max_messages_per_connection=2)
+    assert service.send_batch([(f"m{i}@test.com", "Reminder", "Body") for i in range(5)]) == [None] * 5
+    assert len(smtp_server.handler.sessions) == 3
+    service.close()
+
+
+# A refused recipient fails only that message; bad credentials and an unreachable relay fail them all
+def test_smtp_errors_are_classified(smtp_server):
+    service = _service(smtp_server)
+    errors = service.send_batch([("refused@test.com", "Reminder", "Body"), ("ok@test.com", "Reminder", "Body")])
+    assert isinstance(errors[0], PermanentNotificationError)
+    assert errors[1] is None
+
+    with pytest.raises(PermanentNotificationError):
+        _service(smtp_server, password="wrong").send_email("ok@test.com", "Reminder", "Body")
+
+    unreachable = SMTPEmailService("gym@test.com", host="127.0.0.1", port=1, starttls=False, timeout=1)
+    with pytest.raises(TransientNotificationError):
+        unreachable.send_email("ok@test.com", "Reminder", "Body")
+    service.close()
+
+
+# A connection whose STARTTLS or login fails is closed rather than left open
+def test_smtp_closes_connection_when_setup_fails(smtp_server, monkeypatch):
+    discarded = []
+    monkeypatch.setattr(SMTPEmailService, "_discard",
+                        lambda self, connection: discarded.append(connection) or connection.close())
+
+    # The test server does not offer STARTTLS
+    with pytest.raises(PermanentNotificationError):
+        _service(smtp_server, starttls=True).send_email("ok@test.com", "Reminder", "Body")
+    with pytest.raises(PermanentNotificationError):
+        _service(smtp_server, password="wrong").send_email("ok@test.com", "Reminder", "Body")
+
+    assert len(discarded) == 2
+    assert all(connection.sock is None for connection in discarded)
+
+
+# Benchmark: pooled connections send a burst faster than one connection per message
+def test_smtp_pooled_throughput(smtp_server):
+    count = 200
+    messages = [(f"member{i}@test.com", "Reminder", "Class starts soon") for i in range(count)]
+
+    def rate(service, chunk_size):
+        chunks = [messages[i:i + chunk_size] for i in range(0, count, chunk_size)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            errors = [error for result in executor.map(service.send_batch, chunks) for error in result]
+        elapsed = time.perf_counter() - started
+        assert errors == [None] * count
+        return count / elapsed
+
+    # Interleaved rounds, best of each: a stall elsewhere in the process should not decide the comparison
+    pooled_rates, unpooled_rates = [], []
+    for _ in range(3):
+        sessions_before = len(smtp_server.handler.sessions)
+        pooled = _service(smtp_server, pool_size=4)
+        pooled_rates.append(rate(pooled, chunk_size=SMTPEmailService.batch_size // 4))
+        pooled.close()
+        assert len(smtp_server.handler.sessions) - sessions_before <= 4
+        unpooled = _service(smtp_server, pool_size=4, max_messages_per_connection=1)
+        unpooled_rates.append(rate(unpooled, chunk_size=1))
+    pooled_rate, unpooled_rate = max(pooled_rates), max(unpooled_rates)
+
+    print(f"\nSMTP throughput: {pooled_rate:.0f} msg/s pooled, {unpooled_rate:.0f} msg/s per-message connections")
+    assert len(smtp_server.handler.messages) == 6 * count
+    assert pooled_rate > unpooled_rate
+
+
+# EMAIL_BACKEND=smtp swaps the email channel to the SMTP relay
+def test_container_selects_smtp_backend(app):
+    app.config.update(EMAIL_BACKEND="smtp", SMTP_HOST="relay.test", SMTP_PORT=2525, SMTP_POOL_SIZE=3,
+                      SES_SENDER_EMAIL="gym@relay.test")
+    with app.app_context():
+        email = get_services().notification_dispatcher.strategies["email"]
+    assert isinstance(email, SMTPEmailService)
+    assert (email.host, email.port, email.sender_email) == ("relay.test", 2525, "gym@relay.test")
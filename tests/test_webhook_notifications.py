@@ -0,0 +1,181 @@
+"""
+Webhook notification channel, tested against a local HTTP stub.
+
+Covers:
+- Batched, signed JSON payloads over keep-alive connections
+- Retrying 5xx replies and dead-lettering other 4xx through the dispatcher
+- Selecting the webhook channel on a booking and delivering a class reminder to it
+- Refusing the webhook channel when no WEBHOOK_URL is configured
+- Throughput of concurrent batches
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+import pytest
+from app.db.bookings import BookingResource, CHANNEL_WEBHOOK, CHANNELS, TELEGRAM_CHAT_ID
+from app.services.container import get_services
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_errors import PermanentNotificationError
+from app.services.retry_policy import RetryPolicy
+from app.services.webhook_notification_service import (
+    SIGNATURE_HEADER,
+    TIMESTAMP_HEADER,
+    WebhookNotificationService,
+    sign_payload,
+)
+
+SECRET = "partner-secret"
+
+
+class WebhookStub(ThreadingHTTPServer):
+    """Partner endpoint that records each request and replies with queued statuses (200 once empty)."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self.requests = []
+        self.connections = set()
+        self.statuses = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/reminders"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps the connection open between requests
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        stub = self.server
+        with stub.lock:
+            stub.requests.append((dict(self.headers), body))
+            stub.connections.add(self.client_address)
+            status = stub.statuses.pop(0) if stub.statuses else HTTPStatus.OK
+        time.sleep(stub.latency)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = WebhookStub()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _messages(count):
+    return [(f"member{i}@test.com", f"Reminder {i}", f"Class {i} starts soon") for i in range(count)]
+
+
+# A batch is one signed POST, and the next batch reuses the same connection
+def test_webhook_batch_is_signed_and_kept_alive(stub):
+    service = WebhookNotificationService(stub.url, secret=SECRET, clock=lambda: 1700000000)
+
+    assert service.send_batch(_messages(3)) == [None] * 3
+    assert service.send_batch(_messages(2)) == [None] * 2
+
+    headers, body = stub.requests[0]
+    assert json.loads(body)["notifications"][1] == {
+        "recipient": "member1@test.com", "subject": "Reminder 1", "body": "Class 1 starts soon",
+    }
+    assert headers[TIMESTAMP_HEADER] == "1700000000"
+    assert headers[SIGNATURE_HEADER] == sign_payload(SECRET, "1700000000", body)
+    assert len(stub.requests) == 2
+    assert len(stub.connections) == 1
+
+
+# A 503 is retried as a batch; other 4xx replies fail it without retrying
+def test_webhook_failures_through_dispatcher(stub):
+    service = WebhookNotificationService(stub.url, batch_size=2)
+    dispatcher = NotificationDispatcher(
+        {CHANNEL_WEBHOOK: service},
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+    )
+    booking = {"_id": "b1", "user_email": "a@test.com", "notification_preferences": {CHANNELS: [CHANNEL_WEBHOOK]}}
+
+    stub.statuses = [HTTPStatus.SERVICE_UNAVAILABLE]
+    assert dispatcher.deliver(CHANNEL_WEBHOOK, _messages(2)) == [(None, 2), (None, 2)]
+
+    stub.statuses = [HTTPStatus.BAD_REQUEST]
+    result = dispatcher.send_notification(booking, "Reminder", "Soon")
+    assert result.channels[CHANNEL_WEBHOOK]["status"] == "failed"
+    assert len(stub.requests) == 3
+
+    with pytest.raises(PermanentNotificationError):
+        stub.statuses = [HTTPStatus.UNAUTHORIZED]
+        service.send_notification("a@test.com", "Reminder", "Soon")
+
+
+# Members can pick the webhook channel, and a class reminder reaches them through it
+@patch("app.services.ses_email_service.SESEmailService.send_batch", side_effect=lambda batch: [None] * len(batch))
+def test_class_reminder_over_webhook(mock_email, stub, app, client, member_token, trainer_token, sample_booking,
+                                     sample_bookings_with_prefs):
+    app.config.update(WEBHOOK_URL=stub.url, WEBHOOK_SECRET=SECRET)
+    resp = client.patch(f"/bookings/{sample_booking}/notifications", json={CHANNELS: [CHANNEL_WEBHOOK]},
+                        headers={"Authorization": f"Bearer {member_token}"})
+    assert resp.status_code == HTTPStatus.OK
+
+    with app.app_context():
+        BookingResource().update_notification_preferences(sample_bookings_with_prefs["bob_booking"], {
+            CHANNELS: [CHANNEL_WEBHOOK], TELEGRAM_CHAT_ID: None,
+        })
+    class_id = sample_bookings_with_prefs["class_id"]
+    client.post(f"/classes/{class_id}/reminder", headers={"Authorization": f"Bearer {trainer_token}"})
+    with app.app_context():
+        assert get_services().reminder_worker.run_once()
+
+    assert [recipient for recipient, _, _ in mock_email.call_args.args[0]] == ["alice@test.com"]
+    headers, body = stub.requests[0]
+    assert [n["recipient"] for n in json.loads(body)["notifications"]] == ["bob@test.com"]
+    assert headers[SIGNATURE_HEADER] == sign_payload(SECRET, headers[TIMESTAMP_HEADER], body)
+
+
+# Without a WEBHOOK_URL the channel cannot be picked, and the dispatcher does not register it
+def test_webhook_channel_needs_url(app, client, member_token, sample_booking):
+    app.config["WEBHOOK_URL"] = ""
+    resp = client.patch(f"/bookings/{sample_booking}/notifications", json={CHANNELS: [CHANNEL_WEBHOOK]},
+                        headers={"Authorization": f"Bearer {member_token}"})
+
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    assert resp.get_json()["message"] == "Unsupported notification channel: webhook"
+    with app.app_context():
+        assert CHANNEL_WEBHOOK not in get_services().notification_dispatcher.strategies
+
+
+# Benchmark: concurrent batches over the pool deliver far more than one request per notification
+def test_webhook_throughput(stub):
+    stub.latency = 0.01
+    count, batch_size, workers = 2000, 100, 4
+    dispatcher = NotificationDispatcher(
+        {CHANNEL_WEBHOOK: WebhookNotificationService(stub.url, secret=SECRET, batch_size=batch_size,
+                                                     pool_size=workers)},
+        channel_limits={CHANNEL_WEBHOOK: workers},
+    )
+    booking = {"user_email": "a@test.com", "notification_preferences": {CHANNELS: [CHANNEL_WEBHOOK]}}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = dispatcher.send_batch([(booking, "Reminder", "Soon")] * count, executor=executor)
+    rate = count / (time.perf_counter() - started)
+
+    print(f"\nWebhook throughput: {rate:.0f} notifications/s in {len(stub.requests)} requests")
+    assert all(result.ok for result in results)
+    assert len(stub.requests) == count // batch_size
+    assert len(stub.connections) <= workers